@@ -1,24 +1,36 @@
-from typing import Iterator
+import numpy as np
+from typing import Iterator, Optional
 
+from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
 from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.bitset_items import get_universe
+from fairdivision.utils.compact_allocation import CompactAllocation
+from fairdivision.utils.instance import get_instance
+from fairdivision.utils.item import Item
 from fairdivision.utils.items import Items
 
 
 class AllAllocations:
     """
     A class that can be iterated over to return all possible allocations of `Items` to `Agents`.
+
+    Only allocations with indices from `start` (inclusive) to `stop` (exclusive) are returned, so the iteration can be
+    split into contiguous shards.
     """
 
-    def __init__(self, agents: Agents, items: Items):
+    def __init__(self, agents: Agents, items: Items, start: int = 0, stop: Optional[int] = None):
         self.agents: Agents = agents
         self.items: Items = items
 
         self.agents_indices: list[int] = agents.get_indices()
 
-        self.allocation_index: int = 0
+        self.allocation_index: int = start
         self.allocations_number: int = self.agents.size() ** self.items.size()
 
+        if stop is not None:
+            self.allocations_number = min(self.allocations_number, stop)
+
     def __iter__(self):
         return self
 
@@ -44,7 +56,7 @@ class AllAllocations:
         items list. 
         """
 
-        allocation = Allocation(self.agents)
+        allocation = Allocation(self.agents, get_universe(self.items))
 
         allocation_index = self.allocation_index
 
@@ -59,9 +71,299 @@ class AllAllocations:
         return allocation
 
 
-def all_allocations(agents: Agents, items: Items) -> Iterator[Allocation]:
+def all_allocations(agents: Agents, items: Items, start: int = 0, stop: Optional[int] = None) -> Iterator[Allocation]:
+    """
+    Returns an iterator giving all possible allocations of `items` to `agents`, optionally only the ones with indices
+    from `start` to `stop`.
+    """
+
+    return iter(AllAllocations(agents, items, start, stop))
+
+
+def all_compact_allocations(
+    agents: Agents, items: Items, start: int = 0, stop: Optional[int] = None
+) -> Iterator[CompactAllocation]:
+    """
+    Returns an iterator giving all possible allocations of `items` to `agents` as `CompactAllocation`, optionally only
+    the ones with indices from `start` to `stop`.
+
+    Allocations are given in the same order as by `all_allocations`, but no `Allocation` or `Bundle` is created - the
+    owners array is advanced like a base `n` counter where the first item is the least significant digit.
+    """
+
+    n = agents.size()
+    owners = get_owners(start, n, items.size())
+
+    if stop is None:
+        stop = n ** items.size()
+
+    for _ in range(start, min(stop, n ** items.size())):
+        yield CompactAllocation(owners)
+
+        for position in range(len(owners)):
+            owners[position] += 1
+
+            if owners[position] < n:
+                break
+
+            owners[position] = 0
+
+
+def get_owners(allocation_index: int, n: int, m: int) -> list[int]:
+    """
+    Returns the owners of `m` items in the allocation with `allocation_index` in the order of `all_allocations`, where
+    `owners[k]` is the position of the agent owning the `k`-th item.
+    """
+
+    owners = [0] * m
+
+    if n == 0:
+        return owners
+
+    for position in range(m):
+        owners[position] = allocation_index % n
+        allocation_index //= n
+
+    return owners
+
+
+def get_valuations_matrix(observers: Agents, items: Items) -> np.ndarray:
+    """
+    Returns a matrix where the element `[i][k]` is the valuation of the `i`-th of `observers` for the `k`-th of
+    `items`, both in the ascending order of their indices.
+    """
+
+    instance = get_instance(observers, items)
+    rows = [instance.get_row(observer) for observer in observers]
+    columns = [instance.get_column(item) for item in items]
+
+    return instance.valuations[np.ix_(rows, columns)]
+
+
+class AllocationView:
     """
-    Returns an iterator giving all possible allocations of `items` to `agents`.
+    A class representating the current allocation of `GrayCodeAllocations`.
+
+    Contains `owners`, where `owners[k]` is the position of the agent owning the `k`-th item, and `values`, where
+    `values[i][j]` is the valuation of the `i`-th observer for the bundle of the `j`-th agent. Agents, observers and
+    items are positioned in the ascending order of their indices.
+
+    The view is updated in place at every step of the enumeration, so it should not be stored. `to_compact` and
+    `to_allocation` can be used to keep a copy of the current allocation.
+    """
+
+    def __init__(self, agents: Agents, items: Items, valuations: np.ndarray):
+        self.agents: Agents = agents
+        self.items: Items = items
+        self.valuations: np.ndarray = valuations
+
+        self.owners: list[int] = [0] * items.size()
+        self.values: np.ndarray = np.zeros((valuations.shape[0], agents.size()), dtype=np.int64)
+
+        # position of the last moved item with its previous and current owner
+        self.moved_item: Optional[int] = None
+        self.previous_owner: Optional[int] = None
+        self.current_owner: Optional[int] = None
+
+        if agents.size() > 0:
+            self.values[:, 0] = valuations.sum(axis=1)
+
+    def __repr__(self):
+        return f"AllocationView({self.owners})"
+
+    def __str__(self):
+        return repr(self)
+
+    def move_item(self, position: int, owner: int) -> None:
+        previous_owner = self.owners[position]
+
+        self.values[:, previous_owner] -= self.valuations[:, position]
+        self.values[:, owner] += self.valuations[:, position]
+
+        self.owners[position] = owner
+
+        self.moved_item = position
+        self.previous_owner = previous_owner
+        self.current_owner = owner
+
+    def to_compact(self) -> CompactAllocation:
+        return CompactAllocation(self.owners)
+
+    def to_allocation(self) -> Allocation:
+        return self.to_compact().to_allocation(self.agents, self.items)
+
+
+class GrayCodeAllocations:
+    """
+    A class that can be iterated over to return all possible allocations of `Items` to `Agents` as `AllocationView`.
+
+    Allocations are visited in the order of the reflected mixed-radix Gray code, so consecutive allocations differ by
+    moving a single item from one agent to another. Only this one item is updated in the shared view, together with
+    the valuations of the two affected bundles, instead of creating a new `Allocation` at every step.
+
+    Valuations in the view belong to `observers`, which are `agents` by default.
+    """
+
+    def __init__(self, agents: Agents, items: Items, observers: Optional[Agents] = None):
+        self.agents: Agents = agents
+        self.items: Items = items
+
+        if observers is None:
+            observers = agents
+
+        self.view: AllocationView = AllocationView(agents, items, get_valuations_matrix(observers, items))
+
+        # state of Algorithm H from "The Art of Computer Programming, Volume 4A" by Knuth
+        self.directions: list[int] = [1] * items.size()
+        self.focus_pointers: list[int] = list(range(items.size() + 1))
+
+        self.allocation_index: int = 0
+        self.allocations_number: int = self.agents.size() ** self.items.size()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.allocation_index >= self.allocations_number:
+            raise StopIteration
+
+        if self.allocation_index > 0:
+            self.__move_to_next_allocation()
+
+        self.allocation_index += 1
+
+        return self.view
+
+    def __move_to_next_allocation(self) -> None:
+        """
+        Moves the item pointed by the focus pointers to the next agent in its current direction.
+
+        The number of steps is limited by `self.allocations_number`, so the pointer never reaches the end of the items.
+        """
+
+        position = self.focus_pointers[0]
+        self.focus_pointers[0] = 0
+
+        owner = self.view.owners[position] + self.directions[position]
+        self.view.move_item(position, owner)
+
+        if owner == 0 or owner == self.agents.size() - 1:
+            self.directions[position] = -self.directions[position]
+            self.focus_pointers[position] = self.focus_pointers[position + 1]
+            self.focus_pointers[position + 1] = position + 1
+
+
+def gray_code_allocations(agents: Agents, items: Items, observers: Optional[Agents] = None) -> Iterator[AllocationView]:
+    """
+    Returns an iterator giving all possible allocations of `items` to `agents`, where consecutive allocations differ
+    by moving a single item.
+
+    The same `AllocationView` is updated and returned at every step. Valuations in the view belong to `observers`,
+    which are `agents` by default.
+    """
+
+    return iter(GrayCodeAllocations(agents, items, observers))
+
+
+class AllPartitions:
+    """
+    A class that can be iterated over to return all partitions of `Items` into at most `n` unlabeled bundles.
+
+    Each partition is returned exactly once as a restricted growth string `labels`, where `labels[k]` is the bundle of
+    the `k`-th item from `self.items`. Bundles are numbered in the order of their first items, so `labels[0] = 0` and
+    each label is at most one greater than all labels before it. The same list is updated and returned at every step.
+
+    If `agent` is given, `self.items` are sorted by her valuations in descending order, and items with equal
+    valuations are assigned to bundles in non-decreasing order. This skips most of the partitions that differ only by
+    exchanging such items, which are identical for `agent`.
+    """
+
+    def __init__(self, items: Items, n: int, agent: Optional[Agent] = None):
+        self.n: int = n
+        self.items: list[Item] = items.get_items()
+
+        # `equal_to_previous[k]` tells if the `k`-th item has the same valuation as the previous one
+        self.equal_to_previous: list[bool] = [False] * len(self.items)
+
+        if agent is not None:
+            valuations = dict([(item, agent.get_valuation(item)) for item in self.items])
+            self.items = sorted(self.items, key=lambda item: valuations[item], reverse=True)
+
+            for position in range(1, len(self.items)):
+                previous_valuation = valuations[self.items[position - 1]]
+                self.equal_to_previous[position] = valuations[self.items[position]] == previous_valuation
+
+        self.labels: list[int] = [0] * len(self.items)
+
+        # `maxima[k]` is the greatest label among the first `k + 1` items
+        self.maxima: list[int] = [0] * len(self.items)
+
+        self.started: bool = False
+        self.finished: bool = n == 0 and len(self.items) > 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.finished:
+            raise StopIteration
+
+        if self.started and not self.__move_to_next_partition():
+            self.finished = True
+
+            raise StopIteration
+
+        self.started = True
+
+        return self.labels
+
+    def get_partition(self) -> list[Items]:
+        """
+        Returns the current partition as a list of `n` bundles of items, where the unused ones are empty.
+        """
+
+        partition = [Items() for _ in range(self.n)]
+
+        for item, label in zip(self.items, self.labels):
+            partition[label].add_item(item)
+
+        return partition
+
+    def __move_to_next_partition(self) -> bool:
+        """
+        Moves `self.labels` to the next restricted growth string in the lexicographic order.
+
+        The last label that can be increased is increased and all labels after it are set to the smallest allowed
+        values. Returns `False` if there is no such label.
+        """
+
+        for position in range(len(self.labels) - 1, 0, -1):
+            label = self.labels[position]
+
+            if label < self.n - 1 and label <= self.maxima[position - 1]:
+                self.labels[position] = label + 1
+                self.maxima[position] = max(self.maxima[position - 1], label + 1)
+
+                for next_position in range(position + 1, len(self.labels)):
+                    if self.equal_to_previous[next_position]:
+                        self.labels[next_position] = self.labels[next_position - 1]
+                    else:
+                        self.labels[next_position] = 0
+
+                    self.maxima[next_position] = max(self.maxima[next_position - 1], self.labels[next_position])
+
+                return True
+
+        return False
+
+
+def all_partitions(items: Items, n: int, agent: Optional[Agent] = None) -> AllPartitions:
+    """
+    Returns an iterator giving all partitions of `items` into at most `n` unlabeled bundles as restricted growth
+    strings.
+
+    If `agent` is given, most of the partitions that differ only by exchanging items with equal valuations for `agent`
+    are skipped. The order of items in the strings is available in `items` of the returned iterator.
     """
 
-    return iter(AllAllocations(agents, items))
+    return AllPartitions(items, n, agent)
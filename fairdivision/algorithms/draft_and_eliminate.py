@@ -1,12 +1,17 @@
+from heapq import heapify, heappop, heappush
 from math import sqrt
+from typing import Optional
 
 from fairdivision.algorithms.envy_cycle_elimination import envy_cycle_elimination
 from fairdivision.algorithms.round_robin import round_robin
 from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
 from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.bitset_items import BitsetItems, ItemsUniverse, get_universe
+from fairdivision.utils.instance import get_instance
 from fairdivision.utils.item import Item
 from fairdivision.utils.items import Items
+from fairdivision.utils.preference_index import PreferenceIndex
 
 
 PHI = (1 + sqrt(5)) / 2
@@ -25,20 +30,27 @@ def draft_and_eliminate(agents: Agents, items: Items) -> Allocation:
     """
      
     n = agents.size()
-    ordering, quite_happy_n = preprocessing(agents, items)
 
-    allocation = Allocation(agents)
-    allocation, items_left = round_robin(agents, items, allocation, ordering, n)
+    # one index of preferences answers favorite items in all the phases
+    preferences = PreferenceIndex(agents, items)
+
+    ordering, quite_happy_n = preprocessing(agents, items, preferences)
+
+    allocation = Allocation(agents, get_universe(items), get_instance(agents, items))
+    allocation, items_left = round_robin(agents, items, allocation, ordering, n, preferences)
 
     reversed_ordering = list(reversed(ordering))
-    allocation, items_left = round_robin(agents, items_left, allocation, reversed_ordering, n - quite_happy_n)
+    allocation, items_left = round_robin(
+        agents, items_left, allocation, reversed_ordering, n - quite_happy_n, preferences
+    )
 
-    return envy_cycle_elimination(agents, items_left, allocation)
+    return envy_cycle_elimination(agents, items_left, allocation, preferences=preferences)
 
 
 # Implementation of Algorithm 4 from "Multiple birds with one stone: Beating 1/2 for EFX and GMMS via envy cycle
 # elimination" by Amanatidis et al.
-def preprocessing(agents: Agents, items: Items) -> tuple[list[int], int]:
+def preprocessing(
+        agents: Agents, items: Items, preferences: Optional[PreferenceIndex] = None) -> tuple[list[int], int]:
     """
     Creates ordering of `agents` for distribution of the first one to two items per agent, and decides how many agents
     will be "quite happy" with only one item.
@@ -48,59 +60,62 @@ def preprocessing(agents: Agents, items: Items) -> tuple[list[int], int]:
     among the unassigned ones with a factor equal to at least the golden ratio (about 1.618). Then, she has the item
     assigned, and the previous owner will have another chance of choosing an item. Each agent can choose at most one
     item.
+
+    Agents waiting for their turn are kept in a priority queue, and favorite unassigned items are found with
+    `preferences`, which are built for `agents` and `items` if not given. Shared ones may be built for any superset of
+    `items`.
     """
 
     m = items.size()
 
-    agents_left = agents.copy()
-    items_left = items.copy()
+    if preferences is None:
+        preferences = PreferenceIndex(agents, items)
+
+    # indices of agents left to choose an item, the one with the lowest index chooses first
+    agents_left = agents.get_indices()
+    heapify(agents_left)
+
+    # unassigned items, from which chosen items are removed in a bitset instead of a sorted list
+    items_left = BitsetItems(ItemsUniverse(items), mask=(1 << m) - 1)
 
     ordering = []
-    quite_happy_agents = Agents([])
+    quite_happy_n = 0
 
-    # agents who have associated items, but are not quite happy
-    processed = Agents([])
+    # agents who have associated items, but are not quite happy, in the order of receiving them
+    processed: dict[Agent, None] = {}
     items_owners: dict[Item, Agent] = {}
 
-    # items assigned to `processed`` agents
+    # items assigned to `processed` agents, at most one per agent, so that searching them takes `O(n)` and not `O(m)`
     assigned = Items([])
 
-    # time of receiving the final item for each agent
-    timestamps: dict[Agent, int] = {}
+    while len(agents_left) > 0 and items_left.size() > 0:
+        agent = agents.get_agent(heappop(agents_left))
+        favorite_unassigned = preferences.get_favorite_item(agent, items_left)
 
-    while agents_left.size() > 0 and items_left.size() > 0:
-        timestamp = m - items_left.size() + 1
-        
-        agent = agents_left.get_agents()[0]
-        favorite_unassigned = agent.get_favorite_item(items_left)
-        
-        if is_extremely_envious(agent, favorite_unassigned, assigned):
-            favorite_assigned = agent.get_favorite_item(assigned)
+        # the favorite assigned item is searched only among the columns of at most `n` assigned items
+        favorite_assigned = agent.get_favorite_item(assigned) if assigned.size() > 0 else None
 
-            previous_owner = items_owners[favorite_assigned]
-            processed.remove_agent(previous_owner)
+        if favorite_assigned is not None and exceeds_golden_ratio(agent, favorite_assigned, favorite_unassigned):
+            previous_owner = items_owners.pop(favorite_assigned)
+            del processed[previous_owner]
             assigned.remove_item(favorite_assigned)
 
-            agents_left.add_agent(previous_owner)
-
-            del items_owners[favorite_assigned]
-            quite_happy_agents.add_agent(agent)
+            heappush(agents_left, previous_owner.get_index())
 
+            quite_happy_n += 1
             ordering.append(agent.get_index())
         else:
-            processed.add_agent(agent)
+            processed[agent] = None
             assigned.add_item(favorite_unassigned)
 
             items_owners[favorite_unassigned] = agent
             items_left.remove_item(favorite_unassigned)
 
-        agents_left.remove_agent(agent)
-        timestamps[agent] = timestamp
-    
-    for agent in sorted(processed, key=lambda agent: timestamps[agent]):
+    # agents receive their final items in the order they were added to `processed` in
+    for agent in processed:
         ordering.append(agent.get_index())
 
-    return ordering, quite_happy_agents.size()
+    return ordering, quite_happy_n
 
 
 def is_extremely_envious(agent: Agent, favorite_unassigned: Item, assigned: Items) -> bool:
@@ -109,11 +124,14 @@ def is_extremely_envious(agent: Agent, favorite_unassigned: Item, assigned: Item
     """
     
     if assigned.size() > 0:
-        favorite_unassigned_valuation = agent.get_valuation(favorite_unassigned)
-
-        favorite_assigned = agent.get_favorite_item(assigned)
-        favorite_assigned_valuation = agent.get_valuation(favorite_assigned)
-
-        return favorite_assigned_valuation > PHI * favorite_unassigned_valuation
+        return exceeds_golden_ratio(agent, agent.get_favorite_item(assigned), favorite_unassigned)
     else:
         return False
+
+
+def exceeds_golden_ratio(agent: Agent, favorite_assigned: Item, favorite_unassigned: Item) -> bool:
+    """
+    Checks if `agent` values `favorite_assigned` more than `favorite_unassigned` with a factor of at least 1.618.
+    """
+
+    return agent.get_valuation(favorite_assigned) > PHI * agent.get_valuation(favorite_unassigned)
@@ -1,116 +1,170 @@
-import networkx as nx # type: ignore
-from typing import Optional
+from typing import Literal, Optional
 
 from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
 from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.bitset_items import get_universe
+from fairdivision.utils.envy_graph import EnvyGraph, get_envy_matrix
+from fairdivision.utils.instance import get_instance
 from fairdivision.utils.items import Items
+from fairdivision.utils.preference_index import PreferenceIndex
 
 
-def envy_cycle_elimination(agents: Agents, items: Items, allocation: Optional[Allocation] = None) -> Allocation:
+def envy_cycle_elimination(
+        agents: Agents,
+        items: Items,
+        allocation: Optional[Allocation] = None,
+        strategy: Literal["cycle", "scc", "ttc"] = "cycle",
+        statistics: Optional[dict[str, int]] = None,
+        preferences: Optional[PreferenceIndex] = None) -> Allocation:
     """
     Returns a full allocation for the given `agents`, `items` and optional partial `allocation`.
 
     While there are still unallocated items, it gives the favorite one to the unenvied agent, breaking ties in favor of
     empty bundles. Additionally, it uses an envy graph to redistribute bundles if no unenvied agent is present.
+
+    `strategy` decides how bundles are redistributed in each round of cycle elimination:
+        - `"cycle"` rotates one envy cycle,
+        - `"scc"` rotates one cycle from every strongly connected component of the envy graph at once,
+        - `"ttc"` rotates top trading cycles (see `EnvyGraph.find_trading_cycles`) until the envy graph is acyclic.
+    If `statistics` is given, the number of rounds of cycle elimination is stored in it under `"rounds"`.
+
+    Favorite items are found with `preferences`, which are built for `agents` and `items` if not given. Shared ones may
+    be built for any superset of `items`.
     """
 
+    if strategy not in ["cycle", "scc", "ttc"]:
+        raise Exception(f"Unknown cycle elimination strategy {strategy}")
+
     items_left = items.copy()
 
+    if preferences is None:
+        preferences = PreferenceIndex(agents, items)
+
     if allocation is None:
-        allocation = Allocation(agents)
+        allocation = Allocation(agents, get_universe(items), get_instance(agents, items))
 
     graph = create_envy_graph(agents, allocation)
+    rounds = 0
 
     while items_left.size() > 0:
         unenvied_agent = get_unenvied_agent(graph, agents, allocation)
 
         while unenvied_agent is None:
-            cycle = nx.find_cycle(graph)
-            graph = eliminate_cycle(agents, cycle, allocation)
+            if strategy == "cycle":
+                cycle = graph.find_cycle()
+
+                # without unenvied agents every agent is envied, so the graph has a cycle
+                if cycle is None:
+                    raise Exception("No envy cycle found in the envy graph without unenvied agents")
+
+                graph = eliminate_cycle(agents, cycle, allocation, graph)
+                rounds += 1
+            else:
+                rounds += eliminate_cycles(graph, allocation, strategy)
 
             unenvied_agent = get_unenvied_agent(graph, agents, allocation)
 
-        favorite_item = unenvied_agent.get_favorite_item(items_left)
+        favorite_item = preferences.get_favorite_item(unenvied_agent, items_left)
         allocation.allocate(unenvied_agent, favorite_item)
         items_left.remove_item(favorite_item)
 
         update_graph(graph, agents, allocation, unenvied_agent)
 
+    if statistics is not None:
+        statistics["rounds"] = rounds
+
     return allocation
 
 
-def create_envy_graph(agents: Agents, allocation: Allocation) -> nx.DiGraph:
+def create_envy_graph(agents: Agents, allocation: Allocation) -> EnvyGraph:
     """
     Creates envy graph from the given `allocation`.
 
     Each node in the graph is an agent. An edge `(i, j)` represents that the agent `i` envies the bundle of agent `j`.
     Only the agents with non-empty bundles can be envied so we only check envy towards them.
+
+    The graph is built from the envy matrix computed at once by `get_envy_matrix`.
     """
 
-    graph = nx.DiGraph()
-    graph.add_nodes_from(agents)
+    return EnvyGraph(agents, get_envy_matrix(agents, allocation), allocation)
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-    
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i.envies(agent_j, allocation):
-                graph.add_edge(agent_i, agent_j)
 
-    return graph
+def get_unenvied_agent(graph: EnvyGraph, agents: Agents, allocation: Allocation) -> Optional[Agent]:
+    """
+    Returns unenvied agent if such exists.
+
+    Ties are broken in favor of the agents with empty bundles to ensure 1/2-EFX allocation. The first such agent in the
+    order of `agents` is taken from the sources and empty bundles tracked by the envy `graph`, without a scan.
+    """
+
+    return graph.get_unenvied_agent()
 
 
-def get_unenvied_agent(graph: nx.DiGraph, agents: Agents, allocation: Allocation) -> Optional[Agent]:
+def eliminate_cycle(
+    agents: Agents, cycle: list[tuple[Agent, Agent]], allocation: Allocation, graph: Optional[EnvyGraph] = None
+) -> EnvyGraph:
     """
-    Returns unenvied agent if such exists.
+    Eliminates an envy cycle in the envy graph by redistributing bundles of the agents in `cycle`.
 
-    Ties are broken in favor of the agents with empty bundles to ensure 1/2-EFX allocation.
+    Bundles are reallocated and then the envy `graph` is updated by permuting the envied bundles and comparing again
+    only the agents from `cycle` (see `EnvyGraph.rotate_bundles`). Without `graph`, a new one is created from scratch.
     """
 
-    unenvied_agent = None
+    allocation.reallocate_bundles(cycle)
 
-    for agent in agents:
-        if graph.in_degree(agent) == 0:
-            if allocation.for_agent(agent).size() == 0:
-                unenvied_agent = agent
-                break
-            elif unenvied_agent is None:
-                unenvied_agent = agent
+    if graph is None:
+        return create_envy_graph(agents, allocation)
 
-    return unenvied_agent
+    graph.rotate_bundles(cycle, allocation)
+
+    return graph
 
 
-def eliminate_cycle(agents: Agents, cycle: list[tuple[Agent, Agent]], allocation: Allocation) -> nx.DiGraph:
+def eliminate_cycles(graph: EnvyGraph, allocation: Allocation, strategy: Literal["scc", "ttc"]) -> int:
     """
-    Eliminates an envy cycle in the envy graph by redistributing bundles of the agents in `cycle`.
+    Eliminates vertex-disjoint envy cycles of the envy `graph` of `allocation` and returns the number of rounds.
 
-    Bundles are reallocated and then a new envy graph is created from scratch.
+    In each round, all cycles found by `strategy` are rotated at once and the `graph` is updated once for all of them.
+    The `"scc"` strategy makes one round, the `"ttc"` strategy makes rounds until the `graph` is acyclic.
     """
 
-    first_bundle = allocation.for_agent(cycle[0][0])
+    rounds = 0
 
-    for envious, envied in cycle[:-1]:
-        allocation.allocate_bundle(envious, allocation.for_agent(envied))
+    while True:
+        if strategy == "scc":
+            cycles = graph.find_disjoint_cycles()
+        elif strategy == "ttc":
+            cycles = graph.find_trading_cycles(allocation)
+        else:
+            raise Exception(f"Unknown cycle elimination strategy {strategy}")
 
-    allocation.allocate_bundle(cycle[-1][0], first_bundle)
+        if len(cycles) == 0:
+            return rounds
 
-    return create_envy_graph(agents, allocation)
+        # bundles of disjoint cycles are rotated independently, so they form one reallocation
+        rotation = [edge for cycle in cycles for edge in cycle]
 
+        allocation.reallocate_bundles(rotation)
+        graph.rotate_bundles(rotation, allocation)
+        rounds += 1
 
-def update_graph(graph: nx.DiGraph, agents: Agents, allocation: Allocation, endowed_agent: Agent) -> None:
+        if strategy == "scc":
+            return rounds
+
+
+def update_graph(graph: EnvyGraph, agents: Agents, allocation: Allocation, endowed_agent: Agent) -> None:
     """
     Updates the envy `graph` after a new item was allocated to `endowed_agent`.
     """
 
     # deleting envy towards the agents that endowed agent no longer envies
-    for previously_envied in graph[endowed_agent].copy():
+    for previously_envied in graph.get_successors(endowed_agent):
         if not endowed_agent.envies(previously_envied, allocation):
             graph.remove_edge(endowed_agent, previously_envied)
 
+    graph.update_bundle(endowed_agent, allocation)
+
     # adding envy towards the endowed agent
     for agent in agents:
         if agent.envies(endowed_agent, allocation):
@@ -1,9 +1,15 @@
+import numpy as np
+from typing import Optional
+
 from fairdivision.algorithms.envy_cycle_elimination import envy_cycle_elimination
 from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
 from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.bitset_items import get_universe, to_bitset_items
 from fairdivision.utils.generators import generate_items
+from fairdivision.utils.instance import Instance, get_instance
 from fairdivision.utils.items import Items
+from fairdivision.utils.preference_index import PreferenceIndex
 
 
 # Implementation of Algorithm 1 from "New Fairness Concepts for Allocating Indivisible Item" by Caragiannis et al.
@@ -13,7 +19,8 @@ def ordered_picking(agents: Agents, items: Items) -> Allocation:
 
     In the beginning, an ordered instance is made by creating new items where their number matches the number of 
     original `items` and valuations of every agent are non-increasing as we move from the first item to the last in the
-    order. The valuations for the new items are sorted valuations of the original `items` for every agent.
+    order. The valuations for the new items are sorted valuations of the original `items` for every agent. The ordered
+    instance has its own copies of `agents`, so the given ones are left untouched.
 
     Next, Envy-Cycle-Elimination is called on the ordered instance to produce an allocation.
 
@@ -31,32 +38,50 @@ def ordered_picking(agents: Agents, items: Items) -> Allocation:
     and Krishnamurthy.
     """
 
-    ordered_items = generate_items(items.size(), items.size() + 1)
-    assign_valuations_in_order(agents, items, ordered_items)
+    # the order of preferences sorts valuations for the ordered instance, and then makes the agents pick items
+    preferences = PreferenceIndex(agents, items)
+
+    ordered_instance = get_ordered_instance(agents, items, preferences)
+
+    # Envy-Cycle-Elimination removes the items it allocates from a bitset instead of a sorted list
+    ordered_items = to_bitset_items(ordered_instance.items, ordered_instance.get_universe())
 
-    allocation_for_ordered = envy_cycle_elimination(agents, ordered_items)
+    allocation_for_ordered = envy_cycle_elimination(ordered_instance.agents, ordered_items)
 
-    picking_sequence = get_picking_sequence(ordered_items, allocation_for_ordered)
+    picking_sequence = [
+        agents.get_agent(agent.get_index()) for agent in get_picking_sequence(ordered_items, allocation_for_ordered)
+    ]
 
-    return pick_items(agents, items, picking_sequence)
+    return pick_items(agents, items, picking_sequence, preferences)
 
 
-def assign_valuations_in_order(agents: Agents, items: Items, ordered_items: Items) -> None:
+def get_ordered_instance(agents: Agents, items: Items, preferences: PreferenceIndex) -> Instance:
     """
-    Each agent has valuations assigned to all the items from `ordered_items`.
+    Returns an ordered instance for `agents` and `items`, with new agents and as many new items as there are `items`.
 
-    For each agent valuations of the original `items` are sorted in the non-increasing order. Next `ordered_items` get
-    these valuations in the same order. `items` and `ordered_items` are assumed to be of the same size.
+    Each new agent has the same index as an agent from `agents`, and values the new items with her valuations of the
+    original `items` sorted in the non-increasing order. The valuations are sorted by the order kept in `preferences`,
+    which have to be built for `agents` and `items`.
     """
 
-    if items.size() != ordered_items.size():
-        raise Exception(f"Items and ordered_items should be of the same size. Found {items.size()} and {ordered_items.size()}")
-    
-    for agent in agents:
-        items_valuations = sorted([agent.get_valuation(item) for item in items], reverse=True)
-        
-        for item, valuation in zip(ordered_items, items_valuations):
-            agent.assign_valuation(item, valuation)
+    instance = get_instance(agents, items)
+    rows = np.array([instance.get_row(agent) for agent in agents], dtype=np.intp)
+    columns = instance.get_columns(items)
+
+    # `get_instance` returns an instance that contains all of `items`
+    assert columns is not None
+
+    valuations = instance.valuations[np.ix_(rows, columns)]
+
+    ordered_agents = Agents([Agent(agent.get_index()) for agent in agents])
+    ordered_items = generate_items(items.size())
+
+    ordered_instance = Instance(
+        ordered_agents, ordered_items, np.take_along_axis(valuations, preferences.order.astype(np.intp), axis=1)
+    )
+    ordered_instance.bind_agents()
+
+    return ordered_instance
 
 
 def get_picking_sequence(ordered_items: Items, allocation_for_ordered: Allocation) -> list[Agent]:
@@ -79,16 +104,25 @@ def get_picking_sequence(ordered_items: Items, allocation_for_ordered: Allocatio
     return picking_sequence
 
 
-def pick_items(agents: Agents, items: Items, picking_sequence: list[Agent]) -> Allocation:
+def pick_items(
+        agents: Agents,
+        items: Items,
+        picking_sequence: list[Agent],
+        preferences: Optional[PreferenceIndex] = None) -> Allocation:
     """
     Creates an allocation where `agents` are picking favorite items in the order determined by `picking_sequence`.
+
+    Favorite items are found with `preferences`, which are built for `agents` and `items` if not given.
     """
 
-    allocation = Allocation(agents)
-    items_left = items.copy()
+    allocation = Allocation(agents, get_universe(items), get_instance(agents, items))
+    items_left = to_bitset_items(items)
+
+    if preferences is None:
+        preferences = PreferenceIndex(agents, items)
 
     for picking_agent in picking_sequence:
-        favorite_item = picking_agent.get_favorite_item(items_left)
+        favorite_item = preferences.get_favorite_item(picking_agent, items_left)
         allocation.allocate(picking_agent, favorite_item)
         items_left.remove_item(favorite_item)
 
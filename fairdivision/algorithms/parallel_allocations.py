@@ -0,0 +1,288 @@
+import multiprocessing
+import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import Any, Callable, Iterator, Literal, Optional, TypeVar
+
+from fairdivision.algorithms.all_allocations import all_allocations, get_owners, get_valuations_matrix
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.compact_allocation import CompactAllocation
+from fairdivision.utils.efx_certificate import is_efx_certificate
+from fairdivision.utils.items import Items
+
+
+T = TypeVar("T")
+
+# shards are smaller than the work of a single worker, so that faster workers can take more of them
+SHARDS_PER_WORKER = 4
+
+# number of allocations checked by a shard between checks if the search was cancelled
+CANCELLATION_CHECK_INTERVAL = 4096
+
+
+def reduce_allocations(
+    agents: Agents,
+    items: Items,
+    reduction: Callable[[Agents, Items, int, int, Any], T],
+    merge: Callable[[list[T]], T],
+    is_witness: Optional[Callable[[T], bool]] = None,
+    shards_number: Optional[int] = None,
+    max_workers: Optional[int] = None
+) -> T:
+    """
+    Splits indices of all allocations of `items` to `agents` (see `all_allocations`) into contiguous shards, runs
+    `reduction(agents, items, start, stop, cancel_event)` on each of them in a process pool and merges the results of
+    all shards, in the order of shards, with `merge`.
+
+    `reduction` has to be a picklable (module-level) function. If `is_witness` is given and the result of any shard is
+    a witness, it is returned immediately: `cancel_event` is set, so that the other shards can stop early, shards that
+    have not started yet are cancelled, and the pool is shut down without waiting for the running ones. Shards that do
+    not check `cancel_event` still run to completion in the background, but the caller does not wait for them.
+    """
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if shards_number is None:
+        shards_number = SHARDS_PER_WORKER * max_workers
+
+    shards = get_shards(agents.size() ** items.size(), shards_number)
+    results: list[T] = []
+
+    with multiprocessing.Manager() as manager:
+        cancel_event = manager.Event()
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = dict([
+                (executor.submit(reduction, agents, items, start, stop, cancel_event), position)
+                for position, (start, stop) in enumerate(shards)
+            ])
+
+            shard_results: dict[int, T] = {}
+
+            for future in as_completed(futures):
+                result = future.result()
+
+                if is_witness is not None and is_witness(result):
+                    cancel_event.set()
+
+                    # leaving the `with` block would wait for all running shards otherwise
+                    executor.shutdown(wait=False, cancel_futures=True)
+
+                    return result
+
+                shard_results[futures[future]] = result
+
+            results = [shard_results[position] for position in range(len(shards))]
+
+    return merge(results)
+
+
+def get_shards(allocations_number: int, shards_number: int) -> list[tuple[int, int]]:
+    """
+    Splits the interval `[0, allocations_number)` into at most `shards_number` contiguous intervals `(start, stop)` of
+    nearly equal lengths.
+    """
+
+    if allocations_number == 0:
+        return []
+
+    shards_number = max(1, min(shards_number, allocations_number))
+    shard_size = -(-allocations_number // shards_number)
+
+    return [(start, min(start + shard_size, allocations_number)) for start in range(0, allocations_number, shard_size)]
+
+
+def parallel_maximin_shares(
+    agents: Agents, items: Items, shards_number: Optional[int] = None, max_workers: Optional[int] = None
+) -> dict[Agent, int]:
+    """
+    Returns a dictionary mapping each agent to her maximin share value, checking all allocations of `items` to
+    `agents` in parallel.
+
+    Gives the same results as `get_maximin_shares`.
+    """
+
+    maximin_shares = reduce_allocations(
+        agents, items, maximin_shares_shard, merge_maximin_shares, None, shards_number, max_workers
+    )
+
+    if len(maximin_shares) == 0:
+        maximin_shares = [0] * agents.size()
+
+    return dict(zip(agents, maximin_shares))
+
+
+def parallel_is_eefx(
+    agents: Agents,
+    items: Items,
+    allocation: Allocation,
+    shards_number: Optional[int] = None,
+    max_workers: Optional[int] = None
+) -> Literal[True] | tuple[Literal[False], Agent]:
+    """
+    Checks if the given `allocation` of `items` to `agents` is epistemic envy-free up to any positively valued good,
+    searching for EFX certificates in parallel. The search for an agent stops as soon as any shard finds a certificate.
+
+    Returns `True` if it is EEFX or tuple `(False, not_satisfied_agent)` otherwise, as `is_eefx`.
+    """
+
+    for agent in agents:
+        other_agents = agents.copy()
+        other_agents.remove_agent(agent)
+
+        other_items = items.copy()
+        for item in allocation.for_agent(agent):
+            other_items.remove_item(item)
+
+        self_valuation = allocation.get_bundle_valuation(agent, agent)
+        valuations = get_valuations_matrix(Agents([agent]), other_items)
+
+        certificate = reduce_allocations(
+            other_agents,
+            other_items,
+            partial(efx_certificate_shard, valuations, self_valuation),
+            merge_efx_certificates,
+            is_certificate,
+            shards_number,
+            max_workers
+        )
+
+        if certificate is None:
+            return (False, agent)
+
+    return True
+
+
+def parallel_optimum(
+    agents: Agents,
+    items: Items,
+    objective: Callable[[Allocation], float],
+    shards_number: Optional[int] = None,
+    max_workers: Optional[int] = None
+) -> Optional[tuple[float, Allocation]]:
+    """
+    Returns a tuple `(value, allocation)` with the allocation of `items` to `agents` maximizing `objective`, checking
+    all allocations in parallel, or `None` if there are no allocations.
+
+    `objective` has to be a picklable (module-level) function. Ties are broken in favor of the allocation that comes
+    first in the order of `all_allocations`.
+    """
+
+    optimum = reduce_allocations(
+        agents, items, partial(optimum_shard, objective), merge_optima, None, shards_number, max_workers
+    )
+
+    if optimum is None:
+        return None
+
+    value, allocation_index = optimum
+    owners = get_owners(allocation_index, agents.size(), items.size())
+
+    return (value, CompactAllocation(owners).to_allocation(agents, items))
+
+
+# -- PRIVATE FUNCTIONS --
+
+def all_owners_with_values(
+    valuations: np.ndarray, n: int, start: int, stop: int
+) -> Iterator[tuple[list[int], np.ndarray]]:
+    """
+    Returns an iterator giving owners of items and valuations of bundles in allocations with indices from `start` to
+    `stop`, where `valuations[i][k]` is the valuation of the `i`-th observer for the `k`-th item.
+
+    The same list and matrix are updated at every step - only columns of the bundles that changed are updated.
+    """
+
+    m = valuations.shape[1]
+    owners = get_owners(start, n, m)
+
+    values = np.zeros((valuations.shape[0], n), dtype=np.int64)
+    for position, owner in enumerate(owners):
+        values[:, owner] += valuations[:, position]
+
+    for _ in range(start, stop):
+        yield owners, values
+
+        for position in range(m):
+            previous_owner = owners[position]
+            owner = previous_owner + 1 if previous_owner + 1 < n else 0
+
+            values[:, previous_owner] -= valuations[:, position]
+            values[:, owner] += valuations[:, position]
+            owners[position] = owner
+
+            if owner != 0:
+                break
+
+
+def maximin_shares_shard(agents: Agents, items: Items, start: int, stop: int, _cancel_event: Any) -> list[int]:
+    maximin_shares = np.zeros(agents.size(), dtype=np.int64)
+    valuations = get_valuations_matrix(agents, items)
+
+    for _, values in all_owners_with_values(valuations, agents.size(), start, stop):
+        np.maximum(maximin_shares, values.min(axis=1), out=maximin_shares)
+
+    return maximin_shares.tolist()
+
+
+def merge_maximin_shares(results: list[list[int]]) -> list[int]:
+    if len(results) == 0:
+        return []
+
+    return np.max(np.array(results), axis=0).tolist()
+
+
+def efx_certificate_shard(
+    valuations: np.ndarray, self_valuation: int, agents: Agents, items: Items, start: int, stop: int, cancel_event: Any
+) -> Optional[CompactAllocation]:
+    valuations_list = valuations[0].tolist()
+
+    for step, (owners, _) in enumerate(all_owners_with_values(valuations, agents.size(), start, stop)):
+        if step % CANCELLATION_CHECK_INTERVAL == 0 and cancel_event.is_set():
+            return None
+
+        if is_efx_certificate(owners, valuations_list, self_valuation, agents.size()):
+            return CompactAllocation(owners)
+
+    return None
+
+
+def merge_efx_certificates(results: list[Optional[CompactAllocation]]) -> Optional[CompactAllocation]:
+    for result in results:
+        if result is not None:
+            return result
+
+    return None
+
+
+def is_certificate(result: Optional[CompactAllocation]) -> bool:
+    return result is not None
+
+
+def optimum_shard(
+    objective: Callable[[Allocation], float], agents: Agents, items: Items, start: int, stop: int, _cancel_event: Any
+) -> Optional[tuple[float, int]]:
+    optimum = None
+
+    for allocation_index, allocation in enumerate(all_allocations(agents, items, start, stop), start):
+        value = objective(allocation)
+
+        if optimum is None or value > optimum[0]:
+            optimum = (value, allocation_index)
+
+    return optimum
+
+
+def merge_optima(results: list[Optional[tuple[float, int]]]) -> Optional[tuple[float, int]]:
+    optimum = None
+
+    # shards are in the order of indices, so the first of equal values is kept
+    for result in results:
+        if result is not None and (optimum is None or result[0] > optimum[0]):
+            optimum = result
+
+    return optimum
@@ -2,7 +2,10 @@ from typing import Literal, Optional
 
 from fairdivision.utils.agents import Agents
 from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.bitset_items import get_universe
+from fairdivision.utils.instance import get_instance
 from fairdivision.utils.items import Items
+from fairdivision.utils.preference_index import PreferenceIndex, get_favorite_item
 
 
 # Implementation of Algorithm 2 from "Multiple birds with one stone: Beating 1/2 for EFX and GMMS via envy cycle
@@ -12,27 +15,34 @@ def round_robin(
         items: Items, 
         allocation: Optional[Allocation] = None, 
         ordering: Optional[list[int]] = None, 
-        steps: int | Literal["inf"] = "inf") -> tuple[Allocation, Items]:
+        steps: int | Literal["inf"] = "inf",
+        preferences: Optional[PreferenceIndex] = None) -> tuple[Allocation, Items]:
     """
     Returns an allocation for the given `agents`, `items` and optional partial `allocation`.
 
     Gives favourite unallocated item to each agent in the order optionally specified by `ordering`. If not specified,
     the ordering is lexicographical. Terminates if either there are no more items to distribute, or `steps` items have
     been assigned by the algorithm.
+
+    Favorite items are found with `preferences` if given, which may be built for any superset of `items`. Without a
+    limit of `steps`, they are built for `agents` and `items` if not given, as all the items are going to be picked.
     """
 
     items_left = items.copy()
 
     if allocation is None:
-        allocation = Allocation(agents)
+        allocation = Allocation(agents, get_universe(items), get_instance(agents, items))
 
     if ordering is None:
         ordering = agents.get_indices()
+
+    if preferences is None and steps == "inf":
+        preferences = PreferenceIndex(agents, items)
     
     step = 0
     while items_left.size() > 0 and (steps == "inf" or step < steps):
         agent = agents.get_agent(ordering[step % agents.size()])
-        favorite_item = agent.get_favorite_item(items_left)
+        favorite_item = get_favorite_item(agent, items_left, preferences)
         
         allocation.allocate(agent, favorite_item)
 
@@ -1,11 +1,124 @@
-import networkx as nx # type: ignore
+import numpy as np
 import random
 from typing import Optional
 
+from fairdivision.utils.aggregates import BundleAggregates
 from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
-from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.allocation import Allocation, AllocationListener
+from fairdivision.utils.bitset_items import get_universe
+from fairdivision.utils.bundle import Bundle
+from fairdivision.utils.envy_graph import EnvyGraph, get_envy_matrix
+from fairdivision.utils.instance import get_instance
+from fairdivision.utils.item import Item
 from fairdivision.utils.items import Items
+from fairdivision.utils.preference_index import PreferenceIndex, get_favorite_item
+
+
+class EFXPreservationState(AllocationListener):
+    """
+    A class keeping what `get_efx_preserving_agent` needs to know about `allocation` and `items_left` while they change.
+
+    The state subscribes to `allocation` and keeps `BundleAggregates` with valuations of all agents for all bundles and
+    for their least valued items, updated in `O(n)` after an item is allocated and in `O(n * k)` after bundles of `k`
+    agents are reallocated. Valuations of agents for their favorite items among `items_left` are found with
+    `preferences` and searched again only after the favorite item is gone. Checking if an agent preserves EFX then
+    takes `O(n)`, assuming additive valuations.
+    """
+
+    def __init__(self, agents: Agents, items_left: Items, allocation: Allocation, preferences: PreferenceIndex):
+        self.aggregates: BundleAggregates = BundleAggregates(agents, allocation)
+
+        self.positions: dict[Agent, int] = {}
+
+        for position, agent in enumerate(self.aggregates.agents):
+            self.positions[agent] = position
+
+        self.items_left: Items = items_left
+        self.preferences: PreferenceIndex = preferences
+
+        n = len(self.aggregates.agents)
+
+        self.favorite_items: list[Optional[Item]] = [None] * n
+        self.favorite_valuations: np.ndarray = np.zeros(n, dtype=np.int64)
+
+        # size and additions of `items_left` when favorite items were last checked
+        self.checked_items_left: Optional[tuple[int, int]] = None
+
+        self.allocation: Allocation = allocation
+        allocation.subscribe(self)
+
+    def on_allocate(self, allocation: Allocation, agent: Agent, item: Item) -> None:
+        self.aggregates.add_item(self.positions[agent], self.aggregates.get_item_valuations(item))
+
+    def on_allocate_bundle(
+        self, allocation: Allocation, agent: Agent, bundle: Bundle, previous_owner: Optional[Agent]
+    ) -> None:
+        self.aggregates.set_bundle(self.positions[agent], bundle)
+
+        if previous_owner is not None:
+            self.aggregates.set_bundle(self.positions[previous_owner], allocation.for_agent(previous_owner))
+
+    def on_reallocate_bundles(self, allocation: Allocation, cycle: list[tuple[Agent, Agent]]) -> None:
+        envious_positions = [self.positions[envious] for envious, _ in cycle]
+        envied_positions = [self.positions[envied] for _, envied in cycle]
+
+        self.aggregates.move_bundles(envied_positions, envious_positions)
+
+    def get_favorite_valuations(self) -> np.ndarray:
+        """
+        Returns valuations of agents for their favorite items among `items_left`.
+        """
+
+        items_left_key = (self.items_left.size(), self.items_left.additions)
+
+        if self.checked_items_left == items_left_key:
+            return self.favorite_valuations
+
+        # items added since the last check may be more valuable than the favorite ones
+        regained = self.checked_items_left is None or self.checked_items_left[1] != items_left_key[1]
+
+        for position, agent in enumerate(self.aggregates.agents):
+            favorite_item = self.favorite_items[position]
+
+            if regained or favorite_item not in self.items_left:
+                favorite_item = self.preferences.get_favorite_item(agent, self.items_left)
+
+                self.favorite_items[position] = favorite_item
+                self.favorite_valuations[position] = agent.get_valuation(favorite_item)
+
+        self.checked_items_left = items_left_key
+
+        return self.favorite_valuations
+
+    def is_efx_preserving(self, agent: Agent) -> bool:
+        """
+        Checks if every other agent stays EFX-satisfied after `agent` receives any item, for a non-empty bundle of
+        `agent`.
+        """
+
+        position = self.positions[agent]
+
+        valuations_of_own = self.aggregates.get_own_valuations()
+        valuations_of_bundle = self.aggregates.totals[:, position]
+        lowest_valuations = self.aggregates.minima[:, position]
+
+        efx_ensuring_valuations = np.maximum(
+            valuations_of_bundle + self.get_favorite_valuations() - lowest_valuations,
+            valuations_of_bundle
+        )
+
+        violations = efx_ensuring_valuations > valuations_of_own
+        violations[position] = False
+
+        return not violations.any()
+
+    def stop(self) -> None:
+        """
+        Unsubscribes from the allocation, after which the state is no longer updated.
+        """
+
+        self.allocation.unsubscribe(self)
 
 
 def xp_ece(agents: Agents, items: Items, max_attempts: int = 1000) -> Allocation:
@@ -17,44 +130,68 @@ def xp_ece(agents: Agents, items: Items, max_attempts: int = 1000) -> Allocation
     uses an envy graph to redistribute bundles if no EFX-preserving agent is present. In case there are simultaneously
     no envy cycles and no agents preserving EFX property, the algorithm starts from scratch. Random choice of the agent
     receiving an item ensures a high probability of a different outcome in each rerun.
+
+    Favorite items are found with one index of preferences shared by all the attempts, and agents preserving EFX are
+    selected with the help of `EFXPreservationState` following each attempt.
     """
 
+    instance = get_instance(agents, items)
+    preferences = PreferenceIndex(agents, items)
+
     for _ in range(max_attempts):
         items_left = items.copy()
-        allocation = Allocation(agents)
+        allocation = Allocation(agents, get_universe(items), instance)
+        state = EFXPreservationState(agents, items_left, allocation, preferences)
 
         while items_left.size() > 0:
-            efx_preserving_agent = get_efx_preserving_agent(agents, items_left, allocation)
+            efx_preserving_agent = get_efx_preserving_agent(agents, items_left, allocation, preferences, state)
+
+            # the envy graph is created once and then only updated after each reallocation
+            envy_graph: Optional[EnvyGraph] = None
 
             while efx_preserving_agent is None:
-                envy_graph = create_envy_graph(agents, allocation)
+                if envy_graph is None:
+                    envy_graph = create_envy_graph(agents, allocation)
 
-                try:
-                    cycle = nx.find_cycle(envy_graph)
+                cycle = envy_graph.find_cycle()
 
-                    reallocate_bundles(cycle, allocation)
-                    efx_preserving_agent = get_efx_preserving_agent(agents, items_left, allocation)
-                except nx.NetworkXNoCycle:
+                if cycle is None:
                     break
 
+                reallocate_bundles(cycle, allocation)
+                envy_graph.rotate_bundles(cycle, allocation)
+
+                efx_preserving_agent = get_efx_preserving_agent(agents, items_left, allocation, preferences, state)
+
             if efx_preserving_agent is None:
                 break
             else:
-                favorite_item = efx_preserving_agent.get_favorite_item(items_left)
+                favorite_item = preferences.get_favorite_item(efx_preserving_agent, items_left)
                 allocation.allocate(efx_preserving_agent, favorite_item)
                 items_left.remove_item(favorite_item)
-        else:
+
+        # the state follows only this attempt, whether the allocation is returned or abandoned
+        state.stop()
+
+        if items_left.size() == 0:
             return allocation
 
     raise Exception("No EFX allocation found")
 
 
-def get_efx_preserving_agent(agents: Agents, items_left: Items, allocation: Allocation) -> Optional[Agent]:
+def get_efx_preserving_agent(
+        agents: Agents,
+        items_left: Items,
+        allocation: Allocation,
+        preferences: Optional[PreferenceIndex] = None,
+        state: Optional[EFXPreservationState] = None) -> Optional[Agent]:
     """
     Returns an agent who, after receiving any item, maintains the EFX property of `allocation`. If no such agent
     exists, it returns None.
 
-    If multiple agents preserve the EFX property, a random one among them is chosen.
+    If multiple agents preserve the EFX property, a random one among them is chosen. Favorite items are found with
+    `preferences` if given. If `state` following `allocation` and `items_left` is given, each agent is checked in
+    `O(n)` with it, and agents are drawn in the same way, so the same agent is returned.
     """
 
     unchecked_agents = agents.copy()
@@ -64,6 +201,9 @@ def get_efx_preserving_agent(agents: Agents, items_left: Items, allocation: Allo
 
         if allocation.for_agent(agent_j).size() == 0:
             return agent_j
+        elif state is not None:
+            if state.is_efx_preserving(agent_j):
+                return agent_j
         else:
             for agent_i in agents:
                 if agent_i != agent_j:
@@ -72,7 +212,8 @@ def get_efx_preserving_agent(agents: Agents, items_left: Items, allocation: Allo
                     # making sure that after allocating an item to agent j, agent i will be still EFX-satisfied
                     valuation_of_j = agent_i.get_valuation(allocation.for_agent(agent_j))
 
-                    best_unallocated_valuation = agent_i.get_valuation(agent_i.get_favorite_item(items_left))
+                    favorite_item = get_favorite_item(agent_i, items_left, preferences)
+                    best_unallocated_valuation = agent_i.get_valuation(favorite_item)
 
                     items_of_j = allocation.for_agent(agent_j).get_items().copy()
 
@@ -98,28 +239,17 @@ def get_efx_preserving_agent(agents: Agents, items_left: Items, allocation: Allo
     return None
 
 
-def create_envy_graph(agents: Agents, allocation: Allocation) -> nx.DiGraph:
+def create_envy_graph(agents: Agents, allocation: Allocation) -> EnvyGraph:
     """
     Creates envy graph from the given `allocation`.
 
     Each node in the graph is an agent. An edge `(i, j)` represents that the agent `i` envies the bundle of agent `j`.
     Only the agents with non-empty bundles can be envied so only envy towards them is checked.
-    """
-
-    graph = nx.DiGraph()
-    graph.add_nodes_from(agents)
-
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
 
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i.envies(agent_j, allocation):
-                graph.add_edge(agent_i, agent_j)
+    The graph is built from the envy matrix computed at once by `get_envy_matrix`.
+    """
 
-    return graph
+    return EnvyGraph(agents, get_envy_matrix(agents, allocation), allocation)
 
 
 def reallocate_bundles(cycle: list[tuple[Agent, Agent]], allocation: Allocation) -> None:
@@ -127,9 +257,4 @@ def reallocate_bundles(cycle: list[tuple[Agent, Agent]], allocation: Allocation)
     Reallocates bundles according to `cycle` from envy graph.
     """
 
-    first_bundle = allocation.for_agent(cycle[0][0])
-
-    for envious, envied in cycle[:-1]:
-        allocation.allocate_bundle(envious, allocation.for_agent(envied))
-
-    allocation.allocate_bundle(cycle[-1][0], first_bundle)
+    allocation.reallocate_bundles(cycle)
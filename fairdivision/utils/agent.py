@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from fairdivision.utils.allocation import Allocation
+    from fairdivision.utils.instance import Instance
 
 from fairdivision.utils.bundle import Bundle
 from fairdivision.utils.item import Item
@@ -13,14 +14,27 @@ class Agent:
     """
     A class representating an agent.
 
-    Contains information about agent's valuations of items.
+    Contains information about agent's valuations of items. If the agent is bound to an `Instance`, valuations of the
+    instance items are read from (and written to) the row of its valuations matrix, and only valuations of the other
+    items are kept in the dictionary.
+
+    `version` grows with every change of valuations made by `assign_valuation` or `assign_valuations`, so that cached
+    results depending on them can be invalidated. `Agent.valuation_changes` counts such changes of all agents, so that
+    results depending on many agents can check in `O(1)` that none of them changed.
     """
 
+    valuation_changes: int = 0
+
     def __init__(self, index: int, valuations_additive: bool = True):
         self.index: int = index
         self.valuations: dict[Item | Bundle, int] = {}
         self.valuations_additive: bool = valuations_additive
 
+        self.instance: Optional[Instance] = None
+        self.row: int = 0
+
+        self.version: int = 0
+
     def __hash__(self):
         return hash(self.index)
 
@@ -36,13 +50,48 @@ class Agent:
     def get_index(self):
         return self.index
 
+    def bind_instance(self, instance: Instance) -> None:
+        self.instance = instance
+        self.row = instance.get_row(self)
+
     def assign_valuation(self, item: Item, valuation: int) -> None:
-        self.valuations[item] = valuation
+        self.version += 1
+        Agent.valuation_changes += 1
+
+        if self.instance is not None and self.instance.has_item(item):
+            self.instance.valuations[self.row, self.instance.get_column(item)] = valuation
+        else:
+            self.valuations[item] = valuation
+
+    def assign_valuations(self, items: Items, valuations: list[int]) -> None:
+        self.version += 1
+        Agent.valuation_changes += 1
+
+        columns = self.instance.get_columns(items) if self.instance is not None else None
+
+        if self.instance is not None and columns is not None:
+            self.instance.valuations[self.row, columns] = valuations
+        else:
+            for item, valuation in zip(items, valuations):
+                self.assign_valuation(item, valuation)
 
     def has_valuation(self, item_or_bundle: Item | Bundle) -> bool:
+        if self.instance is not None and isinstance(item_or_bundle, Item) and self.instance.has_item(item_or_bundle):
+            return True
+
         return item_or_bundle in self.valuations
 
     def get_valuation(self, item_or_bundle: Item | Items | Bundle) -> int:
+        if self.instance is not None and self.valuations_additive:
+            if isinstance(item_or_bundle, Item):
+                column = self.instance.columns.get(item_or_bundle.get_index())
+                if column is not None:
+                    return self.instance.valuations.item(self.row, column)
+            elif isinstance(item_or_bundle, Bundle) or isinstance(item_or_bundle, Items):
+                valuation = self.instance.sum_valuations(self.row, item_or_bundle)
+                if valuation is not None:
+                    return valuation
+
         if (isinstance(item_or_bundle, Bundle) or isinstance(item_or_bundle, Items)) and self.valuations_additive:
             valuation = 0
             for item in item_or_bundle:
@@ -58,6 +107,11 @@ class Agent:
             raise Exception(f"Agent can only have valuation for Item, Items, or Bundle. Got {item_or_bundle}")
 
     def get_favorite_item(self, items: Items) -> Item:
+        if self.instance is not None:
+            favorite_item = self.instance.get_favorite_item(self.row, items)
+            if favorite_item is not None:
+                return favorite_item
+
         if items.size() > 0:
             favorite_item = items.get_items()[0]
             
@@ -70,7 +124,7 @@ class Agent:
             raise Exception("Cannot return a favourite item if there are no items")
 
     def envies(self, other: Agent, allocation: Allocation) -> bool:
-        self_valuation = self.get_valuation(allocation.for_agent(self))
-        other_valuation = self.get_valuation(allocation.for_agent(other))
+        self_valuation = allocation.get_bundle_valuation(self, self)
+        other_valuation = allocation.get_bundle_valuation(self, other)
 
         return other_valuation > self_valuation
@@ -0,0 +1,190 @@
+import numpy as np
+from typing import Optional
+
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.bundle import Bundle
+from fairdivision.utils.instance import Instance, get_common_instance
+from fairdivision.utils.item import Item
+from fairdivision.utils.items import Items
+from fairdivision.utils.memoization import get_agents_key
+
+
+class BundleAggregates:
+    """
+    A class representating aggregated valuations of all agents for all bundles of an allocation.
+
+    For the `i`-th agent and the bundle of the `j`-th agent (agents are in the order of `agents`), contains the
+    valuation of the whole bundle (`totals[i][j]`) and the least (`minima`), the greatest (`maxima`), the second
+    greatest (`second_maxima`) and the least positive (`minima_positive`) valuation of a single item in the bundle.
+    Undefined values are 0, `sizes[j]` is the size of the `j`-th bundle and `has_positive[i][j]` tells if the bundle
+    contains any positively valued item.
+
+    These are enough to check if removing one or two items from a bundle removes envy, assuming additive valuations.
+    """
+
+    def __init__(self, agents: Agents, allocation: Allocation):
+        self.agents: list[Agent] = agents.get_agents()
+
+        n = len(self.agents)
+
+        self.totals: np.ndarray = np.zeros((n, n), dtype=np.int64)
+        self.minima: np.ndarray = np.zeros((n, n), dtype=np.int64)
+        self.maxima: np.ndarray = np.zeros((n, n), dtype=np.int64)
+        self.second_maxima: np.ndarray = np.zeros((n, n), dtype=np.int64)
+        self.minima_positive: np.ndarray = np.zeros((n, n), dtype=np.int64)
+        self.has_positive: np.ndarray = np.zeros((n, n), dtype=bool)
+        self.sizes: np.ndarray = np.zeros(n, dtype=np.int64)
+
+        self.instance: Optional[Instance] = get_common_instance(agents)
+        self.rows: np.ndarray = np.empty(0, dtype=np.intp)
+
+        if self.instance is not None:
+            self.rows = np.array([self.instance.get_row(agent) for agent in self.agents], dtype=np.intp)
+
+        for position, agent in enumerate(self.agents):
+            self.__aggregate_bundle(position, allocation.for_agent(agent))
+
+    def __aggregate_bundle(self, position: int, bundle: Bundle) -> None:
+        size = bundle.size()
+        self.sizes[position] = size
+
+        if size == 0:
+            return
+
+        valuations = self.__get_bundle_valuations(bundle)
+
+        self.totals[:, position] = valuations.sum(axis=1)
+        self.minima[:, position] = valuations.min(axis=1)
+        self.maxima[:, position] = valuations.max(axis=1)
+
+        if size >= 2:
+            self.second_maxima[:, position] = np.partition(valuations, size - 2, axis=1)[:, size - 2]
+
+        positive = valuations > 0
+        self.has_positive[:, position] = positive.any(axis=1)
+        self.minima_positive[:, position] = np.where(positive, valuations, np.iinfo(np.int64).max).min(axis=1)
+        self.minima_positive[~self.has_positive[:, position], position] = 0
+
+    def add_item(self, position: int, valuations: np.ndarray) -> None:
+        """
+        Updates the bundle of the agent at `position` after an item with `valuations` of all agents is added to it.
+        """
+
+        size = self.sizes[position]
+        self.sizes[position] = size + 1
+
+        self.totals[:, position] += valuations
+
+        if size == 0:
+            self.minima[:, position] = valuations
+            self.maxima[:, position] = valuations
+        else:
+            maxima = self.maxima[:, position]
+            replaced = np.minimum(maxima, valuations)
+
+            if size == 1:
+                self.second_maxima[:, position] = replaced
+            else:
+                self.second_maxima[:, position] = np.maximum(self.second_maxima[:, position], replaced)
+
+            self.minima[:, position] = np.minimum(self.minima[:, position], valuations)
+            self.maxima[:, position] = np.maximum(maxima, valuations)
+
+        positive = valuations > 0
+        has_positive = self.has_positive[:, position]
+        minima_positive = self.minima_positive[:, position]
+
+        self.minima_positive[:, position] = np.where(
+            positive, np.where(has_positive, np.minimum(minima_positive, valuations), valuations), minima_positive
+        )
+        self.has_positive[:, position] = has_positive | positive
+
+    def set_bundle(self, position: int, bundle: Bundle) -> None:
+        """
+        Aggregates `bundle` again as the bundle of the agent at `position`.
+        """
+
+        for aggregate in [self.totals, self.minima, self.maxima, self.second_maxima, self.minima_positive]:
+            aggregate[:, position] = 0
+
+        self.has_positive[:, position] = False
+
+        self.__aggregate_bundle(position, bundle)
+
+    def move_bundles(self, source_positions: list[int], target_positions: list[int]) -> None:
+        """
+        Moves bundles from `source_positions` to `target_positions`, as `Allocation.reallocate_bundles`.
+        """
+
+        for aggregate in [self.totals, self.minima, self.maxima, self.second_maxima, self.minima_positive,
+                          self.has_positive]:
+            aggregate[:, target_positions] = aggregate[:, source_positions]
+
+        self.sizes[target_positions] = self.sizes[source_positions]
+
+    def get_item_valuations(self, item: Item) -> np.ndarray:
+        """
+        Returns valuations of all agents for `item`, read from the instance of the agents if possible.
+        """
+
+        if self.instance is not None and self.instance.has_item(item):
+            return self.instance.valuations[self.rows, self.instance.get_column(item)]
+
+        return np.array([agent.get_valuation(item) for agent in self.agents], dtype=np.int64)
+
+    def get_total_valuations(self, items: Items) -> list[int]:
+        """
+        Returns valuations of all agents for all `items`, summed over columns of the instance of the agents at once if
+        possible.
+        """
+
+        if self.instance is not None:
+            columns = self.instance.get_columns(items)
+
+            if columns is not None:
+                return self.instance.valuations[np.ix_(self.rows, columns)].sum(axis=1).tolist()
+
+        return [agent.get_valuation(items) for agent in self.agents]
+
+    def __get_bundle_valuations(self, bundle: Bundle) -> np.ndarray:
+        """
+        Returns a matrix where the element `[i][k]` is the valuation of the `i`-th agent for the `k`-th item of
+        `bundle`, sliced from the instance of the agents if possible.
+        """
+
+        if self.instance is not None:
+            columns = self.instance.get_columns(bundle)
+
+            if columns is not None:
+                return self.instance.valuations[np.ix_(self.rows, columns)]
+
+        return np.array([[agent.get_valuation(item) for item in bundle] for agent in self.agents], dtype=np.int64)
+
+    def get_own_valuations(self) -> np.ndarray:
+        """
+        Returns valuations of agents for their own bundles.
+        """
+
+        return self.totals.diagonal()
+
+    def get_comparable_pairs(self) -> np.ndarray:
+        """
+        Returns a mask of pairs `(i, j)` where the `i`-th agent can envy the `j`-th agent, i.e. they are different
+        agents and the bundle of the `j`-th agent is not empty.
+        """
+
+        n = len(self.agents)
+
+        return (self.sizes > 0)[np.newaxis, :] & ~np.eye(n, dtype=bool)
+
+
+def get_bundle_aggregates(agents: Agents, allocation: Allocation) -> BundleAggregates:
+    """
+    Returns `BundleAggregates` of `allocation` to `agents`.
+
+    The aggregates are cached in `allocation` until it changes, so they must not be updated by the caller.
+    """
+
+    return allocation.get_cached(("aggregates", get_agents_key(agents)), lambda: BundleAggregates(agents, allocation))
@@ -1,24 +1,90 @@
 from __future__ import annotations
-from typing import Iterator
+import numpy as np
+from typing import Any, Callable, Hashable, Iterator, Optional, TypeVar
 
 from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
+from fairdivision.utils.bitset_items import BitsetItems, ItemsUniverse
 from fairdivision.utils.bundle import Bundle
+from fairdivision.utils.instance import Instance
 from fairdivision.utils.item import Item
 from fairdivision.utils.items import Items
 
 
+T = TypeVar("T")
+
+
+class AllocationListener:
+    """
+    A base class for objects notified about changes of an `Allocation` they subscribed to (see `Allocation.subscribe`).
+
+    Every method is called after the change is made and does nothing by default.
+    """
+
+    def on_allocate(self, allocation: Allocation, agent: Agent, item: Item) -> None:
+        pass
+
+    def on_allocate_bundle(
+        self, allocation: Allocation, agent: Agent, bundle: Bundle, previous_owner: Optional[Agent]
+    ) -> None:
+        """
+        `previous_owner` is the agent that `bundle` was taken from, if it was allocated to her before.
+        """
+
+        pass
+
+    def on_reallocate_bundles(self, allocation: Allocation, cycle: list[tuple[Agent, Agent]]) -> None:
+        pass
+
+
 class Allocation:
     """
     A class representating an allocation of Items in Bundles to Agents.
 
-    Contains the allocation and manages all changes to it.
+    Contains the allocation and manages all changes to it. If `universe` is given, bundles are `BitsetItems` from it.
+
+    If `instance` is given, the allocation additionally keeps a matrix `values` where `values[i][j]` is the valuation
+    of the `i`-th agent for the bundle of the `j`-th agent (agents are in the ascending order of indices). Allocating
+    an item updates one column of the matrix, and reallocating bundles moves its columns, so valuations of bundles can
+    be read without summing them. Tracking stops if an item from outside of `instance` is allocated.
+
+    The matrix is read through `get_values`, which compares versions of valuations of the agents with the ones the
+    matrix was computed for. After a change, the matrix is computed again if the agents are bound to `instance`, and
+    tracking stops otherwise, as `instance` is then only a snapshot of their former valuations.
+
+    Subscribed `AllocationListener`s are notified about every change made by `allocate`, `allocate_bundle` and
+    `reallocate_bundles`. Each of these changes also increments `version`, which invalidates all values cached with
+    `get_cached`, and so does a change of valuations of any agent. Bundles changed directly, bypassing the allocation,
+    are not noticed.
     """
 
-    def __init__(self, agents: Agents):
+    def __init__(self, agents: Agents, universe: Optional[ItemsUniverse] = None, instance: Optional[Instance] = None):
         self.allocation: dict[Agent, Bundle] = {}
+        self.universe: Optional[ItemsUniverse] = universe
         self.__initialize_allocation(agents)
 
+        self.instance: Optional[Instance] = instance
+        self.positions: dict[Agent, int] = {}
+        self.rows: np.ndarray = np.empty(0, dtype=np.intp)
+        self.values: Optional[np.ndarray] = None
+
+        # versions of valuations of the agents that `values` are computed for
+        self.values_versions: list[int] = []
+        self.values_changes: int = Agent.valuation_changes
+
+        if instance is not None:
+            self.positions = dict([(agent, position) for position, agent in enumerate(agents)])
+            self.rows = np.array([instance.get_row(agent) for agent in agents], dtype=np.intp)
+            self.values = np.zeros((agents.size(), agents.size()), dtype=np.int64)
+            self.values_versions = [agent.version for agent in agents]
+
+        self.listeners: list[AllocationListener] = []
+
+        self.version: int = 0
+        self.cache: dict[Hashable, Any] = {}
+        self.cache_version: int = 0
+        self.cache_changes: int = Agent.valuation_changes
+
     def __eq__(self, other):
         return self.get_allocation() == other.get_allocation()
 
@@ -33,14 +99,20 @@ class Allocation:
 
     def __initialize_allocation(self, agents: Agents) -> None:
         for agent in agents:
-            bundle = Bundle(Items())
+            bundle = self.__empty_bundle()
             bundle.assign_agent(agent)
             self.allocation[agent] = bundle
 
+    def __empty_bundle(self) -> Bundle:
+        if self.universe is not None:
+            return Bundle(BitsetItems(self.universe))
+        else:
+            return Bundle(Items())
+
     def copy(self) -> Allocation:
         agents = Agents(list(self.allocation.keys()))
 
-        new_allocation = Allocation(agents)
+        new_allocation = Allocation(agents, self.universe, self.instance)
 
         for agent in agents:
             bundle = self.for_agent(agent).copy()
@@ -50,18 +122,145 @@ class Allocation:
 
         return new_allocation
 
+    def subscribe(self, listener: AllocationListener) -> None:
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener: AllocationListener) -> None:
+        self.listeners.remove(listener)
+
+    def get_cached(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """
+        Returns the value cached under `key` for the current version of the allocation, computing it with `compute`
+        first if it is not cached yet.
+        """
+
+        # values computed for former valuations would never be read again, as their keys include versions of agents
+        if self.cache_version != self.version or self.cache_changes != Agent.valuation_changes:
+            self.cache = {}
+            self.cache_version = self.version
+            self.cache_changes = Agent.valuation_changes
+
+        if key not in self.cache:
+            self.cache[key] = compute()
+
+        return self.cache[key]
+
     def allocate(self, agent: Agent, item: Item) -> None:
         self.allocation[agent].add_item(item)
+        self.version += 1
+
+        if self.values is not None and self.instance is not None:
+            column = self.instance.columns.get(item.get_index())
+
+            if column is None:
+                self.values = None
+            else:
+                self.values[:, self.positions[agent]] += self.instance.valuations[self.rows, column]
+
+        for listener in self.listeners:
+            listener.on_allocate(self, agent, item)
 
     def allocate_bundle(self, agent: Agent, bundle: Bundle) -> None:
+        previous_owner = bundle.get_agent()
+        self.version += 1
+
+        if agent not in self.positions:
+            self.values = None
+
+        if self.values is not None:
+            if previous_owner in self.allocation and self.allocation[previous_owner] == bundle:
+                # the bundle is moved together with its column
+                self.values[:, self.positions[agent]] = self.values[:, self.positions[previous_owner]]
+            else:
+                self.__set_bundle_values(agent, bundle)
+
         self.allocation[agent] = bundle
+        emptied_owner = None
 
-        previous_owner = bundle.get_agent()
         if previous_owner in self.allocation and self.allocation[previous_owner] == bundle:
-            self.allocation[previous_owner] = Bundle(Items())
+            self.allocation[previous_owner] = self.__empty_bundle()
+            emptied_owner = previous_owner
+
+            if self.values is not None:
+                self.values[:, self.positions[previous_owner]] = 0
 
         bundle.assign_agent(agent)
 
+        for listener in self.listeners:
+            listener.on_allocate_bundle(self, agent, bundle, emptied_owner)
+
+    def reallocate_bundles(self, cycle: list[tuple[Agent, Agent]]) -> None:
+        """
+        Reallocates bundles according to `cycle` from envy graph.
+
+        Every envious agent from `cycle` receives the bundle of the agent she envies. The columns of `values` are
+        permuted accordingly, without summing any bundle.
+        """
+
+        bundles = [self.allocation[envied] for _, envied in cycle]
+        self.version += 1
+
+        for (envious, _), bundle in zip(cycle, bundles):
+            self.allocation[envious] = bundle
+            bundle.assign_agent(envious)
+
+        if self.values is not None:
+            envious_positions = [self.positions[envious] for envious, _ in cycle]
+            envied_positions = [self.positions[envied] for _, envied in cycle]
+
+            self.values[:, envious_positions] = self.values[:, envied_positions]
+
+        for listener in self.listeners:
+            listener.on_reallocate_bundles(self, cycle)
+
+    def get_values(self) -> Optional[np.ndarray]:
+        """
+        Returns the matrix `values` if it matches the current valuations of the agents, and `None` otherwise.
+        """
+
+        if self.values is not None and self.values_changes != Agent.valuation_changes:
+            self.__refresh_values()
+
+        return self.values
+
+    def get_bundle_valuation(self, agent: Agent, owner: Agent) -> int:
+        """
+        Returns the valuation of `agent` for the bundle of `owner`.
+        """
+
+        values = self.get_values()
+
+        if values is not None and agent in self.positions:
+            return values.item(self.positions[agent], self.positions[owner])
+        else:
+            return agent.get_valuation(self.for_agent(owner))
+
+    def __refresh_values(self) -> None:
+        self.values_changes = Agent.valuation_changes
+        versions = [agent.version for agent in self.positions]
+
+        if versions == self.values_versions:
+            return
+
+        self.values_versions = versions
+
+        # a snapshot instance does not follow the changes, so the matrix cannot be computed again from it
+        if not all(agent.instance is self.instance for agent in self.positions):
+            self.values = None
+            return
+
+        for agent in self.positions:
+            self.__set_bundle_values(agent, self.allocation[agent])
+
+    def __set_bundle_values(self, agent: Agent, bundle: Bundle) -> None:
+        if self.values is not None and self.instance is not None:
+            columns = self.instance.get_columns(bundle)
+
+            if columns is None:
+                self.values = None
+            else:
+                self.values[:, self.positions[agent]] = self.instance.valuations[np.ix_(self.rows, columns)].sum(axis=1)
+
     def for_agent(self, agent: Agent) -> Bundle:
         if agent in self.allocation:
             return self.allocation[agent]
@@ -0,0 +1,288 @@
+import numpy as np
+from typing import Iterable, Optional
+
+from fairdivision.algorithms.all_allocations import get_valuations_matrix
+from fairdivision.utils.aggregates import BundleAggregates
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.compact_allocation import CompactAllocation, compact_allocation
+from fairdivision.utils.items import Items
+
+
+# the largest number of elements of temporary tensors, allocations are checked in chunks to stay below it
+CHUNK_ELEMENTS = 2 ** 22
+
+# sums of valuations below this are computed exactly with floating point matrix multiplication
+EXACT_FLOAT_LIMIT = 2 ** 53
+
+
+class BatchAggregates:
+    """
+    A class representating aggregated valuations of bundles in a batch of allocations.
+
+    `owners` is a `B x m` array of owners of items (as in `CompactAllocation`) and `valuations` is a `n x m` matrix of
+    valuations of agents for items. `totals[b][i][j]` is the valuation of the `i`-th agent for the bundle of the `j`-th
+    agent in the `b`-th allocation and `sizes[b][j]` is the size of the bundle. If `with_extrema` is set, the least
+    (`minima`) and the greatest (`maxima`) valuations of a single item in each bundle are computed as well (0 for
+    empty bundles).
+    """
+
+    def __init__(self, owners: np.ndarray, valuations: np.ndarray, with_extrema: bool = False):
+        n, m = valuations.shape
+
+        # `in_bundle[b][k][j]` tells if the `k`-th item belongs to the `j`-th agent in the `b`-th allocation
+        in_bundle = owners[:, :, np.newaxis] == np.arange(n)
+
+        if valuations.size == 0 or np.abs(valuations).sum(axis=1).max() < EXACT_FLOAT_LIMIT:
+            self.totals: np.ndarray = np.rint(valuations.astype(np.float64) @ in_bundle).astype(np.int64)
+        else:
+            self.totals = np.einsum("ik,bkj->bij", valuations, in_bundle.astype(np.int64))
+
+        self.sizes: np.ndarray = in_bundle.sum(axis=1)
+
+        self.minima: Optional[np.ndarray] = None
+        self.maxima: Optional[np.ndarray] = None
+
+        if with_extrema:
+            self.minima = get_bundle_extrema(owners, valuations, np.minimum, np.iinfo(np.int64).max)
+            self.maxima = get_bundle_extrema(owners, valuations, np.maximum, np.iinfo(np.int64).min)
+
+            empty = np.broadcast_to((self.sizes == 0)[:, np.newaxis, :], self.minima.shape)
+            self.minima[empty] = 0
+            self.maxima[empty] = 0
+
+    def get_own_valuations(self) -> np.ndarray:
+        """
+        Returns a `B x n x 1` array of valuations of agents for their own bundles.
+        """
+
+        return np.diagonal(self.totals, axis1=1, axis2=2)[:, :, np.newaxis]
+
+    def get_comparable_pairs(self) -> np.ndarray:
+        """
+        Returns a mask of pairs `(i, j)` where the `i`-th agent can envy the `j`-th agent in each allocation.
+        """
+
+        n = self.totals.shape[1]
+
+        return (self.sizes > 0)[:, np.newaxis, :] & ~np.eye(n, dtype=bool)
+
+
+def stack_owners(agents: Agents, items: Items, allocations: Iterable[Allocation | CompactAllocation]) -> np.ndarray:
+    """
+    Returns a `B x m` array of owners of `items` in `allocations` to `agents`, as in `CompactAllocation`.
+    """
+
+    owners = []
+
+    for allocation in allocations:
+        if isinstance(allocation, Allocation):
+            allocation = compact_allocation(agents, items, allocation)
+
+        owners.append(allocation.owners)
+
+    return np.array(owners, dtype=np.int32).reshape(len(owners), items.size())
+
+
+def batch_is_ef(owners: np.ndarray, valuations: np.ndarray) -> np.ndarray:
+    """
+    Returns a boolean vector telling which of the allocations in `owners` are envy-free, for `valuations` of agents.
+    """
+
+    return map_chunks(owners, valuations, False, lambda aggregates: ~has_violation(get_ef_violations(aggregates)))
+
+
+def batch_is_ef1(owners: np.ndarray, valuations: np.ndarray) -> np.ndarray:
+    """
+    Returns a boolean vector telling which of the allocations in `owners` are envy-free up to one good, for
+    `valuations` of agents.
+    """
+
+    return map_chunks(owners, valuations, True, lambda aggregates: ~has_violation(get_ef1_violations(aggregates)))
+
+
+def batch_highest_ef1_approximation(owners: np.ndarray, valuations: np.ndarray) -> np.ndarray:
+    """
+    Returns a vector of the highest `a` such that each of the allocations in `owners` is a-EF1, as
+    `highest_ef1_approximation`.
+    """
+
+    def approximation(aggregates: BatchAggregates) -> np.ndarray:
+        other_valuations = aggregates.totals - aggregates.maxima
+
+        return get_lowest_ratios(aggregates.get_own_valuations(), other_valuations, get_ef1_violations(aggregates))
+
+    return round_ratios(map_chunks(owners, valuations, True, approximation))
+
+
+def batch_is_efx0(owners: np.ndarray, valuations: np.ndarray) -> np.ndarray:
+    """
+    Returns a boolean vector telling which of the allocations in `owners` are envy-free up to any good, for
+    `valuations` of agents.
+    """
+
+    return map_chunks(owners, valuations, True, lambda aggregates: ~has_violation(get_efx0_violations(aggregates)))
+
+
+def batch_highest_efx0_approximation(owners: np.ndarray, valuations: np.ndarray) -> np.ndarray:
+    """
+    Returns a vector of the highest `a` such that each of the allocations in `owners` is a-EFX0, as
+    `highest_efx0_approximation`.
+    """
+
+    def approximation(aggregates: BatchAggregates) -> np.ndarray:
+        other_valuations = aggregates.totals - aggregates.minima
+
+        return get_lowest_ratios(aggregates.get_own_valuations(), other_valuations, get_efx0_violations(aggregates))
+
+    return round_ratios(map_chunks(owners, valuations, True, approximation))
+
+
+def batch_is_prop(owners: np.ndarray, valuations: np.ndarray) -> np.ndarray:
+    """
+    Returns a boolean vector telling which of the allocations in `owners` are proportional, for `valuations` of agents
+    for all items.
+    """
+
+    proportional_shares = valuations.sum(axis=1) / valuations.shape[0]
+
+    def is_prop(aggregates: BatchAggregates) -> np.ndarray:
+        own_valuations = aggregates.get_own_valuations()[:, :, 0]
+
+        return ~(own_valuations < proportional_shares).any(axis=1)
+
+    return map_chunks(owners, valuations, False, is_prop)
+
+
+def batch_highest_prop_approximation(owners: np.ndarray, valuations: np.ndarray) -> np.ndarray:
+    """
+    Returns a vector of the highest `a` such that each of the allocations in `owners` is a-PROP, as
+    `highest_prop_approximation`.
+    """
+
+    proportional_shares = valuations.sum(axis=1) / valuations.shape[0]
+
+    def approximation(aggregates: BatchAggregates) -> np.ndarray:
+        own_valuations = aggregates.get_own_valuations()[:, :, 0]
+        violations = own_valuations < proportional_shares
+
+        ratios = np.divide(
+            own_valuations, proportional_shares, out=np.full(violations.shape, np.inf), where=violations
+        )
+
+        return np.minimum(1.0, ratios.min(axis=1, initial=np.inf))
+
+    return round_ratios(map_chunks(owners, valuations, False, approximation))
+
+
+def batch_check(agents: Agents, items: Items, allocations: Iterable[Allocation | CompactAllocation]) -> dict:
+    """
+    Returns a dictionary mapping names of checked properties to vectors of results for all `allocations` of `items`
+    to `agents`.
+    """
+
+    owners = stack_owners(agents, items, allocations)
+    valuations = get_valuations_matrix(agents, items)
+
+    return {
+        "ef": batch_is_ef(owners, valuations),
+        "ef1": batch_is_ef1(owners, valuations),
+        "efx0": batch_is_efx0(owners, valuations),
+        "prop": batch_is_prop(owners, valuations),
+        "highest_ef1_approximation": batch_highest_ef1_approximation(owners, valuations),
+        "highest_efx0_approximation": batch_highest_efx0_approximation(owners, valuations),
+        "highest_prop_approximation": batch_highest_prop_approximation(owners, valuations)
+    }
+
+
+# -- PRIVATE FUNCTIONS --
+
+def map_chunks(owners: np.ndarray, valuations: np.ndarray, with_extrema: bool, function) -> np.ndarray:
+    """
+    Applies `function` to `BatchAggregates` of consecutive chunks of `owners` and concatenates the results.
+    """
+
+    n, m = valuations.shape
+    chunk_size = max(1, CHUNK_ELEMENTS // max(1, n * n * m))
+
+    results = [
+        function(BatchAggregates(owners[start:start + chunk_size], valuations, with_extrema))
+        for start in range(0, len(owners), chunk_size)
+    ]
+
+    if len(results) == 0:
+        return np.zeros(0)
+
+    return np.concatenate(results)
+
+
+def get_bundle_extrema(owners: np.ndarray, valuations: np.ndarray, ufunc: np.ufunc, initial: int) -> np.ndarray:
+    """
+    Returns a `B x n x n` array where the element `[b][i][j]` is the result of `ufunc` (`np.minimum` or `np.maximum`)
+    over valuations of the `i`-th agent for items in the bundle of the `j`-th agent in the `b`-th allocation, and
+    `initial` for empty bundles.
+
+    Each valuation is scattered once with `ufunc.at`, which is much faster than masking a `B x n x m x n` tensor.
+    """
+
+    batch_size, m = owners.shape
+    n = valuations.shape[0]
+
+    # unallocated items go to an additional bundle, which is dropped at the end
+    bundles = np.where(owners < 0, n, owners).astype(np.intp)
+    positions = (np.arange(batch_size * n, dtype=np.intp).reshape(batch_size, n, 1) * (n + 1)
+                 + bundles[:, np.newaxis, :])
+
+    extrema = np.full(batch_size * n * (n + 1), initial, dtype=np.int64)
+    ufunc.at(extrema, positions.ravel(), np.broadcast_to(valuations, (batch_size, n, m)).ravel())
+
+    return extrema.reshape(batch_size, n, n + 1)[:, :, :n]
+
+
+def has_violation(violations: np.ndarray) -> np.ndarray:
+    """
+    Returns a mask of allocations of a batch with at least one pair of agents in `violations`.
+    """
+
+    return np.asarray(violations.any(axis=(1, 2)))
+
+
+def get_ef_violations(aggregates: BundleAggregates | BatchAggregates) -> np.ndarray:
+    """
+    Returns a mask of pairs `(i, j)` where the `i`-th agent envies the `j`-th agent, in a single allocation or in each
+    allocation of a batch.
+    """
+
+    # valuations of own bundles are compared along rows, whether they are given as a vector or a column
+    own_valuations = aggregates.get_own_valuations().reshape(aggregates.totals.shape[:-1] + (1,))
+
+    return aggregates.get_comparable_pairs() & (aggregates.totals > own_valuations)
+
+
+def get_ef1_violations(aggregates: BatchAggregates) -> np.ndarray:
+    envy = aggregates.totals - aggregates.maxima > aggregates.get_own_valuations()
+
+    return aggregates.get_comparable_pairs() & envy
+
+
+def get_efx0_violations(aggregates: BatchAggregates) -> np.ndarray:
+    envy = aggregates.totals - aggregates.minima > aggregates.get_own_valuations()
+
+    return aggregates.get_comparable_pairs() & envy
+
+
+def get_lowest_ratios(own_valuations: np.ndarray, other_valuations: np.ndarray, violations: np.ndarray) -> np.ndarray:
+    # assumes non-negative valuations
+    ratios = np.divide(
+        np.broadcast_to(own_valuations, violations.shape),
+        other_valuations,
+        out=np.full(violations.shape, np.inf),
+        where=violations
+    )
+
+    return np.minimum(1.0, ratios.min(axis=(1, 2), initial=np.inf))
+
+
+def round_ratios(ratios: np.ndarray) -> np.ndarray:
+    # rounded as a Python `float`, to give exactly the same results as the single allocation checkers
+    return np.array([round(ratio, 3) for ratio in ratios.tolist()])
@@ -0,0 +1,199 @@
+from __future__ import annotations
+import numpy as np
+from typing import Iterator, Optional
+
+from fairdivision.utils.item import Item
+from fairdivision.utils.items import Items
+
+
+class ItemsUniverse:
+    """
+    A class representating a fixed collection of items that `BitsetItems` are subsets of.
+
+    Each item has a position in the universe, which is its rank in the ascending order of indices.
+    """
+
+    def __init__(self, items: Items):
+        self.items: list[Item] = items.get_items().copy()
+        self.positions: dict[int, int] = dict([
+            (item.get_index(), position) for position, item in enumerate(self.items)
+        ])
+
+    def __repr__(self):
+        return f"ItemsUniverse({self.items})"
+
+    def __str__(self):
+        return repr(self)
+
+    def __contains__(self, item):
+        return item.get_index() in self.positions
+
+    def get_position(self, item: Item) -> int:
+        if item.get_index() in self.positions:
+            return self.positions[item.get_index()]
+        else:
+            raise Exception(f"{self} does not contain {item}")
+
+    def get_item(self, position: int) -> Item:
+        return self.items[position]
+
+    def size(self) -> int:
+        return len(self.items)
+
+
+class BitsetItems(Items):
+    """
+    A class representating a collection of items as a subset of an `ItemsUniverse`.
+
+    The subset is stored as an integer bitmask where the `i`-th bit is set if the item on the `i`-th position of the
+    universe belongs to the collection. Membership, adding and removing only touch one bit, set operations work on
+    whole machine words, and the list of items sorted by indices is produced on demand.
+
+    Has the same public interface as `Items`, so it can be used anywhere `Items` are expected. The attributes `items`
+    and `sorted_items` of `Items` are read-only properties here, built from the mask on every access.
+    """
+
+    def __init__(self, universe: ItemsUniverse, items_list: list[Item] = [], mask: int = 0):
+        self.universe: ItemsUniverse = universe
+        self.mask: int = mask
+        self.count: int = mask.bit_count()
+
+        # incremented by `add_item`, so that structures remembering absent items know when they may come back
+        self.additions: int = 0
+
+        for item in items_list:
+            self.add_item(item)
+
+    def __eq__(self, other):
+        if isinstance(other, BitsetItems) and other.universe is self.universe:
+            return self.mask == other.mask
+
+        return self.get_items() == other.get_items()
+
+    def __iter__(self) -> Iterator[Item]:
+        return self.get_items().__iter__()
+
+    def __contains__(self, item):
+        position = self.universe.positions.get(item.get_index())
+
+        return position is not None and (self.mask >> position) & 1 == 1
+
+    def __repr__(self):
+        return f"BitsetItems({self.get_items()})"
+
+    @property
+    def items(self) -> dict[int, Item]:  # type: ignore[override]
+        """
+        A dictionary that has item's index as a key, and the corresponding item as value, as in `Items`. It is built from
+        the mask, so changing it does not change the collection.
+        """
+
+        return dict([(item.get_index(), item) for item in self.get_items()])
+
+    @property
+    def sorted_items(self) -> list[Item]:  # type: ignore[override]
+        """
+        A list of items sorted in an ascending order of their indices, as in `Items`. It is built from the mask, so
+        changing it does not change the collection.
+        """
+
+        return self.get_items()
+
+    def __str__(self):
+        return repr(self)
+
+    def copy(self) -> BitsetItems:
+        return BitsetItems(self.universe, mask=self.mask)
+
+    def add_item(self, item: Item) -> None:
+        self.additions += 1
+        bit = 1 << self.universe.get_position(item)
+
+        if not self.mask & bit:
+            self.mask |= bit
+            self.count += 1
+
+    def get_item(self, index: int) -> Item:
+        position = self.universe.positions.get(index)
+
+        if position is not None and (self.mask >> position) & 1 == 1:
+            return self.universe.get_item(position)
+        else:
+            raise Exception(f"{self} does not contain item with index {index}")
+
+    def remove_item(self, index_or_item: int | Item) -> None:
+        if isinstance(index_or_item, int):
+            item = self.get_item(index_or_item)
+        elif isinstance(index_or_item, Item):
+            item = index_or_item
+        else:
+            raise Exception(f"To delete an item from items, index or Item object was expected, got {index_or_item}")
+
+        bit = 1 << self.universe.get_position(item)
+
+        if not self.mask & bit:
+            raise Exception(f"{self} does not contain {item}")
+
+        self.mask ^= bit
+        self.count -= 1
+
+    def get_positions(self) -> np.ndarray:
+        """
+        Returns positions of the items in the universe in the ascending order.
+        """
+
+        if self.mask == 0:
+            return np.empty(0, dtype=np.intp)
+
+        size = self.universe.size()
+        mask_bytes = np.frombuffer(self.mask.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+
+        return np.flatnonzero(np.unpackbits(mask_bytes, bitorder="little")[:size])
+
+    def get_items(self) -> list[Item]:
+        return [self.universe.items[position] for position in self.get_positions().tolist()]
+
+    def get_indices(self) -> list[int]:
+        return list(map(lambda item: item.get_index(), self.get_items()))
+
+    def size(self) -> int:
+        return self.count
+
+    def union(self, other: BitsetItems) -> BitsetItems:
+        return BitsetItems(self.universe, mask=self.mask | self.__other_mask(other))
+
+    def intersection(self, other: BitsetItems) -> BitsetItems:
+        return BitsetItems(self.universe, mask=self.mask & self.__other_mask(other))
+
+    def difference(self, other: BitsetItems) -> BitsetItems:
+        return BitsetItems(self.universe, mask=self.mask & ~self.__other_mask(other))
+
+    def __other_mask(self, other: BitsetItems) -> int:
+        if other.universe is not self.universe:
+            raise Exception("Set operations are only supported for BitsetItems from the same universe")
+
+        return other.mask
+
+
+def to_bitset_items(items: Items, universe: Optional[ItemsUniverse] = None) -> BitsetItems:
+    """
+    Converts `items` into `BitsetItems` from the given `universe`.
+
+    If `universe` is not given, a new one is created out of `items`.
+    """
+
+    if universe is None:
+        universe = ItemsUniverse(items)
+
+    return BitsetItems(universe, items.get_items())
+
+
+def get_universe(items: Items) -> Optional[ItemsUniverse]:
+    """
+    Returns the universe of `items` if they are `BitsetItems`, and `None` otherwise.
+    """
+
+    if isinstance(items, BitsetItems):
+        return items.universe
+    else:
+        return None
@@ -21,11 +21,7 @@ class Bundle:
         self.agent: Optional[Agent] = None
 
     def __hash__(self):
-        curr_hash = 0
-        for item in self.items:
-            curr_hash += item.__hash__()
-
-        return hash(curr_hash)
+        return hash(tuple(self.items.get_indices()))
 
     def __eq__(self, other):
         return self.get_items() == other.get_items() and self.get_agent() == other.get_agent()
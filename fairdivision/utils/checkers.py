@@ -1,14 +1,20 @@
-from typing import Literal
-
-from fairdivision.algorithms.all_allocations import all_allocations
+import numpy as np
+from typing import Literal, Optional
 
+from fairdivision.utils.aggregates import BundleAggregates, get_bundle_aggregates
 from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
 from fairdivision.utils.allocation import Allocation
-from fairdivision.utils.helpers import get_maximin_shares
+from fairdivision.utils.efx_certificate import find_efx_certificate
+from fairdivision.utils.envy_graph import get_envy_matrix
+from fairdivision.utils.helpers import get_maximin_share_bounds, get_maximin_shares
 from fairdivision.utils.items import Items
+from fairdivision.utils.maximin_share import get_agent_maximin_share
+from fairdivision.utils.memoization import memoize_checker
+from fairdivision.utils.preference_index import PreferenceIndex, get_favorite_item
 
 
+@memoize_checker
 def is_ef(agents: Agents, allocation: Allocation) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
     """
     Checks if the given `allocation` to `agents` is envy-free.
@@ -16,396 +22,241 @@ def is_ef(agents: Agents, allocation: Allocation) -> Literal[True] | tuple[Liter
     Returns `True` if it is EF or tuple `(False, (evious_agent, envied_agent))` otherwise.
     """
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-     
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i != agent_j:
-                if agent_i.envies(agent_j, allocation):
-                    return (False, (agent_i, agent_j))
-                
+    envy = np.flatnonzero(get_envy_matrix(agents, allocation))
+
+    if len(envy) > 0:
+        # the first envious agent and the first agent envied by her, as when checking pairs in order
+        agent_i, agent_j = divmod(int(envy[0]), agents.size())
+
+        return (False, (agents.get_agents()[agent_i], agents.get_agents()[agent_j]))
+
     return True
 
-def is_efx0(agents: Agents, allocation: Allocation) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
+@memoize_checker
+def is_efx0(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
     """
     Checks if the given `allocation` to `agents` is envy-free up to any good.
 
     Returns `True` if it is EFX0 or tuple `(False, (evious_agent, envied_agent))` otherwise.
     """
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i != agent_j:
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
-                for item_to_remove in allocation.for_agent(agent_j):
-                    items_subset = allocation.for_agent(agent_j).copy()
-                    items_subset.remove_item(item_to_remove)
+    return get_first_violation(aggregates, get_efx0_violations(aggregates))
 
-                    valuation_of_j = agent_i.get_valuation(items_subset)
 
-                    if valuation_of_j > valuation_of_i:
-                        return (False, (agent_i, agent_j))
-                
-    return True
-
-
-def highest_efx0_approximation(agents: Agents, allocation: Allocation) -> float:
+@memoize_checker
+def highest_efx0_approximation(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> float:
     """
     Checks what is the highest `a` such that `allocation` is a-EFX0.  
 
     The result is rounded to 3 decimal places. If `allocation` is EFX0, returns `1`.
     """
 
-    alpha = 1.0
-
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i != agent_j:
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
+    # removing the least valuable item leaves the most valuable subset
+    other_valuations = aggregates.totals - aggregates.minima
 
-                for item_to_remove in allocation.for_agent(agent_j):
-                    items_subset = allocation.for_agent(agent_j).copy()
-                    items_subset.remove_item(item_to_remove)
+    return get_lowest_ratio(aggregates, other_valuations, get_efx0_violations(aggregates))
 
-                    valuation_of_j = agent_i.get_valuation(items_subset)
 
-                    if valuation_of_j > valuation_of_i:
-                        # assumes non-negative valuations
-                        alpha = min(alpha, valuation_of_i / valuation_of_j)
-                
-    return round(alpha, 3)
-
-
-def efx0_satisfied_fraction(agents: Agents, allocation: Allocation) -> float:
+@memoize_checker
+def efx0_satisfied_fraction(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> float:
     """
     Returns a fraction of `agents` that are not envious up to any good.
 
     Returns 1 if `allocation` is EFX0. 
     """
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-
-    efx_satisfied_agents_number = 0
-
-    for agent_i in agents:
-        is_efx_satisfied = True
-        for agent_j in possibly_envied_agents:
-            if not is_efx_satisfied:
-                break
-
-            if agent_i != agent_j:
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
-
-                for item_to_remove in allocation.for_agent(agent_j):
-                    items_subset = allocation.for_agent(agent_j).copy()
-                    items_subset.remove_item(item_to_remove)
-
-                    valuation_of_j = agent_i.get_valuation(items_subset)
-
-                    if valuation_of_j > valuation_of_i:
-                        is_efx_satisfied = False
-                        break
-        
-        if is_efx_satisfied:
-            efx_satisfied_agents_number += 1
-
-    return round(efx_satisfied_agents_number / agents.size(), 3)
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
+    return get_satisfied_fraction(get_efx0_violations(aggregates))
 
 
-def is_efx(agents: Agents, allocation: Allocation) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
+@memoize_checker
+def is_efx(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
     """
     Checks if the given `allocation` to `agents` is envy-free up to any positively valued good.
 
     Returns `True` if it is EFX or tuple `(False, (evious_agent, envied_agent))` otherwise.
     """
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i != agent_j:
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
-                for item_to_remove in allocation.for_agent(agent_j):
-                    if agent_i.get_valuation(item_to_remove) > 0:
-                        items_subset = allocation.for_agent(agent_j).copy()
-                        items_subset.remove_item(item_to_remove)
+    return get_first_violation(aggregates, get_efx_violations(aggregates))
 
-                        valuation_of_j = agent_i.get_valuation(items_subset)
-
-                        if valuation_of_j > valuation_of_i:
-                            return (False, (agent_i, agent_j))
-                
-    return True
 
-
-def highest_efx_approximation(agents: Agents, allocation: Allocation) -> float:
+@memoize_checker
+def highest_efx_approximation(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> float:
     """
     Checks what is the highest `a` such that `allocation` is a-EFX.  
 
     The result is rounded to 3 decimal places. If `allocation` is EFX, returns `1`.
     """
 
-    alpha = 1.0
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
+    # removing the least positively valued item leaves the most valuable subset
+    other_valuations = aggregates.totals - aggregates.minima_positive
 
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i != agent_j:
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
+    return get_lowest_ratio(aggregates, other_valuations, get_efx_violations(aggregates))
 
-                for item_to_remove in allocation.for_agent(agent_j):
-                    if agent_i.get_valuation(item_to_remove) > 0:
-                        items_subset = allocation.for_agent(agent_j).copy()
-                        items_subset.remove_item(item_to_remove)
 
-                        valuation_of_j = agent_i.get_valuation(items_subset)
-
-                        if valuation_of_j > valuation_of_i:
-                            # assumes non-negative valuations
-                            alpha = min(alpha, valuation_of_i / valuation_of_j)
-                
-    return round(alpha, 3)
-
-
-def efx_satisfied_fraction(agents: Agents, allocation: Allocation) -> float:
+@memoize_checker
+def efx_satisfied_fraction(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> float:
     """
     Returns a fraction of `agents` that are not envious up to any positively valued good.
 
     Returns 1 if `allocation` is EFX. 
     """
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-
-    efx_satisfied_agents_number = 0
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
-    for agent_i in agents:
-        is_efx_satisfied = True
-        for agent_j in possibly_envied_agents:
-            if not is_efx_satisfied:
-                break
+    return get_satisfied_fraction(get_efx_violations(aggregates))
 
-            if agent_i != agent_j:
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
 
-                for item_to_remove in allocation.for_agent(agent_j):
-                    if agent_i.get_valuation(item_to_remove) > 0:
-                        items_subset = allocation.for_agent(agent_j).copy()
-                        items_subset.remove_item(item_to_remove)
-
-                        valuation_of_j = agent_i.get_valuation(items_subset)
-
-                        if valuation_of_j > valuation_of_i:
-                            is_efx_satisfied = False
-                            break
-        
-        if is_efx_satisfied:
-            efx_satisfied_agents_number += 1
-
-    return round(efx_satisfied_agents_number / agents.size(), 3)
-
-
-def is_ef2(agents: Agents, allocation: Allocation) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
+@memoize_checker
+def is_ef2(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
     """
     Checks if the given `allocation` to `agents` is envy-free up to two goods.
 
     Returns `True` if it is EF2 or tuple `(False, (evious_agent, envied_agent))` otherwise.
     """
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i != agent_j:
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
-                items_to_check = min(2, allocation.for_agent(agent_j).size())
+    own_valuations = aggregates.get_own_valuations()[:, np.newaxis]
 
-                for item_to_remove in allocation.for_agent(agent_j):
-                    items_subset = allocation.for_agent(agent_j).copy()
-                    items_subset.remove_item(item_to_remove)
+    # two different items have to remove envy on their own, unless the bundle has only one item
+    has_two_items = (aggregates.sizes >= 2)[np.newaxis, :]
+    second_item_envy = aggregates.totals - aggregates.second_maxima > own_valuations
+    first_item_envy = aggregates.totals - aggregates.maxima > own_valuations
 
-                    valuation_of_j = agent_i.get_valuation(items_subset)
+    violations = aggregates.get_comparable_pairs() & np.where(has_two_items, second_item_envy, first_item_envy)
 
-                    if valuation_of_i >= valuation_of_j:
-                        items_to_check -= 1
-                        if items_to_check == 0:
-                            break
-                else:
-                    return (False, (agent_i, agent_j)) 
-                
-    return True
+    return get_first_violation(aggregates, violations)
 
 
-def is_ef1(agents: Agents, allocation: Allocation) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
+@memoize_checker
+def is_ef1(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
     """
     Checks if the given `allocation` to `agents` is envy-free up to one good.
 
     Returns `True` if it is EF1 or tuple `(False, (evious_agent, envied_agent))` otherwise.
     """
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i != agent_j:
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
-                for item_to_remove in allocation.for_agent(agent_j):
-                    items_subset = allocation.for_agent(agent_j).copy()
-                    items_subset.remove_item(item_to_remove)
+    return get_first_violation(aggregates, get_ef1_violations(aggregates))
 
-                    valuation_of_j = agent_i.get_valuation(items_subset)
 
-                    if valuation_of_i >= valuation_of_j:
-                        break
-                else:
-                    return (False, (agent_i, agent_j)) 
-                
-    return True
-
-
-def highest_ef1_approximation(agents: Agents, allocation: Allocation) -> float:
+@memoize_checker
+def highest_ef1_approximation(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> float:
     """
     Checks what is the highest `a` such that `allocation` is a-EF1.  
 
     The result is rounded to 3 decimal places. If `allocation` is EF1, returns `1`.
     """
 
-    alpha = 1.0
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-
-    for agent_i in agents:
-        for agent_j in possibly_envied_agents:
-            if agent_i != agent_j:
-                agent_i_alpha = 0.0
-
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
-
-                for item_to_remove in allocation.for_agent(agent_j):
-                    items_subset = allocation.for_agent(agent_j).copy()
-                    items_subset.remove_item(item_to_remove)
-
-                    valuation_of_j = agent_i.get_valuation(items_subset)
-
-                    if valuation_of_i >= valuation_of_j:
-                        break
-                    else:
-                        agent_i_alpha = max(agent_i_alpha, valuation_of_i / valuation_of_j)
-                else:
-                    # assumes non-negative valuations
-                    alpha = min(alpha, agent_i_alpha)
-                
-    return round(alpha, 3)
+    # removing the most valuable item leaves the least valuable subset
+    other_valuations = aggregates.totals - aggregates.maxima
+
+    return get_lowest_ratio(aggregates, other_valuations, get_ef1_violations(aggregates))
 
 
-def ef1_satisfied_fraction(agents: Agents, allocation: Allocation) -> float:
+@memoize_checker
+def ef1_satisfied_fraction(
+    agents: Agents, allocation: Allocation, aggregates: Optional[BundleAggregates] = None
+) -> float:
     """
     Returns a fraction of `agents` that are not envious up to one good.
 
     Returns 1 if `allocation` is EF1. 
     """
 
-    possibly_envied_agents = agents.copy()
-    for agent in agents:
-        if allocation.for_agent(agent).size() == 0:
-            possibly_envied_agents.remove_agent(agent)
-
-    ef1_satisfied_agents_number = 0
-
-    for agent_i in agents:
-        is_ef1_satisfied = True
-        for agent_j in possibly_envied_agents:
-            if not is_ef1_satisfied:
-                break
-
-            if agent_i != agent_j:
-                valuation_of_i = agent_i.get_valuation(allocation.for_agent(agent_i))
-
-                for item_to_remove in allocation.for_agent(agent_j):
-                    items_subset = allocation.for_agent(agent_j).copy()
-                    items_subset.remove_item(item_to_remove)
-
-                    valuation_of_j = agent_i.get_valuation(items_subset)
-
-                    if valuation_of_i >= valuation_of_j:
-                        break
-                else:
-                    is_ef1_satisfied = False
+    if aggregates is None:
+        aggregates = get_bundle_aggregates(agents, allocation)
 
-        if is_ef1_satisfied:
-            ef1_satisfied_agents_number += 1
+    return get_satisfied_fraction(get_ef1_violations(aggregates))
 
-    return round(ef1_satisfied_agents_number / agents.size(), 3)
 
-
-def is_mms(agents: Agents, items: Items, allocation: Allocation) -> Literal[True] | tuple[Literal[False], Agent]:
+@memoize_checker
+def is_mms(
+    agents: Agents, items: Items, allocation: Allocation, use_bounds: bool = False
+) -> Literal[True] | tuple[Literal[False], Agent]:
     """
     Checks if the given `allocation` of `items` to `agents` is maximin share fair.
 
+    If `use_bounds` is set, the maximin share of an agent is computed only if her valuation lies between the bounds
+    from `get_maximin_share_bounds`.
+
     Returns `True` if it is MMS or tuple `(False, not_satisfied_agent)` otherwise.
     """
 
+    if use_bounds:
+        return find_mms_violation(agents, items, allocation, get_maximin_share_bounds(agents, items), {})
+
     maximin_shares = get_maximin_shares(agents, items)
 
     for agent, _ in allocation.get_allocation():
-        if agent.get_valuation(allocation.for_agent(agent)) < maximin_shares[agent]:
+        valuation = allocation.get_bundle_valuation(agent, agent)
+
+        if valuation < maximin_shares[agent]:
             return (False, agent)
     
     return True
 
 
-def highest_mms_approximation(agents: Agents, items: Items, allocation: Allocation) -> float:
+@memoize_checker
+def highest_mms_approximation(agents: Agents, items: Items, allocation: Allocation, use_bounds: bool = False) -> float:
     """
     Checks what is the highest `a` such that `allocation` is a-MMS.  
 
+    If `use_bounds` is set, the maximin share of an agent is computed only if her valuation is below the upper bound
+    from `get_maximin_share_bounds` and the upper bound does not show that she cannot be the least satisfied agent.
+
     The result is rounded to 3 decimal places. If `allocation` is MMS, returns `1`.
     """
 
-    maximin_shares = get_maximin_shares(agents, items)
+    if use_bounds:
+        return get_mms_approximation(agents, items, allocation, get_maximin_share_bounds(agents, items), {})
 
     alpha = 1.0
 
+    maximin_shares = get_maximin_shares(agents, items)
+
     for agent, _ in allocation.get_allocation():
-        valuation = agent.get_valuation(allocation.for_agent(agent))
+        valuation = allocation.get_bundle_valuation(agent, agent)
 
         if valuation < maximin_shares[agent]:
             # assumes non-negative valuations
@@ -414,6 +265,7 @@ def highest_mms_approximation(agents: Agents, items: Items, allocation: Allocati
     return round(alpha, 3)
 
 
+@memoize_checker
 def is_eefx(agents: Agents, items: Items, allocation: Allocation) -> Literal[True] | tuple[Literal[False], Agent]:
     """
     Checks if the given `allocation` of `items` to `agents` is epistemic envy-free up to any positively valued good.
@@ -421,46 +273,49 @@ def is_eefx(agents: Agents, items: Items, allocation: Allocation) -> Literal[Tru
     Returns `True` if it is EEFX or tuple `(False, not_satisfied_agent)` otherwise.
     """
 
-    # check if EFX certificate can be found for each agent
+    certificates = get_eefx_certificates(agents, items, allocation)
+
+    if isinstance(certificates, tuple):
+        return certificates
+
+    return True
+
+
+def get_eefx_certificates(
+    agents: Agents, items: Items, allocation: Allocation
+) -> dict[Agent, Allocation] | tuple[Literal[False], Agent]:
+    """
+    Returns a dictionary mapping each agent to her EFX certificate - an allocation of the other items to the other
+    agents, such that she would not envy any of them up to any positively valued good.
+
+    Returns tuple `(False, not_satisfied_agent)` if some agent has no certificate, as `is_eefx`. The certificates are
+    not memoized, as callers may change them, but the result of `is_eefx` is.
+    """
+
+    certificates = {}
+
     for agent in agents:
         other_agents = agents.copy()
         other_agents.remove_agent(agent)
-        
+
         other_items = items.copy()
         for item in allocation.for_agent(agent):
             other_items.remove_item(item)
 
-        self_valuation = agent.get_valuation(allocation.for_agent(agent))
+        self_valuation = allocation.get_bundle_valuation(agent, agent)
 
-        # iterating over all allocations of the rest of the items
-        for possible_efx_certificate in all_allocations(other_agents, other_items):
-            is_efx_satisfying = True
+        # owners of bundles do not matter to `agent`, so the search is over partitions of the rest of the items
+        certificate = find_efx_certificate(agent, other_agents, other_items, self_valuation)
 
-            # checking if `agent` is EFX satisfied with `possible_efx_certificate`
-            for other_agent in other_agents:
-                for item_to_remove in possible_efx_certificate.for_agent(other_agent):
-                    if agent.get_valuation(item_to_remove) > 0:
-                        items_subset = possible_efx_certificate.for_agent(other_agent).copy()
-                        items_subset.remove_item(item_to_remove)
+        if certificate is None:
+            return (False, agent)
 
-                        other_valuation = agent.get_valuation(items_subset)
+        certificates[agent] = certificate
 
-                        if other_valuation > self_valuation:
-                            is_efx_satisfying = False
-                            break
-            
-                if not is_efx_satisfying:
-                    break
-        
-            if is_efx_satisfying:
-                break
-        # no break occurred, so no certificate found
-        else:
-            return (False, agent)
-        
-    return True
+    return certificates
 
 
+@memoize_checker
 def is_prop(agents: Agents, items: Items, allocation: Allocation) -> Literal[True] | tuple[Literal[False], Agent]:
     """
     Checks if the given `allocation` of `items` to `agents` is proportional.
@@ -468,18 +323,10 @@ def is_prop(agents: Agents, items: Items, allocation: Allocation) -> Literal[Tru
     Returns `True` if it is PROP or tuple `(False, not_satisfied_agent)` otherwise.
     """
 
-    n = agents.size()
-
-    for agent in agents:
-        valuation_of_agent = agent.get_valuation(allocation.for_agent(agent))
-        valuation_of_all_items = agent.get_valuation(items)
-
-        if valuation_of_agent < valuation_of_all_items / n:
-            return (False, agent)
-        
-    return True
+    return get_prop_results(agents, *get_prop_valuations(agents, items, allocation))[0]
 
 
+@memoize_checker
 def highest_prop_approximation(agents: Agents, items: Items, allocation: Allocation) -> float:
     """
     Checks what is the highest `a` such that `allocation` is a-PROP.  
@@ -487,20 +334,10 @@ def highest_prop_approximation(agents: Agents, items: Items, allocation: Allocat
     The result is rounded to 3 decimal places. If `allocation` is PROP, returns `1`.
     """
 
-    n = agents.size()
-
-    alpha = 1.0
-
-    for agent in agents:
-        valuation_of_agent = agent.get_valuation(allocation.for_agent(agent))
-        valuation_of_all_items = agent.get_valuation(items)
-
-        if valuation_of_agent < valuation_of_all_items / n:
-            alpha = min(alpha, valuation_of_agent / (valuation_of_all_items / n))
-
-    return round(alpha, 3)
+    return get_prop_results(agents, *get_prop_valuations(agents, items, allocation))[1]
 
 
+@memoize_checker
 def prop_satisfied_fraction(agents: Agents, items: Items, allocation: Allocation) -> float:
     """
     Returns a fraction of `agents` that are satisfied according to proportionality.
@@ -508,25 +345,20 @@ def prop_satisfied_fraction(agents: Agents, items: Items, allocation: Allocation
     Returns 1 if `allocation` is PROP. 
     """
 
-    n = agents.size()
+    return get_prop_results(agents, *get_prop_valuations(agents, items, allocation))[2]
 
-    prop_satisfied_agents_number = 0
 
-    for agent in agents:
-        valuation_of_agent = agent.get_valuation(allocation.for_agent(agent))
-        valuation_of_all_items = agent.get_valuation(items)
-
-        if valuation_of_agent >= valuation_of_all_items / n:
-            prop_satisfied_agents_number += 1
-
-    return round(prop_satisfied_agents_number / agents.size(), 3)
-
-
-def is_prop1(agents: Agents, items: Items, allocation: Allocation) -> Literal[True] | tuple[Literal[False], Agent]:
+@memoize_checker
+def is_prop1(
+        agents: Agents,
+        items: Items,
+        allocation: Allocation,
+        preferences: Optional[PreferenceIndex] = None) -> Literal[True] | tuple[Literal[False], Agent]:
     """
     Checks if the given `allocation` of `items` to `agents` is proportional up to one good.
 
-    Returns `True` if it is PROP1 or tuple `(False, not_satisfied_agent)` otherwise.
+    Returns `True` if it is PROP1 or tuple `(False, not_satisfied_agent)` otherwise. Favorite items outside bundles
+    are found with `preferences` if given.
     """
 
     n = agents.size()
@@ -537,9 +369,9 @@ def is_prop1(agents: Agents, items: Items, allocation: Allocation) -> Literal[Tr
         for item in allocation.for_agent(agent):
             other_items.remove_item(item)
 
-        favorite_from_other = agent.get_favorite_item(other_items)
+        favorite_from_other = get_favorite_item(agent, other_items, preferences)
 
-        extended_bundle = allocation.for_agent(agent)
+        extended_bundle = allocation.for_agent(agent).copy()
         extended_bundle.add_item(favorite_from_other)
         
         valuation_of_extended_bundle = agent.get_valuation(extended_bundle)
@@ -550,3 +382,173 @@ def is_prop1(agents: Agents, items: Items, allocation: Allocation) -> Literal[Tr
             return (False, agent)
         
     return True
+
+
+# -- PRIVATE FUNCTIONS --
+
+def get_prop_valuations(agents: Agents, items: Items, allocation: Allocation) -> tuple[list[int], list[int]]:
+    """
+    Returns valuations of `agents` for their own bundles and for all `items`.
+    """
+
+    own_valuations = [allocation.get_bundle_valuation(agent, agent) for agent in agents]
+    valuations_of_all_items = [agent.get_valuation(items) for agent in agents]
+
+    return own_valuations, valuations_of_all_items
+
+
+def get_prop_results(
+    agents: Agents, own_valuations: list[int], valuations_of_all_items: list[int]
+) -> tuple[Literal[True] | tuple[Literal[False], Agent], float, float]:
+    """
+    Returns the results of `is_prop`, `highest_prop_approximation` and `prop_satisfied_fraction` computed with one
+    pass over `agents`, given their valuations for own bundles and for all items.
+    """
+
+    n = agents.size()
+
+    result: Literal[True] | tuple[Literal[False], Agent] = True
+    alpha = 1.0
+    satisfied_agents_number = 0
+
+    for agent, valuation_of_agent, valuation_of_all_items in zip(agents, own_valuations, valuations_of_all_items):
+        if valuation_of_agent < valuation_of_all_items / n:
+            if result is True:
+                result = (False, agent)
+
+            alpha = min(alpha, valuation_of_agent / (valuation_of_all_items / n))
+        else:
+            satisfied_agents_number += 1
+
+    return result, round(alpha, 3), round(satisfied_agents_number / n, 3)
+
+
+def find_mms_violation(
+    agents: Agents,
+    items: Items,
+    allocation: Allocation,
+    maximin_share_bounds: dict[Agent, tuple[int, int]],
+    maximin_shares: dict[Agent, int]
+) -> Literal[True] | tuple[Literal[False], Agent]:
+    """
+    Returns the result of `is_mms` with `use_bounds` set. Maximin shares computed on the way are remembered in
+    `maximin_shares`.
+    """
+
+    for agent, _ in allocation.get_allocation():
+        valuation = allocation.get_bundle_valuation(agent, agent)
+        lower_bound, upper_bound = maximin_share_bounds[agent]
+
+        if valuation >= upper_bound:
+            continue
+
+        if valuation < lower_bound or valuation < get_remembered_maximin_share(agent, items, agents, maximin_shares):
+            return (False, agent)
+
+    return True
+
+
+def get_mms_approximation(
+    agents: Agents,
+    items: Items,
+    allocation: Allocation,
+    maximin_share_bounds: dict[Agent, tuple[int, int]],
+    maximin_shares: dict[Agent, int]
+) -> float:
+    """
+    Returns the result of `highest_mms_approximation` with `use_bounds` set. Maximin shares computed on the way are
+    remembered in `maximin_shares`.
+    """
+
+    alpha = 1.0
+    candidates = []
+
+    for agent, _ in allocation.get_allocation():
+        valuation = allocation.get_bundle_valuation(agent, agent)
+        lower_bound, upper_bound = maximin_share_bounds[agent]
+
+        if valuation < upper_bound:
+            # the agents which are the least satisfied for the lower bounds are checked first
+            candidates.append((valuation / lower_bound if lower_bound > 0 else 0.0, agent, valuation))
+
+    for _, agent, valuation in sorted(candidates, key=lambda candidate: candidate[0]):
+        upper_bound = maximin_share_bounds[agent][1]
+
+        # assumes non-negative valuations
+        if valuation >= 0 and valuation / upper_bound >= alpha:
+            continue
+
+        maximin_share = get_remembered_maximin_share(agent, items, agents, maximin_shares)
+
+        if valuation < maximin_share:
+            alpha = min(alpha, valuation / maximin_share)
+
+    return round(alpha, 3)
+
+
+def get_remembered_maximin_share(agent: Agent, items: Items, agents: Agents, maximin_shares: dict[Agent, int]) -> int:
+    if agent not in maximin_shares:
+        maximin_shares[agent] = get_agent_maximin_share(agent, items, agents.size())
+
+    return maximin_shares[agent]
+
+
+def get_efx0_violations(aggregates: BundleAggregates) -> np.ndarray:
+    own_valuations = aggregates.get_own_valuations()[:, np.newaxis]
+
+    return aggregates.get_comparable_pairs() & (aggregates.totals - aggregates.minima > own_valuations)
+
+
+def get_efx_violations(aggregates: BundleAggregates) -> np.ndarray:
+    own_valuations = aggregates.get_own_valuations()[:, np.newaxis]
+    envy = aggregates.totals - aggregates.minima_positive > own_valuations
+
+    return aggregates.get_comparable_pairs() & aggregates.has_positive & envy
+
+
+def get_ef1_violations(aggregates: BundleAggregates) -> np.ndarray:
+    own_valuations = aggregates.get_own_valuations()[:, np.newaxis]
+
+    return aggregates.get_comparable_pairs() & (aggregates.totals - aggregates.maxima > own_valuations)
+
+
+def get_first_violation(
+    aggregates: BundleAggregates, violations: np.ndarray
+) -> Literal[True] | tuple[Literal[False], tuple[Agent, Agent]]:
+    """
+    Returns `True` if there are no `violations`, or the first violating pair of agents in the order of envious agents
+    and then envied agents.
+    """
+
+    violating_pairs = np.flatnonzero(violations)
+
+    if len(violating_pairs) == 0:
+        return True
+
+    envious_position, envied_position = divmod(int(violating_pairs[0]), violations.shape[1])
+
+    return (False, (aggregates.agents[envious_position], aggregates.agents[envied_position]))
+
+
+def get_lowest_ratio(aggregates: BundleAggregates, other_valuations: np.ndarray, violations: np.ndarray) -> float:
+    """
+    Returns the lowest ratio of the valuation of own bundle to `other_valuations` among `violations`, and `1` if it
+    is not lower, rounded to 3 decimal places.
+    """
+
+    alpha = 1.0
+
+    if violations.any():
+        own_valuations = np.broadcast_to(aggregates.get_own_valuations()[:, np.newaxis], violations.shape)
+
+        # assumes non-negative valuations
+        ratios = own_valuations[violations] / other_valuations[violations]
+        alpha = min(alpha, float(ratios.min()))
+
+    return round(alpha, 3)
+
+
+def get_satisfied_fraction(violations: np.ndarray) -> float:
+    satisfied_agents_number = int(np.count_nonzero(~violations.any(axis=1)))
+
+    return round(satisfied_agents_number / violations.shape[0], 3)
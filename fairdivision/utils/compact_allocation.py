@@ -0,0 +1,100 @@
+from __future__ import annotations
+import numpy as np
+from typing import Optional
+
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.bitset_items import get_universe
+from fairdivision.utils.instance import get_bound_instance
+from fairdivision.utils.items import Items
+
+
+UNALLOCATED = -1
+
+
+class CompactAllocation:
+    """
+    A class representating an allocation as a flat array of owners.
+
+    `owners[k]` is the position of the agent owning the `k`-th item, or `UNALLOCATED` if the item has no owner. Both
+    agents and items are positioned in the ascending order of their indices, so the same `Agents` and `Items` are
+    needed to convert the allocation back to `Allocation`.
+
+    The array is immutable, so the allocation can be hashed and compared in `O(m)` without creating any objects, and
+    it is pickled as a raw buffer.
+    """
+
+    def __init__(self, owners: np.ndarray | list[int]):
+        self.owners: np.ndarray = np.array(owners, dtype=np.int32)
+        self.owners.flags.writeable = False
+
+        self.hash: Optional[int] = None
+
+    def __hash__(self):
+        if self.hash is None:
+            self.hash = hash(self.owners.tobytes())
+
+        return self.hash
+
+    def __eq__(self, other):
+        return isinstance(other, CompactAllocation) and np.array_equal(self.owners, other.owners)
+
+    def __repr__(self):
+        return f"CompactAllocation({self.owners.tolist()})"
+
+    def __str__(self):
+        return repr(self)
+
+    def __reduce__(self):
+        return (from_bytes, (self.owners.tobytes(),))
+
+    def get_owner(self, position: int) -> int:
+        return int(self.owners[position])
+
+    def to_allocation(self, agents: Agents, items: Items) -> Allocation:
+        """
+        Creates an `Allocation` of `items` to `agents` out of the owners array.
+        """
+
+        if items.size() != self.size():
+            raise Exception(f"Expected {self.size()} items, got {items.size()}")
+
+        allocation = Allocation(agents, get_universe(items), get_bound_instance(agents, items))
+        agents_list = agents.get_agents()
+
+        for item, owner in zip(items, self.owners.tolist()):
+            if owner != UNALLOCATED:
+                allocation.allocate(agents_list[owner], item)
+
+        return allocation
+
+    def size(self) -> int:
+        return len(self.owners)
+
+
+def compact_allocation(agents: Agents, items: Items, allocation: Allocation) -> CompactAllocation:
+    """
+    Creates a `CompactAllocation` out of `allocation` of `items` to `agents`.
+
+    Items that are not in any bundle are marked as `UNALLOCATED`.
+    """
+
+    positions = dict([(item.get_index(), position) for position, item in enumerate(items)])
+    owners = np.full(items.size(), UNALLOCATED, dtype=np.int32)
+
+    for owner, agent in enumerate(agents):
+        for item in allocation.for_agent(agent):
+            if item.get_index() not in positions:
+                raise Exception(f"{item} from the allocation is not in {items}")
+
+            owners[positions[item.get_index()]] = owner
+
+    return CompactAllocation(owners)
+
+
+def from_bytes(buffer: bytes) -> CompactAllocation:
+    """
+    Recreates a `CompactAllocation` out of the raw buffer of its owners array.
+    """
+
+    return CompactAllocation(np.frombuffer(buffer, dtype=np.int32))
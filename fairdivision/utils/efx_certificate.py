@@ -0,0 +1,225 @@
+from typing import Optional
+
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.items import Items
+
+
+def find_efx_certificate(agent: Agent, agents: Agents, items: Items, self_valuation: int) -> Optional[Allocation]:
+    """
+    Returns an allocation of `items` to `agents` such that `agent` with `self_valuation` of her own bundle would not
+    envy any of them up to any positively valued good, or `None` if there is no such allocation.
+
+    Only valuations of `agent` matter, so `agents` are interchangeable - see `efx_certificate_partition`.
+    """
+
+    labels = efx_certificate_partition([agent.get_valuation(item) for item in items], agents.size(), self_valuation)
+
+    if labels is None:
+        return None
+
+    certificate = Allocation(agents)
+    other_agents = agents.get_agents()
+
+    for item, label in zip(items, labels):
+        certificate.allocate(other_agents[label], item)
+
+    return certificate
+
+
+def efx_certificate_partition(valuations: list[int], n: int, self_valuation: int) -> Optional[list[int]]:
+    """
+    Returns labels of bundles (from `0` to `n - 1`) of items with `valuations`, such that every bundle without its
+    least positively valued item is worth at most `self_valuation`, or `None` if there is no such partition.
+
+    Items valued at 0 never change a bundle, so they all go to the first bundle. If positively valued items are added
+    to bundles from the most valuable one, a bundle can receive the next item as long as it is worth at most
+    `self_valuation`, as the new item becomes its least valuable one. Fast constructive partitions are tried first:
+    giving items to the least valuable bundle (envy-cycle elimination for identical valuations) and in turns (round
+    robin). If both fail, the search tries all placements, where bundles of equal valuations are interchangeable and
+    failed states are remembered.
+
+    Negatively valued items can make any bundle better, so with any of them all partitions are checked instead.
+    """
+
+    if n <= 0:
+        return [] if len(valuations) == 0 else None
+
+    if any(valuation < 0 for valuation in valuations):
+        return search_all_partitions(valuations, n, self_valuation)
+
+    positive_items = sorted(
+        [position for position, valuation in enumerate(valuations) if valuation > 0],
+        key=lambda position: valuations[position],
+        reverse=True
+    )
+
+    sorted_valuations = [valuations[position] for position in positive_items]
+
+    bundles = None
+    for constructive_partition in [least_valuable_bundle_partition, round_robin_partition]:
+        candidate = constructive_partition(sorted_valuations, n)
+
+        if is_certificate_partition(candidate, sorted_valuations, n, self_valuation):
+            bundles = candidate
+            break
+
+    if bundles is None:
+        bundles = search_partition(sorted_valuations, n, self_valuation)
+
+    if bundles is None:
+        return None
+
+    labels = [0] * len(valuations)
+    for position, bundle in zip(positive_items, bundles):
+        labels[position] = bundle
+
+    return labels
+
+
+def is_efx_certificate(possible_efx_certificate: list[int], valuations: list[int], self_valuation: int, n: int) -> bool:
+    """
+    Checks if the agent with `self_valuation` and `valuations` of items is EFX satisfied with
+    `possible_efx_certificate`, which is a partition of the items into at most `n` bundles.
+    """
+
+    bundle_valuations = [0] * n
+
+    # the least positively valued item of every bundle
+    least_positive: list[Optional[int]] = [None] * n
+
+    for bundle, valuation in zip(possible_efx_certificate, valuations):
+        bundle_valuations[bundle] += valuation
+        least_valuation = least_positive[bundle]
+
+        if valuation > 0 and (least_valuation is None or valuation < least_valuation):
+            least_positive[bundle] = valuation
+
+    for bundle_valuation, least_valuation in zip(bundle_valuations, least_positive):
+        if least_valuation is not None and bundle_valuation - least_valuation > self_valuation:
+            return False
+
+    return True
+
+
+# -- PRIVATE FUNCTIONS --
+
+def least_valuable_bundle_partition(valuations: list[int], n: int) -> list[int]:
+    bundle_valuations = [0] * n
+    bundles = []
+
+    for valuation in valuations:
+        bundle = min(range(n), key=lambda bundle: bundle_valuations[bundle])
+        bundle_valuations[bundle] += valuation
+        bundles.append(bundle)
+
+    return bundles
+
+
+def round_robin_partition(valuations: list[int], n: int) -> list[int]:
+    return [position % n for position in range(len(valuations))]
+
+
+def is_certificate_partition(bundles: list[int], valuations: list[int], n: int, self_valuation: int) -> bool:
+    """
+    Checks if `bundles` of items with positive, sorted `valuations` are a certificate for `self_valuation`.
+    """
+
+    bundle_valuations = [0] * n
+
+    for bundle, valuation in zip(bundles, valuations):
+        # the new item is the least valuable one, so the bundle has to be worth at most `self_valuation` without it
+        if bundle_valuations[bundle] > self_valuation:
+            return False
+
+        bundle_valuations[bundle] += valuation
+
+    return True
+
+
+def search_partition(valuations: list[int], n: int, self_valuation: int) -> Optional[list[int]]:
+    """
+    Returns a certificate partition of items with positive, sorted `valuations`, trying all placements of items into
+    bundles that can still receive them, or `None` if there is no such partition.
+
+    A bundle worth `v <= self_valuation` can receive items worth at most `self_valuation - v` plus one more item, so
+    the search stops if the remaining items exceed what all such bundles can receive together.
+    """
+
+    suffix_sums = [0] * (len(valuations) + 1)
+    for position in range(len(valuations) - 1, -1, -1):
+        suffix_sums[position] = suffix_sums[position + 1] + valuations[position]
+
+    bundle_valuations = [0] * n
+    bundles = [0] * len(valuations)
+    failed_states: set[tuple[int, tuple[int, ...]]] = set()
+
+    def search(position: int) -> bool:
+        if position == len(valuations):
+            return True
+
+        open_bundles = [bundle for bundle in range(n) if bundle_valuations[bundle] <= self_valuation]
+        open_valuations = sorted([bundle_valuations[bundle] for bundle in open_bundles])
+        state = (position, tuple(open_valuations))
+
+        if state in failed_states:
+            return False
+
+        capacity = sum(self_valuation - valuation for valuation in open_valuations)
+        capacity += len(open_valuations) * valuations[position]
+
+        if suffix_sums[position] <= capacity:
+            tried_valuations = set()
+
+            for bundle in sorted(open_bundles, key=lambda bundle: bundle_valuations[bundle]):
+                # bundles of equal valuations are interchangeable
+                if bundle_valuations[bundle] in tried_valuations:
+                    continue
+
+                tried_valuations.add(bundle_valuations[bundle])
+
+                bundles[position] = bundle
+                bundle_valuations[bundle] += valuations[position]
+
+                found = search(position + 1)
+
+                bundle_valuations[bundle] -= valuations[position]
+
+                if found:
+                    return True
+
+        failed_states.add(state)
+
+        return False
+
+    if search(0):
+        return bundles
+
+    return None
+
+
+def search_all_partitions(valuations: list[int], n: int, self_valuation: int) -> Optional[list[int]]:
+    """
+    Returns the first partition of items with `valuations` into at most `n` bundles that is an EFX certificate, or
+    `None` if there is none. Labels of bundles appear in the ascending order, so each partition is checked once.
+    """
+
+    labels = [0] * len(valuations)
+
+    def search(position: int, used_labels: int) -> bool:
+        if position == len(valuations):
+            return is_efx_certificate(labels, valuations, self_valuation, n)
+
+        for label in range(min(used_labels + 1, n)):
+            labels[position] = label
+
+            if search(position + 1, max(used_labels, label + 1)):
+                return True
+
+        return False
+
+    if search(0, 0):
+        return labels
+
+    return None
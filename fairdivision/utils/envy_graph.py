@@ -0,0 +1,558 @@
+import networkx as nx # type: ignore
+import numpy as np
+from typing import Iterator, Optional
+
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.instance import get_common_instance
+
+
+CHUNK_ELEMENTS = 2 ** 22
+
+
+class EnvyGraph:
+    """
+    A class representating an envy graph of `agents`, where an edge `(i, j)` means that the agent `i` envies the bundle
+    of the agent `j`.
+
+    Edges are kept in a boolean matrix `matrix` (agents are in the order of `agents`) together with in-degrees of all
+    agents, so adding, removing and checking an edge takes `O(1)`. Agents that nobody envies (sources) and agents with
+    empty bundles are kept as bitsets of their positions, so the first unenvied agent, preferably with an empty bundle,
+    is found without scanning the agents.
+    Successors of every agent are additionally kept in the order in which the edges were added, so that `find_cycle`
+    finds exactly the same cycle as `networkx.find_cycle` would on the same graph. Successors added in the order of
+    agents (as by `create_envy_graph`) are read directly from the matrix.
+
+    If `matrix` is given (e.g. by `get_envy_matrix`), the graph starts with its edges, in the order of agents. Empty
+    bundles are taken from `allocation` if it is given, and have to be updated by `update_bundle` when they change
+    outside of `rotate_bundles`. Without `allocation`, no bundle is considered empty.
+    """
+
+    def __init__(self, agents: Agents, matrix: Optional[np.ndarray] = None, allocation: Optional[Allocation] = None):
+        self.all_agents: Agents = agents
+        self.agents: list[Agent] = agents.get_agents()
+        self.positions: dict[Agent, int] = {}
+
+        for position, agent in enumerate(self.agents):
+            self.positions[agent] = position
+
+        n = len(self.agents)
+
+        self.matrix: np.ndarray = np.zeros((n, n), dtype=bool) if matrix is None else matrix.astype(bool)
+        self.in_degrees: list[int] = self.matrix.sum(axis=0).tolist()
+
+        # bit `i` is set if the `i`-th agent is unenvied or has an empty bundle, respectively
+        self.sources: int = get_bitset(np.array(self.in_degrees) == 0)
+        self.empty_bundles: int = 0
+
+        if allocation is not None:
+            empty_bundles = [allocation.for_agent(agent).size() == 0 for agent in self.agents]
+            self.empty_bundles = get_bitset(np.array(empty_bundles, dtype=bool))
+
+        # dictionaries keep the order of insertion, as adjacency of `networkx` graphs, `None` stands for the order of
+        # agents and is replaced by a dictionary once an edge is added out of this order
+        self.successors: list[Optional[dict[int, None]]] = [None] * n
+
+    def __repr__(self):
+        return f"EnvyGraph({len(self.agents)} agents, {self.edges_number()} edges)"
+
+    def __str__(self):
+        return repr(self)
+
+    def add_edge(self, envious: Agent, envied: Agent) -> None:
+        envious_position = self.positions[envious]
+        envied_position = self.positions[envied]
+
+        if self.matrix[envious_position, envied_position]:
+            return
+
+        self.__get_ordered_successors(envious_position)[envied_position] = None
+        self.matrix[envious_position, envied_position] = True
+
+        if self.in_degrees[envied_position] == 0:
+            self.sources &= ~(1 << envied_position)
+
+        self.in_degrees[envied_position] += 1
+
+    def remove_edge(self, envious: Agent, envied: Agent) -> None:
+        envious_position = self.positions[envious]
+        envied_position = self.positions[envied]
+
+        if not self.matrix[envious_position, envied_position]:
+            raise Exception(f"{self} has no edge ({envious}, {envied})")
+
+        self.matrix[envious_position, envied_position] = False
+
+        # removing an edge keeps the order of agents
+        successors = self.successors[envious_position]
+        if successors is not None:
+            del successors[envied_position]
+
+        self.in_degrees[envied_position] -= 1
+
+        if self.in_degrees[envied_position] == 0:
+            self.sources |= 1 << envied_position
+
+    def has_edge(self, envious: Agent, envied: Agent) -> bool:
+        return bool(self.matrix[self.positions[envious], self.positions[envied]])
+
+    def in_degree(self, agent: Agent) -> int:
+        return self.in_degrees[self.positions[agent]]
+
+    def has_unenvied_agent(self) -> bool:
+        return self.sources != 0
+
+    def get_unenvied_agent(self) -> Optional[Agent]:
+        """
+        Returns the first unenvied agent with an empty bundle, or the first unenvied agent if there is no such agent, or
+        `None` if every agent is envied.
+        """
+
+        candidates = self.sources & self.empty_bundles
+
+        if candidates == 0:
+            candidates = self.sources
+
+        if candidates == 0:
+            return None
+
+        # the lowest set bit is the first agent
+        return self.agents[(candidates & -candidates).bit_length() - 1]
+
+    def update_bundle(self, agent: Agent, allocation: Allocation) -> None:
+        """
+        Updates whether the bundle of `agent` in `allocation` is empty.
+        """
+
+        position = self.positions[agent]
+
+        if allocation.for_agent(agent).size() == 0:
+            self.empty_bundles |= 1 << position
+        else:
+            self.empty_bundles &= ~(1 << position)
+
+    def get_successors(self, agent: Agent) -> list[Agent]:
+        """
+        Returns agents envied by `agent`, in the order in which the edges were added.
+        """
+
+        return [self.agents[position] for position in self.__get_successor_positions(self.positions[agent])]
+
+    def edges(self) -> list[tuple[Agent, Agent]]:
+        return [
+            (self.agents[envious], self.agents[envied])
+            for envious in range(len(self.agents))
+            for envied in self.__get_successor_positions(envious)
+        ]
+
+    def edges_number(self) -> int:
+        return int(np.count_nonzero(self.matrix))
+
+    def rotate_bundles(self, cycle: list[tuple[Agent, Agent]], allocation: Allocation) -> None:
+        """
+        Updates the graph after bundles were reallocated along `cycle` in `allocation` (see
+        `Allocation.reallocate_bundles`), so that it equals the envy graph created from scratch.
+
+        Agents outside `cycle` keep their bundles, so they envy the same bundles as before - the columns of the matrix
+        are permuted as the bundles. Only the rows of the agents from `cycle` are compared again, so a cycle of length
+        `k` takes `O(n * k)`. All successors are in the order of agents afterwards, as in a new graph. `cycle` can also
+        be a union of vertex-disjoint cycles rotated at once.
+        """
+
+        envious_positions = [self.positions[envious] for envious, _ in cycle]
+        envied_positions = [self.positions[envied] for _, envied in cycle]
+
+        self.matrix[:, envious_positions] = self.matrix[:, envied_positions]
+
+        in_degrees = [self.in_degrees[position] for position in envied_positions]
+        for position, in_degree in zip(envious_positions, in_degrees):
+            self.in_degrees[position] = in_degree
+
+        rows = get_envy_matrix(self.all_agents, allocation, envious_positions)
+        changes = rows.sum(axis=0) - self.matrix[envious_positions].sum(axis=0)
+
+        for position in np.flatnonzero(changes).tolist():
+            self.in_degrees[position] += int(changes[position])
+
+        self.matrix[envious_positions] = rows
+
+        self.sources = get_bitset(np.array(self.in_degrees) == 0)
+        self.successors = [None] * len(self.agents)
+
+        for envious, _ in cycle:
+            self.update_bundle(envious, allocation)
+
+    def find_cycle(self) -> Optional[list[tuple[Agent, Agent]]]:
+        """
+        Returns a cycle as a list of edges, or `None` if the graph is acyclic.
+
+        Searches the graph in the same way as `networkx.find_cycle`, so that algorithms find the same cycles: an edge
+        depth-first search starts from every agent in order (skipping agents explored by previous searches), and a
+        cycle is found when an edge leads to an agent on the current path.
+        """
+
+        explored: set[int] = set()
+
+        for start in range(len(self.agents)):
+            if start in explored:
+                continue
+
+            path: list[tuple[int, int]] = []
+            seen = {start}
+            active = {start}
+            previous_head = None
+
+            for tail, head in self.__edge_dfs(start):
+                if head in explored:
+                    continue
+
+                if previous_head is not None and tail != previous_head:
+                    # the edge results from backtracking, so the path is cut to end at its tail
+                    while True:
+                        if len(path) == 0:
+                            active = {tail}
+                            break
+
+                        active.remove(path.pop()[1])
+
+                        if len(path) > 0 and path[-1][1] == tail:
+                            break
+
+                path.append((tail, head))
+
+                if head in active:
+                    # the cycle starts at the first edge leaving `head`
+                    first = next(position for position, edge in enumerate(path) if edge[0] == head)
+
+                    return [(self.agents[tail], self.agents[head]) for tail, head in path[first:]]
+
+                seen.add(head)
+                active.add(head)
+                previous_head = head
+
+            explored.update(seen)
+
+        return None
+
+    def get_strongly_connected_components(self) -> list[list[Agent]]:
+        """
+        Returns strongly connected components of the graph (found by Tarjan's algorithm in `O(n^2)`), each with agents
+        in the order of `agents`. Envy cycles are exactly the cycles within the components of at least two agents.
+        """
+
+        return [[self.agents[position] for position in component] for component in self.__get_components()]
+
+    def find_disjoint_cycles(self) -> list[list[tuple[Agent, Agent]]]:
+        """
+        Returns vertex-disjoint cycles, at least one from every strongly connected component of at least two agents.
+
+        Cycles of a component are found by following the first successor among its remaining agents from the first
+        remaining agent, until an agent on the path repeats. Agents of a found cycle are removed and the walk goes on
+        from the rest of the path, while agents without remaining successors are removed and the walk steps back.
+        """
+
+        cycles = []
+
+        for component in self.__get_components():
+            if len(component) < 2:
+                continue
+
+            remaining = set(component)
+            path: list[int] = []
+            path_positions: dict[int, int] = {}
+
+            while len(remaining) > 0:
+                if len(path) == 0:
+                    start = min(remaining)
+                    path = [start]
+                    path_positions = {start: 0}
+
+                head = next((head for head in self.__get_successor_positions(path[-1]) if head in remaining), None)
+
+                if head is None:
+                    remaining.remove(path[-1])
+                    del path_positions[path.pop()]
+                elif head in path_positions:
+                    cycle = path[path_positions[head]:] + [head]
+                    cycles.append([(self.agents[tail], self.agents[head]) for tail, head in zip(cycle, cycle[1:])])
+
+                    for position in cycle[:-1]:
+                        remaining.remove(position)
+                        del path_positions[position]
+
+                    path = path[:len(path) - len(cycle) + 1]
+                else:
+                    path_positions[head] = len(path)
+                    path.append(head)
+
+        return cycles
+
+    def find_trading_cycles(self, allocation: Allocation) -> list[list[tuple[Agent, Agent]]]:
+        """
+        Returns vertex-disjoint cycles of top trading in `allocation`: every agent from a strongly connected component
+        of at least two agents points to her most valuable bundle (the first one on ties) among envied bundles in her
+        component, and all cycles of these pointers are returned. Every component contains at least one such cycle.
+        """
+
+        values = get_bundle_values(self.all_agents, allocation, None)
+        pointers: dict[int, int] = {}
+
+        for component in self.__get_components():
+            if len(component) < 2:
+                continue
+
+            members = set(component)
+
+            for position in component:
+                envious = self.agents[position]
+                envied_positions = [head for head in self.__get_successor_positions(position) if head in members]
+
+                if values is None:
+                    valuations = [
+                        allocation.get_bundle_valuation(envious, self.agents[head]) for head in envied_positions
+                    ]
+                else:
+                    valuations = values[position, envied_positions].tolist()
+
+                pointers[position] = envied_positions[valuations.index(max(valuations))]
+
+        cycles = []
+        visited: set[int] = set()
+
+        for start in pointers:
+            path_positions: dict[int, int] = {}
+            path: list[int] = []
+            position = start
+
+            while position not in visited:
+                visited.add(position)
+                path_positions[position] = len(path)
+                path.append(position)
+                position = pointers[position]
+
+            # the walk closes a cycle only if it reached its own path
+            if position in path_positions:
+                cycle = path[path_positions[position]:] + [position]
+                cycles.append([(self.agents[tail], self.agents[head]) for tail, head in zip(cycle, cycle[1:])])
+
+        return cycles
+
+    def to_networkx(self) -> nx.DiGraph:
+        """
+        Returns the graph as `networkx.DiGraph` with the same order of agents and edges, e.g. for visualization.
+        """
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.agents)
+        graph.add_edges_from(self.edges())
+
+        return graph
+
+    def __edge_dfs(self, start: int) -> Iterator[tuple[int, int]]:
+        """
+        Returns an iterator giving edges in the order of `networkx.edge_dfs` from `start`: every edge is given once,
+        and an agent reached again continues with its remaining edges.
+        """
+
+        successors: dict[int, Iterator[int]] = {}
+        stack = [start]
+
+        while len(stack) > 0:
+            current = stack[-1]
+
+            if current not in successors:
+                successors[current] = iter(self.__get_successor_positions(current))
+
+            head = next(successors[current], None)
+
+            if head is None:
+                stack.pop()
+            else:
+                # edges from one agent are different, and each agent's iterator is created once
+                stack.append(head)
+
+                yield (current, head)
+
+    def __get_components(self) -> list[list[int]]:
+        """
+        Returns strongly connected components as sorted positions, found by an iterative Tarjan's algorithm.
+        """
+
+        n = len(self.agents)
+        indices = [-1] * n
+        low_links = [0] * n
+        on_stack = [False] * n
+        stack: list[int] = []
+        components: list[list[int]] = []
+        index = 0
+
+        for root in range(n):
+            if indices[root] != -1:
+                continue
+
+            work = [(root, iter(self.__get_successor_positions(root)))]
+            indices[root] = low_links[root] = index
+            index += 1
+            stack.append(root)
+            on_stack[root] = True
+
+            while len(work) > 0:
+                position, successors = work[-1]
+                head = next(successors, None)
+
+                if head is not None:
+                    if indices[head] == -1:
+                        indices[head] = low_links[head] = index
+                        index += 1
+                        stack.append(head)
+                        on_stack[head] = True
+                        work.append((head, iter(self.__get_successor_positions(head))))
+                    elif on_stack[head]:
+                        low_links[position] = min(low_links[position], indices[head])
+
+                    continue
+
+                work.pop()
+
+                if len(work) > 0:
+                    parent = work[-1][0]
+                    low_links[parent] = min(low_links[parent], low_links[position])
+
+                if low_links[position] == indices[position]:
+                    component = []
+
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+
+                        if member == position:
+                            break
+
+                    components.append(sorted(component))
+
+        return components
+
+    def __get_successor_positions(self, position: int) -> list[int]:
+        successors = self.successors[position]
+
+        if successors is None:
+            return np.flatnonzero(self.matrix[position]).tolist()
+
+        return list(successors)
+
+    def __get_ordered_successors(self, position: int) -> dict[int, None]:
+        """
+        Returns the dictionary of successors at `position`, creating it from the matrix if they are in the order of
+        agents.
+        """
+
+        successors = self.successors[position]
+
+        if successors is None:
+            successors = dict.fromkeys(np.flatnonzero(self.matrix[position]).tolist())
+            self.successors[position] = successors
+
+        return successors
+
+
+def get_envy_matrix(agents: Agents, allocation: Allocation, rows: Optional[list[int]] = None) -> np.ndarray:
+    """
+    Returns a boolean matrix where the element `[i][j]` tells if the `i`-th agent envies the bundle of the `j`-th agent
+    (agents are in the order of `agents`), only with the given `rows` if they are set. Only non-empty bundles can be
+    envied.
+
+    The matrix `V` of valuations of all bundles is the product of valuations of items and the matrix of owners of
+    items, so envy is `V > diag(V)` at once. `V` is taken from `values` of `allocation` if it keeps them, or computed
+    from the instance of additive `agents` by summing valuations of all bundles at once. Otherwise, the agents are
+    compared one by one with `Agent.envies`.
+    """
+
+    agents_list = agents.get_agents()
+    positions = list(range(len(agents_list))) if rows is None else rows
+
+    non_empty = np.array([allocation.for_agent(agent).size() > 0 for agent in agents_list], dtype=bool)
+    values = get_bundle_values(agents, allocation, rows)
+
+    if values is None:
+        matrix = np.zeros((len(positions), len(agents_list)), dtype=bool)
+
+        for row, position in enumerate(positions):
+            for column in np.flatnonzero(non_empty).tolist():
+                matrix[row, column] = agents_list[position].envies(agents_list[column], allocation)
+
+        return matrix
+
+    own_valuations = values[np.arange(len(positions)), positions][:, np.newaxis]
+
+    return (values > own_valuations) & non_empty[np.newaxis, :]
+
+
+# -- PRIVATE FUNCTIONS --
+
+def get_bitset(mask: np.ndarray) -> int:
+    """
+    Returns an integer with the bit `i` set if `mask[i]` is set.
+    """
+
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def get_bundle_values(agents: Agents, allocation: Allocation, rows: Optional[list[int]]) -> Optional[np.ndarray]:
+    """
+    Returns valuations of agents at `rows` (all if not set) for bundles of all `agents`, or `None` if they cannot be
+    computed at once.
+    """
+
+    agents_list = agents.get_agents()
+    n = len(agents_list)
+
+    # values kept by the allocation are recomputed or dropped first if valuations of agents have changed
+    values = allocation.get_values()
+
+    if values is not None and all(agent in allocation.positions for agent in agents_list):
+        positions = np.array([allocation.positions[agent] for agent in agents_list], dtype=np.intp)
+
+        if np.array_equal(positions, np.arange(n)):
+            return values if rows is None else values[rows]
+
+        return values[np.ix_(positions if rows is None else positions[rows], positions)]
+
+    instance = get_common_instance(agents)
+
+    if instance is None or not all(agent.valuations_additive for agent in agents_list):
+        return None
+
+    bundles_columns = []
+    for agent in agents_list:
+        columns = instance.get_columns(allocation.for_agent(agent))
+
+        if columns is None:
+            return None
+
+        bundles_columns.append(columns)
+
+    instance_rows = np.array([instance.get_row(agent) for agent in agents_list], dtype=np.intp)
+    if rows is not None:
+        instance_rows = instance_rows[rows]
+
+    values = np.zeros((len(instance_rows), n), dtype=np.int64)
+
+    # valuations of items ordered by their owners are summed per bundle, which is the product with owners of items
+    owners = [position for position, columns in enumerate(bundles_columns) if len(columns) > 0]
+
+    if len(owners) > 0:
+        columns = np.concatenate(bundles_columns)
+        starts = np.cumsum([0] + [len(bundles_columns[owner]) for owner in owners[:-1]])
+
+        # rows are summed in chunks, so that only a part of the valuations is copied at once
+        chunk_size = max(1, CHUNK_ELEMENTS // len(columns))
+
+        for chunk_start in range(0, len(instance_rows), chunk_size):
+            chunk = slice(chunk_start, chunk_start + chunk_size)
+            valuations = instance.valuations[np.ix_(instance_rows[chunk], columns)]
+
+            values[chunk, owners] = np.add.reduceat(valuations, starts, axis=1)
+
+    return values
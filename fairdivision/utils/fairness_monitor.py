@@ -0,0 +1,241 @@
+import numpy as np
+from typing import Optional
+
+from fairdivision.utils.aggregates import BundleAggregates
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation, AllocationListener
+from fairdivision.utils.bundle import Bundle
+from fairdivision.utils.item import Item
+from fairdivision.utils.items import Items
+
+
+class PairViolations:
+    """
+    A class representating violations of a pairwise property (e.g. EF1) by pairs of agents `(envious, envied)`.
+
+    Keeps the number of violations of each envious agent and, if `with_ratios` is set, ratios of valuations of own
+    bundles to valuations of envied bundles (`inf` for pairs without violations) together with their minima in rows.
+    Replacing rows or columns of `n` pairs takes `O(n)`, unless the minimum of a row grows.
+    """
+
+    def __init__(self, n: int, with_ratios: bool = True):
+        self.violations: np.ndarray = np.zeros((n, n), dtype=bool)
+        self.row_counts: np.ndarray = np.zeros(n, dtype=np.int64)
+        self.count: int = 0
+
+        self.with_ratios: bool = with_ratios
+        self.ratios: np.ndarray = np.full((n, n), np.inf)
+        self.row_minima: np.ndarray = np.full(n, np.inf)
+
+        self.lowest_ratio: float = np.inf
+        self.violating_agents_number: int = 0
+
+    def update_rows(self, rows: np.ndarray, violations: np.ndarray, ratios: Optional[np.ndarray]) -> None:
+        row_counts = violations.sum(axis=1)
+
+        self.count += int(row_counts.sum() - self.row_counts[rows].sum())
+        self.row_counts[rows] = row_counts
+        self.violations[rows] = violations
+
+        if self.with_ratios and ratios is not None:
+            self.ratios[rows] = ratios
+            self.row_minima[rows] = ratios.min(axis=1, initial=np.inf)
+
+    def update_columns(self, columns: np.ndarray, violations: np.ndarray, ratios: Optional[np.ndarray]) -> None:
+        row_counts_change = violations.sum(axis=1) - self.violations[:, columns].sum(axis=1)
+
+        self.count += int(row_counts_change.sum())
+        self.row_counts += row_counts_change
+        self.violations[:, columns] = violations
+
+        if self.with_ratios and ratios is not None:
+            previous_minima = self.ratios[:, columns].min(axis=1, initial=np.inf)
+            minima = ratios.min(axis=1, initial=np.inf)
+
+            self.ratios[:, columns] = ratios
+
+            # rows whose minimum was in the replaced columns and grew have to be searched again
+            grown_rows = np.flatnonzero((previous_minima <= self.row_minima) & (minima > previous_minima))
+
+            self.row_minima = np.minimum(self.row_minima, minima)
+            self.row_minima[grown_rows] = self.ratios[grown_rows].min(axis=1, initial=np.inf)
+
+    def summarize(self) -> None:
+        """
+        Updates `lowest_ratio` and `violating_agents_number` after rows or columns are replaced, in `O(n)`.
+        """
+
+        self.lowest_ratio = float(self.row_minima.min(initial=np.inf))
+        self.violating_agents_number = int(np.count_nonzero(self.row_counts))
+
+
+class FairnessMonitor(AllocationListener):
+    """
+    A class watching EF, EF1, EFX and PROP of `allocation` of `items` to `agents` while it changes.
+
+    The monitor subscribes to `allocation` and keeps `BundleAggregates` together with violations of the properties
+    by all pairs of agents. Allocating an item to one agent changes only her row and column of pairs, so it is handled
+    in `O(n)`, reallocating bundles of `k` agents in `O(n * k)`. All queries take `O(1)` and give the same results as
+    the corresponding checkers, assuming additive and non-negative valuations.
+
+    For example, the monitor of a partial allocation passed to `envy_cycle_elimination` follows the whole algorithm.
+    """
+
+    def __init__(self, agents: Agents, items: Items, allocation: Allocation):
+        self.aggregates: BundleAggregates = BundleAggregates(agents, allocation)
+
+        self.positions: dict[Agent, int] = {}
+
+        for position, agent in enumerate(self.aggregates.agents):
+            self.positions[agent] = position
+
+        n = len(self.aggregates.agents)
+
+        self.ef: PairViolations = PairViolations(n, with_ratios=False)
+        self.ef1: PairViolations = PairViolations(n)
+        self.efx: PairViolations = PairViolations(n)
+
+        self.proportional_shares: np.ndarray = np.array(self.aggregates.get_total_valuations(items)) / max(n, 1)
+        self.prop_violations_number: int = 0
+        self.lowest_prop_ratio: float = np.inf
+
+        self.__update(np.arange(n))
+
+        self.allocation: Allocation = allocation
+        allocation.subscribe(self)
+
+    def on_allocate(self, allocation: Allocation, agent: Agent, item: Item) -> None:
+        position = self.positions[agent]
+
+        self.aggregates.add_item(position, self.aggregates.get_item_valuations(item))
+        self.__update(np.array([position]))
+
+    def on_allocate_bundle(
+        self, allocation: Allocation, agent: Agent, bundle: Bundle, previous_owner: Optional[Agent]
+    ) -> None:
+        positions = [self.positions[agent]]
+
+        self.aggregates.set_bundle(positions[0], bundle)
+
+        if previous_owner is not None:
+            positions.append(self.positions[previous_owner])
+            self.aggregates.set_bundle(positions[1], allocation.for_agent(previous_owner))
+
+        self.__update(np.array(positions))
+
+    def on_reallocate_bundles(self, allocation: Allocation, cycle: list[tuple[Agent, Agent]]) -> None:
+        envious_positions = [self.positions[envious] for envious, _ in cycle]
+        envied_positions = [self.positions[envied] for _, envied in cycle]
+
+        self.aggregates.move_bundles(envied_positions, envious_positions)
+        self.__update(np.array(envious_positions))
+
+    def stop(self) -> None:
+        """
+        Unsubscribes from the allocation, after which the monitor is no longer updated.
+        """
+
+        self.allocation.unsubscribe(self)
+
+    def is_ef(self) -> bool:
+        return self.ef.count == 0
+
+    def is_ef1(self) -> bool:
+        return self.ef1.count == 0
+
+    def highest_ef1_approximation(self) -> float:
+        return round(min(1.0, self.ef1.lowest_ratio), 3)
+
+    def ef1_satisfied_fraction(self) -> float:
+        return self.__satisfied_fraction(self.ef1.violating_agents_number)
+
+    def is_efx(self) -> bool:
+        return self.efx.count == 0
+
+    def highest_efx_approximation(self) -> float:
+        return round(min(1.0, self.efx.lowest_ratio), 3)
+
+    def efx_satisfied_fraction(self) -> float:
+        return self.__satisfied_fraction(self.efx.violating_agents_number)
+
+    def is_prop(self) -> bool:
+        return self.prop_violations_number == 0
+
+    def highest_prop_approximation(self) -> float:
+        return round(min(1.0, self.lowest_prop_ratio), 3)
+
+    def prop_satisfied_fraction(self) -> float:
+        return self.__satisfied_fraction(self.prop_violations_number)
+
+    def __satisfied_fraction(self, violating_agents_number: int) -> float:
+        n = len(self.aggregates.agents)
+
+        return round((n - violating_agents_number) / n, 3)
+
+    def __update(self, positions: np.ndarray) -> None:
+        """
+        Updates violations in rows and columns at `positions`, after bundles of these agents changed.
+        """
+
+        n = len(self.aggregates.agents)
+        all_positions = np.arange(n)
+
+        row_violations = self.__get_violations(positions, all_positions)
+        column_violations = self.__get_violations(all_positions, positions)
+
+        for pair_violations, rows, columns in zip([self.ef, self.ef1, self.efx], row_violations, column_violations):
+            pair_violations.update_rows(positions, *rows)
+            pair_violations.update_columns(positions, *columns)
+            pair_violations.summarize()
+
+        own_valuations = self.aggregates.get_own_valuations()
+        prop_violations = own_valuations < self.proportional_shares
+
+        self.prop_violations_number = int(np.count_nonzero(prop_violations))
+        self.lowest_prop_ratio = float(
+            (own_valuations[prop_violations] / self.proportional_shares[prop_violations]).min(initial=np.inf)
+        )
+
+    def __get_violations(
+        self, rows: np.ndarray, columns: np.ndarray
+    ) -> list[tuple[np.ndarray, Optional[np.ndarray]]]:
+        """
+        Returns violations of EF, EF1 and EFX for pairs of envious agents at `rows` and envied agents at `columns`,
+        together with ratios of EF1 and EFX, with the same conditions as the checkers.
+        """
+
+        aggregates = self.aggregates
+        block = np.ix_(rows, columns)
+
+        totals = aggregates.totals[block]
+        own_valuations = aggregates.totals[rows, rows][:, np.newaxis]
+        comparable = (aggregates.sizes[columns] > 0)[np.newaxis, :] & (rows[:, np.newaxis] != columns[np.newaxis, :])
+
+        ef_violations = comparable & (totals > own_valuations)
+
+        # removing the most valuable item leaves the least valuable subset
+        ef1_valuations = totals - aggregates.maxima[block]
+        ef1_violations = comparable & (ef1_valuations > own_valuations)
+
+        # removing the least positively valued item leaves the most valuable subset
+        efx_valuations = totals - aggregates.minima_positive[block]
+        efx_violations = comparable & aggregates.has_positive[block] & (efx_valuations > own_valuations)
+
+        return [
+            (ef_violations, None),
+            (ef1_violations, get_ratios(own_valuations, ef1_valuations, ef1_violations)),
+            (efx_violations, get_ratios(own_valuations, efx_valuations, efx_violations))
+        ]
+
+
+# -- PRIVATE FUNCTIONS --
+
+def get_ratios(own_valuations: np.ndarray, other_valuations: np.ndarray, violations: np.ndarray) -> np.ndarray:
+    # assumes non-negative valuations
+    return np.divide(
+        np.broadcast_to(own_valuations, violations.shape),
+        other_valuations,
+        out=np.full(violations.shape, np.inf),
+        where=violations
+    )
@@ -0,0 +1,129 @@
+from typing import Any, Optional
+
+from fairdivision.utils.aggregates import BundleAggregates, get_bundle_aggregates
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.batch_checkers import get_ef_violations
+from fairdivision.utils.checkers import (
+    ef1_satisfied_fraction,
+    efx0_satisfied_fraction,
+    efx_satisfied_fraction,
+    find_mms_violation,
+    get_first_violation,
+    get_mms_approximation,
+    get_prop_results,
+    highest_ef1_approximation,
+    highest_efx0_approximation,
+    highest_efx_approximation,
+    is_ef1,
+    is_ef2,
+    is_efx,
+    is_efx0,
+    is_prop1
+)
+from fairdivision.utils.helpers import get_maximin_share_bounds
+from fairdivision.utils.items import Items
+
+
+# properties checked by `fairness_report` by default, "prop1" and "mms" have to be requested explicitly
+DEFAULT_PROPERTIES = ["ef", "ef1", "ef2", "efx0", "efx", "prop"]
+
+ALL_PROPERTIES = DEFAULT_PROPERTIES + ["prop1", "mms"]
+
+
+def fairness_report(
+    agents: Agents, items: Items, allocation: Allocation, properties: Optional[list[str]] = None
+) -> dict[str, dict[str, Any]]:
+    """
+    Checks all `properties` (see `ALL_PROPERTIES`, `DEFAULT_PROPERTIES` if not given) of `allocation` of `items` to
+    `agents` at once.
+
+    Returns a dictionary mapping each property to a dictionary with the result of its checker under `"result"` (`True`
+    or a tuple with a witness), and its highest approximation (`"approximation"`) and satisfied fraction of agents
+    (`"satisfied_fraction"`) if they are defined. The results are the same as of the separate checkers, but valuations
+    of bundles and their items are aggregated only once.
+
+    For example:
+
+        {
+            "ef": {"result": (False, (Agent(2), Agent(1)))},
+            "ef1": {"result": True, "approximation": 1.0, "satisfied_fraction": 1.0},
+            ...
+        }
+    """
+
+    if properties is None:
+        properties = DEFAULT_PROPERTIES
+
+    for name in properties:
+        if name not in ALL_PROPERTIES:
+            raise Exception(f"Unknown property {name}, expected one of {ALL_PROPERTIES}")
+
+    aggregates = get_bundle_aggregates(agents, allocation)
+    report: dict[str, dict[str, Any]] = {}
+
+    for name in properties:
+        if name == "ef":
+            report[name] = {"result": get_first_violation(aggregates, get_ef_violations(aggregates))}
+        elif name == "ef1":
+            report[name] = {
+                "result": is_ef1(agents, allocation, aggregates),
+                "approximation": highest_ef1_approximation(agents, allocation, aggregates),
+                "satisfied_fraction": ef1_satisfied_fraction(agents, allocation, aggregates)
+            }
+        elif name == "ef2":
+            report[name] = {"result": is_ef2(agents, allocation, aggregates)}
+        elif name == "efx0":
+            report[name] = {
+                "result": is_efx0(agents, allocation, aggregates),
+                "approximation": highest_efx0_approximation(agents, allocation, aggregates),
+                "satisfied_fraction": efx0_satisfied_fraction(agents, allocation, aggregates)
+            }
+        elif name == "efx":
+            report[name] = {
+                "result": is_efx(agents, allocation, aggregates),
+                "approximation": highest_efx_approximation(agents, allocation, aggregates),
+                "satisfied_fraction": efx_satisfied_fraction(agents, allocation, aggregates)
+            }
+        elif name == "prop":
+            report[name] = get_prop_report(agents, items, aggregates)
+        elif name == "prop1":
+            report[name] = {"result": is_prop1(agents, items, allocation)}
+        elif name == "mms":
+            report[name] = get_mms_report(agents, items, allocation)
+
+    return report
+
+
+# -- PRIVATE FUNCTIONS --
+
+def get_prop_report(agents: Agents, items: Items, aggregates: BundleAggregates) -> dict[str, Any]:
+    """
+    Returns the same results as `is_prop`, `highest_prop_approximation` and `prop_satisfied_fraction`, computed with
+    one pass over agents from the aggregated valuations.
+    """
+
+    own_valuations = aggregates.get_own_valuations().tolist()
+    result, alpha, satisfied_fraction = get_prop_results(agents, own_valuations, aggregates.get_total_valuations(items))
+
+    return {
+        "result": result,
+        "approximation": alpha,
+        "satisfied_fraction": satisfied_fraction
+    }
+
+
+def get_mms_report(agents: Agents, items: Items, allocation: Allocation) -> dict[str, Any]:
+    """
+    Returns the same results as `is_mms` and `highest_mms_approximation` with `use_bounds` set, computing the bounds
+    and the maximin share of every agent at most once for both of them.
+    """
+
+    maximin_share_bounds = get_maximin_share_bounds(agents, items)
+    maximin_shares: dict[Agent, int] = {}
+
+    return {
+        "result": find_mms_violation(agents, items, allocation, maximin_share_bounds, maximin_shares),
+        "approximation": get_mms_approximation(agents, items, allocation, maximin_share_bounds, maximin_shares)
+    }
@@ -1,8 +1,10 @@
+import numpy as np
 import random
 
 from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
 from fairdivision.utils.bundle import Bundle
+from fairdivision.utils.instance import Instance
 from fairdivision.utils.item import Item
 from fairdivision.utils.items import Items
 
@@ -94,5 +96,24 @@ def generate_valuations(agents: Agents, items: Items, generator: ValuationsGener
     for agent in agents:
         valuations = generator.valuate_items(items)
 
-        for item, valuation in zip(items.get_items(), valuations):
-            agent.assign_valuation(item, valuation)
+        agent.assign_valuations(items, valuations)
+
+
+def generate_instance(n: int, m: int, generator: ValuationsGenerator) -> Instance:
+    """
+    Generates an `Instance` with `n` agents and `m` items, and valuations generated by `generator`.
+
+    Valuations are written directly into the matrix of the instance, and the agents are bound to it.
+    """
+
+    agents = generate_agents(n)
+    items = generate_items(m)
+
+    instance = Instance(agents, items, np.zeros((n, m), dtype=np.int64))
+
+    for row in range(n):
+        instance.valuations[row] = generator.valuate_items(items)
+
+    instance.bind_agents()
+
+    return instance
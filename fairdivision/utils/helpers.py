@@ -1,11 +1,12 @@
 import networkx as nx # type: ignore
 import os
 
-from fairdivision.algorithms.all_allocations import all_allocations
 from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
 from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.envy_graph import EnvyGraph
 from fairdivision.utils.items import Items
+from fairdivision.utils.maximin_share import get_agent_maximin_share, get_agent_maximin_share_bounds
 
 
 def get_maximin_shares(agents: Agents, items: Items) -> dict[Agent, int]:
@@ -16,14 +17,17 @@ def get_maximin_shares(agents: Agents, items: Items) -> dict[Agent, int]:
     were to split all items into a number of bundles equal to the number of agents and receive the worst bundle.
     """
 
-    maximin_shares = dict([(agent, 0) for agent in agents])
+    return dict([(agent, get_agent_maximin_share(agent, items, agents.size())) for agent in agents])
 
-    for possible_allocation in all_allocations(agents, items):
-        for agent in agents:
-            worst_valuation = min([agent.get_valuation(bundle) for _, bundle in possible_allocation.get_allocation()])
-            maximin_shares[agent] = max(maximin_shares[agent], worst_valuation)
 
-    return maximin_shares
+def get_maximin_share_bounds(agents: Agents, items: Items) -> dict[Agent, tuple[int, int]]:
+    """
+    Returns a dictionary mapping each agent to a tuple `(lower_bound, upper_bound)` of her maximin share value.
+
+    Unlike `get_maximin_shares`, the bounds are found in polynomial time.
+    """
+
+    return dict([(agent, get_agent_maximin_share_bounds(agent, items, agents.size())) for agent in agents])
 
 
 def export_to_file(agents: Agents, items: Items, file_path: str) -> None:
@@ -47,9 +51,9 @@ def export_to_file(agents: Agents, items: Items, file_path: str) -> None:
                 file.write("\n")
 
 
-def print_envy_graph(graph: nx.DiGraph) -> None:
+def print_envy_graph(graph: nx.DiGraph | EnvyGraph) -> None:
     """
-    Pretty prints adjacency list of `graph` .
+    Pretty prints adjacency list of `graph` (`EnvyGraph` is exported to `networkx` first).
 
     For example:
 
@@ -60,6 +64,9 @@ def print_envy_graph(graph: nx.DiGraph) -> None:
 
     """
 
+    if isinstance(graph, EnvyGraph):
+        graph = graph.to_networkx()
+
     print("GRAPH")
     for envious, envied in graph.adj.items():
         print(f"{envious}: {[agent for agent, _attr in envied.items()]}")
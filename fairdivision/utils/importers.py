@@ -1,9 +1,11 @@
 from io import TextIOWrapper
+import numpy as np
 
-from fairdivision.utils.agent import Agent
 from fairdivision.utils.agents import Agents
 from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.bitset_items import get_universe
 from fairdivision.utils.generators import generate_agents, generate_items
+from fairdivision.utils.instance import Instance, get_bound_instance
 from fairdivision.utils.items import Items
 
 
@@ -13,7 +15,21 @@ def import_from_file(file_path: str) -> tuple[Agents, Items, list[str]]:
     """
     Imports Agents, Items and a list of valuation restrictions from file in `file_path`.
 
-    The file should follow the standard of fair division instance described in the README.md file.
+    The file should follow the standard of fair division instance described in the README.md file. Agents are bound
+    to the `Instance` holding their valuations.
+    """
+
+    instance, restrictions = import_instance_from_file(file_path)
+
+    return instance.agents, instance.items, restrictions
+
+
+def import_instance_from_file(file_path: str) -> tuple[Instance, list[str]]:
+    """
+    Imports an `Instance` and a list of valuation restrictions from file in `file_path`.
+
+    The file should follow the standard of fair division instance described in the README.md file. Valuations are
+    parsed directly into the matrix of the instance and its agents are bound to it.
     """
 
     with open(file_path, "r") as file:
@@ -28,12 +44,15 @@ def import_from_file(file_path: str) -> tuple[Agents, Items, list[str]]:
         agents = generate_agents(n)
         items = generate_items(m)
 
+        instance = Instance(agents, items, np.zeros((n, m), dtype=np.int64))
+
         if "additive" in restrictions:
             for i in range(2, n + 2):
-                agent_number = i - 1
-                parse_valuations(lines[i], agents.get_agent(agent_number), items)
+                instance.valuations[i - 2] = parse_valuations(lines[i], items)
+
+            instance.bind_agents()
         
-        return agents, items, restrictions
+        return instance, restrictions
 
 
 def import_allocation_from_dict(agents: Agents, items: Items, allocation_dict: dict[int, list[int]]) -> Allocation:
@@ -53,7 +72,7 @@ def import_allocation_from_dict(agents: Agents, items: Items, allocation_dict: d
         ```
     """
 
-    allocation = Allocation(agents)
+    allocation = Allocation(agents, get_universe(items), get_bound_instance(agents, items))
     
     for agent_index, bundle_list in allocation_dict.items():
         agent = agents.get_agent(agent_index)
@@ -80,15 +99,13 @@ def parse_agents_and_items(line: str) -> tuple[int, int]:
     return int(line_as_list[0]), int(line_as_list[1])
 
 
-def parse_valuations(line: str, agent: Agent, items: Items) -> None:
+def parse_valuations(line: str, items: Items) -> list[int]:
     valuations = [int(valuation) for valuation in split_and_strip(line)]
 
     if len(valuations) != items.size():
         raise Exception(f"Expected {items.size()} valuations in every line, found a line with {len(valuations)}")
     
-    for i in range(len(valuations)):
-        item_number = i + 1
-        agent.assign_valuation(items.get_item(item_number), valuations[i])
+    return valuations
 
 
 def split_into_lines(file: TextIOWrapper) -> list[str]:
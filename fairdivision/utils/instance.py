@@ -0,0 +1,250 @@
+from __future__ import annotations
+import numpy as np
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fairdivision.utils.agent import Agent
+
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.bitset_items import BitsetItems, ItemsUniverse
+from fairdivision.utils.bundle import Bundle
+from fairdivision.utils.item import Item
+from fairdivision.utils.items import Items
+
+
+# collections of at most this many items are summed in a plain loop, which is faster than NumPy's fancy indexing
+VECTORIZATION_THRESHOLD = 32
+
+
+class Instance:
+    """
+    A class representating an instance of the fair division problem with additive valuations.
+
+    Contains `Agents`, `Items` and one contiguous `n x m` integer matrix of valuations. The `i`-th row of the matrix
+    belongs to the `i`-th agent in the ascending order of indices, and the `j`-th column belongs to the `j`-th item in
+    the ascending order of indices.
+
+    Agents bound to the instance (see `bind_agents`) do not store their valuations in dictionaries, they read them from
+    the matrix instead.
+    """
+
+    def __init__(self, agents: Agents, items: Items, valuations: Optional[np.ndarray] = None):
+        self.agents: Agents = agents
+        self.items: Items = items
+
+        self.rows: dict[int, int] = dict([(index, row) for row, index in enumerate(agents.get_indices())])
+        self.columns: dict[int, int] = dict([(index, column) for column, index in enumerate(items.get_indices())])
+
+        if valuations is None:
+            valuations = self.__collect_valuations()
+
+        self.valuations: np.ndarray = np.ascontiguousarray(valuations, dtype=np.int64)
+        self.universe: Optional[ItemsUniverse] = None
+
+        if self.valuations.shape != (agents.size(), items.size()):
+            expected_shape = (agents.size(), items.size())
+            raise Exception(f"Expected valuations of shape {expected_shape}, got {self.valuations.shape}")
+
+    def __repr__(self):
+        return f"Instance({self.agents.size()} agents, {self.items.size()} items)"
+
+    def __str__(self):
+        return repr(self)
+
+    def __collect_valuations(self) -> np.ndarray:
+        valuations = np.zeros((self.agents.size(), self.items.size()), dtype=np.int64)
+
+        for row, agent in enumerate(self.agents):
+            for column, item in enumerate(self.items):
+                valuations[row, column] = agent.get_valuation(item)
+
+        return valuations
+
+    def bind_agents(self) -> None:
+        """
+        Makes all agents of the instance read and write their valuations of the instance items from the matrix.
+        """
+
+        for agent in self.agents:
+            agent.bind_instance(self)
+
+    def get_universe(self) -> ItemsUniverse:
+        """
+        Returns the universe of the instance items. Positions of items in the universe are equal to their columns, so
+        valuations of `BitsetItems` from this universe are summed without looking up their items.
+        """
+
+        if self.universe is None:
+            self.universe = ItemsUniverse(self.items)
+
+        return self.universe
+
+    def has_item(self, item: Item) -> bool:
+        return item.get_index() in self.columns
+
+    def get_row(self, agent: Agent) -> int:
+        if agent.get_index() in self.rows:
+            return self.rows[agent.get_index()]
+        else:
+            raise Exception(f"{self} does not contain {agent}")
+
+    def get_column(self, item: Item) -> int:
+        if item.get_index() in self.columns:
+            return self.columns[item.get_index()]
+        else:
+            raise Exception(f"{self} does not contain {item}")
+
+    def get_columns(self, items: Items | Bundle) -> Optional[np.ndarray]:
+        """
+        Returns columns of the matrix corresponding to `items`, or `None` if any of them is not in the instance.
+        """
+
+        bitset = self.__as_bitset(items)
+
+        if bitset is not None and self.__is_from_universe(bitset):
+            return bitset.get_positions()
+
+        columns = np.empty(items.size(), dtype=np.intp)
+
+        for position, item in enumerate(items):
+            column = self.columns.get(item.get_index())
+
+            if column is None:
+                return None
+
+            columns[position] = column
+
+        return columns
+
+    def sum_valuations(self, row: int, items: Items | Bundle) -> Optional[int]:
+        """
+        Returns the sum of valuations from the `row` of the matrix over `items`, or `None` if any of them is not in
+        the instance.
+        """
+
+        if items.size() <= VECTORIZATION_THRESHOLD and not self.__is_from_universe(items):
+            valuation = 0
+
+            for item in items:
+                column = self.columns.get(item.get_index())
+
+                if column is None:
+                    return None
+
+                valuation += self.valuations.item(row, column)
+
+            return valuation
+
+        columns = self.get_columns(items)
+
+        if columns is None:
+            return None
+
+        return int(self.valuations[row, columns].sum())
+
+    def get_favorite_item(self, row: int, items: Items) -> Optional[Item]:
+        """
+        Returns the item from `items` with the highest valuation in the `row` of the matrix, breaking ties in favor of
+        lower indices. Returns `None` if `items` are too few to vectorize the search or not all of them are in the
+        instance.
+        """
+
+        if items.size() <= VECTORIZATION_THRESHOLD:
+            return None
+
+        columns = self.get_columns(items)
+
+        if columns is None:
+            return None
+
+        # `argmax` returns the first maximum, so ties are broken in favor of lower indices
+        return items.get_items()[int(self.valuations[row, columns].argmax())]
+
+    def __is_from_universe(self, items: Items | Bundle) -> bool:
+        bitset = self.__as_bitset(items)
+
+        return bitset is not None and self.universe is not None and bitset.universe is self.universe
+
+    def __as_bitset(self, items: Items | Bundle) -> Optional[BitsetItems]:
+        if isinstance(items, Bundle):
+            items = items.get_items()
+
+        return items if isinstance(items, BitsetItems) else None
+
+    def get_valuations(self, agent: Agent) -> np.ndarray:
+        """
+        Returns the row of the matrix with `agent`'s valuations of all items.
+        """
+
+        return self.valuations[self.get_row(agent)]
+
+    def get_valuation(self, agent: Agent, item_or_items: Item | Items | Bundle) -> int:
+        row = self.get_row(agent)
+
+        if isinstance(item_or_items, Item):
+            return self.valuations.item(row, self.get_column(item_or_items))
+        else:
+            valuation = self.sum_valuations(row, item_or_items)
+
+            if valuation is None:
+                raise Exception(f"{self} does not contain all items from {item_or_items}")
+
+            return valuation
+
+    def size(self) -> tuple[int, int]:
+        return self.agents.size(), self.items.size()
+
+
+def get_instance(agents: Agents, items: Items) -> Instance:
+    """
+    Returns an `Instance` for `agents` and `items`.
+
+    If all `agents` are bound to the same instance which contains all `items`, it is reused (or its matrix is sliced
+    if only a part of it is needed). Otherwise, the valuations are collected from the agents into a new matrix. Agents
+    are never rebound by this function.
+
+    The reused instance is the live one the agents are bound to, so it is not a snapshot: later valuation changes of
+    the agents are visible through it. Callers which need a snapshot should copy its `valuations`.
+    """
+
+    instance = get_bound_instance(agents, items)
+
+    if instance is None:
+        return Instance(agents, items)
+    else:
+        return instance
+
+
+def get_bound_instance(agents: Agents, items: Items) -> Optional[Instance]:
+    """
+    Returns an `Instance` for `agents` and `items` if all `agents` are bound to the same instance which contains all
+    `items`, and `None` otherwise. Valuations are never collected from the agents.
+    """
+
+    instance = get_common_instance(agents)
+
+    if instance is None or not all(instance.has_item(item) for item in items):
+        return None
+
+    if instance.agents.size() == agents.size() and instance.items.size() == items.size():
+        return instance
+
+    rows = [instance.get_row(agent) for agent in agents]
+    columns = [instance.get_column(item) for item in items]
+
+    return Instance(agents, items, instance.valuations[np.ix_(rows, columns)])
+
+
+def get_common_instance(agents: Agents) -> Optional[Instance]:
+    """
+    Returns the `Instance` that all `agents` are bound to, or `None` if there is no such instance.
+    """
+
+    instance = None
+    for agent in agents:
+        if agent.instance is None or (instance is not None and agent.instance is not instance):
+            return None
+
+        instance = agent.instance
+
+    return instance
@@ -1,4 +1,5 @@
 from __future__ import annotations
+from bisect import insort
 from typing import Iterator
 
 from fairdivision.utils.item import Item
@@ -18,6 +19,9 @@ class Items:
         self.sorted_items: list[Item] = []
         self.__initialize_items(items_list)
 
+        # incremented by `add_item`, so that structures remembering absent items know when they may come back
+        self.additions: int = 0
+
     def __eq__(self, other):
         return self.get_items() == other.get_items()
 
@@ -43,8 +47,9 @@ class Items:
         self.sorted_items = sorted(items_list, key=lambda item: item.get_index())
 
     def add_item(self, item: Item) -> None:
+        self.additions += 1
         self.items[item.get_index()] = item
-        self.sorted_items = sorted(self.sorted_items + [item], key=lambda item: item.get_index())
+        insort(self.sorted_items, item, key=lambda item: item.get_index())
 
     def get_item(self, index: int) -> Item:
         if index in self.items:
@@ -0,0 +1,485 @@
+import heapq
+import numpy as np
+from functools import lru_cache
+from itertools import islice
+from typing import Iterator
+
+from fairdivision.algorithms.all_allocations import all_partitions
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.items import Items
+
+
+# bundle completions are tried from the best fitting ones only if there are at most this many of them
+SORTED_COMPLETIONS_LIMIT = 200
+
+# number of distinct valuations of items (and numbers of bundles) with remembered maximin shares and their bounds
+MAXIMIN_SHARES_CACHE_SIZE = 1024
+
+# at most this many of the least valuable items of two bundles are split between them again when rebalancing
+REBALANCED_ITEMS_LIMIT = 32
+
+
+def get_agent_maximin_share(agent: Agent, items: Items, n: int) -> int:
+    """
+    Returns the maximin share of `agent` for `items` divided into `n` bundles.
+
+    The maximin share is found with `maximin_share` if all valuations are non-negative, and remembered for the same
+    valuations and `n`, so that it is computed once per agent of an instance. Otherwise, all partitions of `items` are
+    checked, and the share is at least 0, as it was always computed this way.
+    """
+
+    valuations = [agent.get_valuation(item) for item in items]
+
+    if all(valuation >= 0 for valuation in valuations):
+        return cached_maximin_share(tuple(sorted(valuations)), n)
+
+    partitions = all_partitions(items, n, agent)
+    valuations = [agent.get_valuation(item) for item in partitions.items]
+
+    share = 0
+
+    for partition in partitions:
+        bundle_valuations = [0] * n
+
+        for bundle, valuation in zip(partition, valuations):
+            bundle_valuations[bundle] += valuation
+
+        share = max(share, min(bundle_valuations))
+
+    return share
+
+
+def get_agent_maximin_share_bounds(agent: Agent, items: Items, n: int) -> tuple[int, int]:
+    """
+    Returns a tuple `(lower_bound, upper_bound)` of the maximin share of `agent` for `items` divided into `n` bundles,
+    found in polynomial time.
+
+    If some valuations are negative, the bounds are only 0 and the proportional share.
+    """
+
+    valuations = [agent.get_valuation(item) for item in items]
+
+    if all(valuation >= 0 for valuation in valuations):
+        return cached_maximin_share_bounds(tuple(sorted(valuations)), n)
+
+    if n <= 0:
+        return (0, 0)
+
+    return (0, max(0, sum(valuations) // n))
+
+
+def maximin_share(valuations: list[int], n: int) -> int:
+    """
+    Returns the highest valuation of the worst bundle, over all partitions of items with non-negative `valuations`
+    into `n` bundles.
+
+    The share is binary searched between the bounds from `maximin_share_bounds`, where each step checks with branch
+    and bound if the items can be split into `n` bundles worth at least the tested value.
+
+    The search takes exponential time in the worst case. It is fast for small valuations, and for large ones when the
+    lower bound already reaches the upper bound, as it usually does for many items with random valuations (e.g. 50 items
+    worth up to `10^6` split into 3 bundles). It may take minutes if the bounds differ and the values to test are large
+    compared to the number of partitions, e.g. for 50 items worth up to `10^9` split into 4 bundles or 50 items worth up
+    to `10^6` split into 5 or more bundles.
+    """
+
+    lower_bound, upper_bound = maximin_share_bounds(valuations, n)
+
+    # items of value 0 never change the valuation of a bundle
+    valuations = sorted([valuation for valuation in valuations if valuation > 0], reverse=True)
+
+    while lower_bound < upper_bound:
+        target = (lower_bound + upper_bound + 1) // 2
+
+        if can_cover(valuations, n, target):
+            lower_bound = target
+        else:
+            upper_bound = target - 1
+
+    return lower_bound
+
+
+def maximin_share_bounds(valuations: list[int], n: int) -> tuple[int, int]:
+    """
+    Returns a tuple `(lower_bound, upper_bound)` of the maximin share for non-negative `valuations` and `n` bundles,
+    found in polynomial time.
+
+    The lower bound is the worst bundle of the best of three partitions: greedy, snake draft and largest differencing.
+    The upper bound is the least of the proportional shares of items without the `k - 1` most valuable ones among the
+    other `n - k + 1` bundles.
+    """
+
+    if n <= 0:
+        return (0, 0)
+
+    if any(valuation < 0 for valuation in valuations):
+        raise Exception(f"Expected non-negative valuations, got {valuations}")
+
+    valuations = sorted([valuation for valuation in valuations if valuation > 0], reverse=True)
+
+    if len(valuations) < n:
+        return (0, 0)
+
+    lower_bound = max(
+        greedy_lower_bound(valuations, n),
+        snake_lower_bound(valuations, n),
+        differencing_lower_bound(valuations, n)
+    )
+
+    return (lower_bound, top_items_upper_bound(valuations, n))
+
+
+# -- PRIVATE FUNCTIONS --
+
+@lru_cache(maxsize=MAXIMIN_SHARES_CACHE_SIZE)
+def cached_maximin_share(valuations: tuple[int, ...], n: int) -> int:
+    return maximin_share(list(valuations), n)
+
+
+@lru_cache(maxsize=MAXIMIN_SHARES_CACHE_SIZE)
+def cached_maximin_share_bounds(valuations: tuple[int, ...], n: int) -> tuple[int, int]:
+    return maximin_share_bounds(list(valuations), n)
+
+
+def greedy_lower_bound(valuations: list[int], n: int) -> int:
+    """
+    Returns the valuation of the worst bundle when items from the sorted `valuations` are given one by one to the
+    currently worst bundle.
+    """
+
+    bundle_valuations = [0] * n
+
+    for valuation in valuations:
+        heapq.heapreplace(bundle_valuations, bundle_valuations[0] + valuation)
+
+    return bundle_valuations[0]
+
+
+def snake_lower_bound(valuations: list[int], n: int) -> int:
+    """
+    Returns the valuation of the worst bundle when items from the sorted `valuations` are given to bundles in the
+    order `1, 2, ..., n, n, ..., 2, 1, 1, 2, ...`.
+    """
+
+    bundle_valuations = [0] * n
+
+    for position, valuation in enumerate(valuations):
+        round_position = position % (2 * n)
+        bundle_valuations[min(round_position, 2 * n - 1 - round_position)] += valuation
+
+    return min(bundle_valuations)
+
+
+def differencing_lower_bound(valuations: list[int], n: int) -> int:
+    """
+    Returns the valuation of the worst bundle of a partition found with the largest differencing method of Karmarkar
+    and Karp, improved by moving and swapping items between the worst bundle and the others, and then by splitting the
+    items of the worst bundle and another one between the two again.
+
+    Every item starts as a partial partition with one non-empty bundle. The two partial partitions with the greatest
+    difference between their best and worst bundles are repeatedly merged, joining the best bundles of one with the
+    worst bundles of the other.
+    """
+
+    heap: list[tuple[int, int, list[list]]] = []
+    for position, valuation in enumerate(valuations):
+        initial_bundles: list[list] = [[valuation, [valuation]]] + [[0, []] for _ in range(n - 1)]
+        heap.append((-valuation, position, initial_bundles))
+
+    heapq.heapify(heap)
+
+    while len(heap) > 1:
+        _, position, first_bundles = heapq.heappop(heap)
+        _, _, second_bundles = heapq.heappop(heap)
+
+        bundles: list[list] = []
+        for first_bundle, second_bundle in zip(first_bundles, reversed(second_bundles)):
+            bundles.append([first_bundle[0] + second_bundle[0], first_bundle[1] + second_bundle[1]])
+
+        bundles.sort(key=lambda bundle: bundle[0], reverse=True)
+        heapq.heappush(heap, (bundles[-1][0] - bundles[0][0], position, bundles))
+
+    _, _, bundles = heap[0]
+
+    # every improvement takes polynomial time, so their number is limited as well
+    for _ in range(len(valuations) * n):
+        if not improve_worst_bundle(bundles):
+            break
+
+    for _ in range(len(valuations) * n):
+        bundles.sort(key=lambda bundle: bundle[0])
+
+        if not any(
+            rebalance_bundles(bundles[worse], bundles[better])
+            for worse in range(n - 1) for better in range(n - 1, worse, -1)
+        ):
+            break
+
+    return min(bundle[0] for bundle in bundles)
+
+
+def improve_worst_bundle(bundles: list[list]) -> bool:
+    """
+    Moves one item to the worst of `bundles`, or swaps one of its items for a more valuable one, if the worse of the
+    two changed bundles becomes better than the worst bundle was. Returns `False` if no such change exists.
+    """
+
+    worst_bundle = min(bundles, key=lambda bundle: bundle[0])
+    worst_valuation, worst_items = worst_bundle
+
+    for bundle in bundles:
+        if bundle is worst_bundle:
+            continue
+
+        valuation, items = bundle
+
+        for position, item in enumerate(items):
+            if valuation - item > worst_valuation:
+                items.pop(position)
+                worst_items.append(item)
+                bundle[0] -= item
+                worst_bundle[0] += item
+
+                return True
+
+            for worst_position, worst_item in enumerate(worst_items):
+                difference = item - worst_item
+
+                if difference > 0 and valuation - difference > worst_valuation:
+                    items[position], worst_items[worst_position] = worst_item, item
+                    bundle[0] -= difference
+                    worst_bundle[0] += difference
+
+                    return True
+
+    return False
+
+
+def rebalance_bundles(worse_bundle: list, bundle: list) -> bool:
+    """
+    Splits items of `worse_bundle` and a more valuable `bundle` between the two again, so that the worse of them is as
+    valuable as possible, if it becomes better than `worse_bundle` was. Returns `False` if no such split exists.
+
+    Only the `REBALANCED_ITEMS_LIMIT` least valuable items of the two bundles are split again, while the others stay
+    where they are. The best split is found by meeting in the middle: all subset sums of both halves of these items are
+    enumerated, and every sum of the first half is matched with the sums of the second half around the ideal one.
+    """
+
+    worse_valuation = worse_bundle[0]
+
+    if bundle[0] <= worse_valuation:
+        return False
+
+    pooled = sorted([(item, 0) for item in worse_bundle[1]] + [(item, 1) for item in bundle[1]])
+    split_items = [item for item, _ in pooled[:REBALANCED_ITEMS_LIMIT]]
+    kept_items: list[list[int]] = [[], []]
+
+    for item, side in pooled[REBALANCED_ITEMS_LIMIT:]:
+        kept_items[side].append(item)
+
+    split_valuation = sum(split_items)
+
+    # subset sums are enumerated as 64-bit integers
+    if split_valuation >= 2 ** 62:
+        return False
+
+    kept_worse_valuation, kept_valuation = sum(kept_items[0]), sum(kept_items[1])
+
+    # the worse of the two bundles is the best when the split items given to `worse_bundle` are worth the most without
+    # exceeding `middle`, or the least above it
+    middle = (kept_valuation + split_valuation - kept_worse_valuation) // 2
+
+    first_items, second_items = split_items[:len(split_items) // 2], split_items[len(split_items) // 2:]
+    first_sums, second_sums = get_subset_sums(first_items), get_subset_sums(second_items)
+    second_order = np.argsort(second_sums, kind="stable")
+    sorted_second_sums = second_sums[second_order]
+
+    best_valuation, best_subsets = worse_valuation, None
+    above = np.searchsorted(sorted_second_sums, middle - first_sums, side="right")
+
+    for positions, is_above in [(above - 1, False), (above, True)]:
+        valid = (positions >= 0) & (positions < len(sorted_second_sums))
+
+        if not np.any(valid):
+            continue
+
+        first_subsets = np.flatnonzero(valid)
+        second_positions = positions[valid]
+        sums = first_sums[first_subsets] + sorted_second_sums[second_positions]
+
+        if is_above:
+            valuations = kept_valuation + split_valuation - sums
+        else:
+            valuations = kept_worse_valuation + sums
+
+        best = int(np.argmax(valuations))
+
+        if int(valuations[best]) > best_valuation:
+            best_valuation = int(valuations[best])
+            best_subsets = (int(first_subsets[best]), int(second_order[second_positions[best]]))
+
+    if best_subsets is None:
+        return False
+
+    worse_items, items = kept_items
+
+    for subset, subset_items in zip(best_subsets, [first_items, second_items]):
+        for position, item in enumerate(subset_items):
+            if subset >> position & 1:
+                worse_items.append(item)
+            else:
+                items.append(item)
+
+    worse_bundle[0], worse_bundle[1] = sum(worse_items), worse_items
+    bundle[0], bundle[1] = sum(items), items
+
+    return True
+
+
+def get_subset_sums(valuations: list[int]) -> np.ndarray:
+    """
+    Returns sums of all subsets of `valuations`, where the subset of the `i`-th sum contains the `j`-th valuation if the
+    `j`-th bit of `i` is set.
+    """
+
+    sums = np.zeros(1, dtype=np.int64)
+
+    for valuation in valuations:
+        sums = np.concatenate((sums, sums + valuation))
+
+    return sums
+
+
+def top_items_upper_bound(valuations: list[int], n: int) -> int:
+    """
+    Returns an upper bound on the maximin share for the sorted `valuations`.
+
+    The `k - 1` most valuable items lie in at most `k - 1` bundles, so the other `n - k + 1` bundles have to share the
+    rest of the items. For `k = 1` this is the proportional share.
+    """
+
+    remaining_valuation = sum(valuations)
+    upper_bound = remaining_valuation // n
+
+    for k in range(2, n + 1):
+        remaining_valuation -= valuations[k - 2]
+        upper_bound = min(upper_bound, remaining_valuation // (n - k + 1))
+
+    return upper_bound
+
+
+def can_cover(valuations: list[int], n: int, target: int) -> bool:
+    """
+    Checks if items with the sorted `valuations` can be split into `n` bundles, each worth at least `target`.
+
+    Bundles are completed one by one. The most valuable remaining item is either left out (it can be added to any
+    bundle) or put into the current bundle together with other items, so that the bundle is worth at least `target`
+    and removing its least valuable item would make it worth less. Items with equal valuations are interchangeable, so
+    remaining items are kept as counts of distinct valuations, and failed states are remembered.
+
+    The total valuation of items that are left out or exceed `target` in their bundles is limited by the valuation of
+    all items minus `n * target`.
+    """
+
+    distinct_valuations = sorted(set(valuations), reverse=True)
+    counts = tuple(valuations.count(valuation) for valuation in distinct_valuations)
+
+    failed_states: set[tuple[tuple[int, ...], int]] = set()
+
+    def search(counts: tuple[int, ...], bundles: int, slack: int) -> bool:
+        if bundles <= 1:
+            return slack >= 0
+
+        if (counts, bundles) in failed_states:
+            return False
+
+        first = next(index for index, count in enumerate(counts) if count > 0)
+
+        for taken, waste in ordered_completions(distinct_valuations, counts, first, target, slack):
+            remaining_counts = tuple(count - taken_count for count, taken_count in zip(counts, taken))
+
+            if search(remaining_counts, bundles - 1, slack - waste):
+                return True
+
+        if distinct_valuations[first] <= slack:
+            remaining_counts = counts[:first] + (counts[first] - 1,) + counts[first + 1:]
+
+            if search(remaining_counts, bundles, slack - distinct_valuations[first]):
+                return True
+
+        failed_states.add((counts, bundles))
+
+        return False
+
+    return search(counts, n, sum(valuations) - n * target)
+
+
+def ordered_completions(
+    distinct_valuations: list[int], counts: tuple[int, ...], first: int, target: int, slack: int
+) -> Iterator[tuple[tuple[int, ...], int]]:
+    """
+    Returns an iterator giving the same bundles as `bundle_completions`, where the ones exceeding `target` the least
+    go first if there are at most `SORTED_COMPLETIONS_LIMIT` of them. Otherwise, they are given in the original order,
+    as finding all of them would take too long.
+    """
+
+    completions = bundle_completions(distinct_valuations, counts, first, target, slack)
+    first_completions = [(tuple(taken), waste) for taken, waste in islice(completions, SORTED_COMPLETIONS_LIMIT + 1)]
+
+    if len(first_completions) <= SORTED_COMPLETIONS_LIMIT:
+        first_completions.sort(key=lambda completion: completion[1])
+
+        yield from first_completions
+    else:
+        yield from first_completions
+
+        for taken, waste in completions:
+            yield tuple(taken), waste
+
+
+def bundle_completions(
+    distinct_valuations: list[int], counts: tuple[int, ...], first: int, target: int, slack: int
+) -> Iterator[tuple[list[int], int]]:
+    """
+    Returns an iterator giving bundles which contain an item with the valuation `distinct_valuations[first]`, are worth
+    between `target` and `target + slack`, and are worth less than `target` without their least valuable item.
+
+    Bundles are given as counts of taken items of each valuation together with the valuation over `target`, starting
+    with the ones containing the most valuable items.
+    """
+
+    suffix_sums = [0] * (len(counts) + 1)
+    for index in range(len(counts) - 1, -1, -1):
+        suffix_sums[index] = suffix_sums[index + 1] + counts[index] * distinct_valuations[index]
+
+    taken = [0] * len(counts)
+    taken[first] = 1
+
+    def extend(index: int, total: int, least_valuation: int) -> Iterator[tuple[list[int], int]]:
+        if total >= target:
+            if total - target <= slack and total - least_valuation < target:
+                yield taken, total - target
+
+            return
+
+        if index == len(counts) or total + suffix_sums[index] - taken[index] * distinct_valuations[index] < target:
+            return
+
+        valuation = distinct_valuations[index]
+        available = counts[index] - taken[index]
+        already_taken = taken[index]
+
+        # more items than needed to reach `target` would not be the least bundle
+        needed = -(-(target - total) // valuation)
+
+        for count in range(min(available, needed), -1, -1):
+            taken[index] = already_taken + count
+
+            if count > 0:
+                yield from extend(index + 1, total + count * valuation, valuation)
+            else:
+                yield from extend(index + 1, total, least_valuation)
+
+        taken[index] = already_taken
+
+    yield from extend(first, distinct_valuations[first], distinct_valuations[first])
@@ -0,0 +1,64 @@
+import inspect
+from functools import wraps
+from typing import Any, Callable, Hashable, TypeVar
+
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.items import Items
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def memoize_checker(checker: F) -> F:
+    """
+    Makes `checker` cache its results in the checked `allocation` (see `Allocation.get_cached`), so that repeated
+    checks of an unchanged allocation return immediately.
+
+    Results are cached per checker and its other arguments: agents together with versions of their valuations, items
+    and the remaining arguments. A change of valuations thus makes the checker compute its result again, and the
+    allocation drops the results cached for the former valuations. Calls with precomputed `aggregates` are not cached,
+    as they already skip most work.
+    Indices of `preferences` only speed checks up, so they are not a part of the key.
+    """
+
+    signature = inspect.signature(checker)
+
+    @wraps(checker)
+    def memoized_checker(*args, **kwargs):
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+
+        if arguments.arguments.get("aggregates") is not None:
+            return checker(*args, **kwargs)
+
+        allocation: Allocation = arguments.arguments["allocation"]
+
+        key = (checker.__name__,) + tuple([
+            get_argument_key(value) for name, value in arguments.arguments.items()
+            if name not in ["allocation", "preferences"]
+        ])
+
+        return allocation.get_cached(key, lambda: checker(*args, **kwargs))
+
+    return memoized_checker  # type: ignore
+
+
+def get_agents_key(agents: Agents) -> tuple:
+    """
+    Returns a key identifying `agents` and the current versions of their valuations.
+    """
+
+    return tuple([(agent, agent.version) for agent in agents])
+
+
+# -- PRIVATE FUNCTIONS --
+
+def get_argument_key(value: Any) -> Hashable:
+    if isinstance(value, Agents):
+        return get_agents_key(value)
+
+    if isinstance(value, Items):
+        return tuple(value.get_indices())
+
+    return value
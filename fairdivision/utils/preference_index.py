@@ -0,0 +1,156 @@
+import numpy as np
+import weakref
+from functools import partial
+from typing import Optional
+
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.instance import get_common_instance
+from fairdivision.utils.item import Item
+from fairdivision.utils.items import Items
+
+
+CHUNK_ELEMENTS = 2 ** 22
+
+
+class PreferenceIndex:
+    """
+    A class representating preferences of `agents` over `items`, answering which of the remaining items they like most.
+
+    Preferences of every agent are kept as positions of `items` sorted by her valuations in the descending order (ties
+    in favor of lower indices, as in `Agent.get_favorite_item`) in one `int32` matrix `order`. The index is a snapshot,
+    so valuations should not change after it is built.
+
+    Queries take any collection of remaining items that is a subset of `items`. For every such collection and agent,
+    a cursor remembers how many of her most valued items are absent from it. As long as nothing is added to the
+    collection (see `Items.additions`), absent items stay absent, so the cursor only moves forward and finding the
+    favorite item takes `O(1)` amortized over the removals. Cursors of a collection are dropped together with it.
+    """
+
+    def __init__(self, agents: Agents, items: Items):
+        self.items: list[Item] = items.get_items().copy()
+        self.item_positions: dict[Item, int] = {}
+
+        for position, item in enumerate(self.items):
+            self.item_positions[item] = position
+
+        self.agent_positions: dict[Agent, int] = {}
+
+        for position, agent in enumerate(agents):
+            self.agent_positions[agent] = position
+
+        self.order: np.ndarray = get_preference_order(agents, items)
+
+        # cursors by the identity of remaining items: a weak reference to them, their additions and cursors of agents
+        self.cursors: dict[int, tuple[weakref.ref, int, list[int]]] = {}
+
+    def get_favorite_item(self, agent: Agent, items: Items) -> Item:
+        """
+        Returns the item from `items` that `agent` values the most, breaking ties in favor of lower indices.
+        """
+
+        position = self.agent_positions[agent]
+        preferences = self.order[position]
+        cursors = self.__get_cursors(items)
+
+        cursor = self.__skip_absent(preferences, cursors[position], items)
+        cursors[position] = cursor
+
+        if cursor == len(preferences):
+            raise Exception("Cannot return a favourite item if there are no items")
+
+        return self.items[preferences[cursor]]
+
+    def get_top_items(self, agent: Agent, items: Items, k: int) -> list[Item]:
+        """
+        Returns at most `k` items from `items` that `agent` values the most, from the most valued one.
+        """
+
+        position = self.agent_positions[agent]
+        preferences = self.order[position]
+        cursors = self.__get_cursors(items)
+
+        cursor = self.__skip_absent(preferences, cursors[position], items)
+        cursors[position] = cursor
+
+        top_items: list[Item] = []
+
+        while cursor < len(preferences) and len(top_items) < k:
+            item = self.items[preferences[cursor]]
+
+            if item in items:
+                top_items.append(item)
+
+            cursor += 1
+
+        return top_items
+
+    def __get_cursors(self, items: Items) -> list[int]:
+        key = id(items)
+        entry = self.cursors.get(key)
+        additions = items.additions
+
+        if entry is not None and entry[0]() is items and entry[1] == additions:
+            return entry[2]
+
+        # a new collection, or one that may have regained items; the callback forgets it once it is garbage collected
+        cursors = [0] * len(self.order)
+        reference = weakref.ref(items, partial(remove_cursors, self.cursors, key))
+        self.cursors[key] = (reference, additions, cursors)
+
+        return cursors
+
+    def __skip_absent(self, preferences: np.ndarray, cursor: int, items: Items) -> int:
+        while cursor < len(preferences) and self.items[preferences[cursor]] not in items:
+            cursor += 1
+
+        return cursor
+
+
+def get_favorite_item(agent: Agent, items: Items, preferences: Optional[PreferenceIndex] = None) -> Item:
+    """
+    Returns the item from `items` that `agent` values the most, using `preferences` if given.
+    """
+
+    if preferences is not None:
+        return preferences.get_favorite_item(agent, items)
+
+    return agent.get_favorite_item(items)
+
+
+# -- PRIVATE FUNCTIONS --
+
+def get_preference_order(agents: Agents, items: Items) -> np.ndarray:
+    """
+    Returns a matrix where the `i`-th row contains positions of `items` sorted by valuations of the `i`-th agent in the
+    descending order, with ties in the order of `items`. Valuations are sliced from the instance of the agents in chunks
+    of rows if possible.
+    """
+
+    agents_list = agents.get_agents()
+    order = np.empty((len(agents_list), items.size()), dtype=np.int32)
+
+    instance = get_common_instance(agents)
+    columns = instance.get_columns(items) if instance is not None else None
+
+    if instance is None or columns is None or not all(agent.valuations_additive for agent in agents_list):
+        for position, agent in enumerate(agents_list):
+            valuations = np.array([agent.get_valuation(item) for item in items], dtype=np.int64)
+            order[position] = np.argsort(-valuations, kind="stable")
+
+        return order
+
+    rows = np.array([instance.get_row(agent) for agent in agents_list], dtype=np.intp)
+    chunk_size = max(1, CHUNK_ELEMENTS // max(items.size(), 1))
+
+    for start in range(0, len(rows), chunk_size):
+        valuations = instance.valuations[np.ix_(rows[start:start + chunk_size], columns)]
+
+        # a stable sort of negated valuations keeps ties in the order of items
+        order[start:start + chunk_size] = np.argsort(-valuations, axis=1, kind="stable")
+
+    return order
+
+
+def remove_cursors(cursors: dict, key: int, _: weakref.ref) -> None:
+    cursors.pop(key, None)
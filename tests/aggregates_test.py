@@ -0,0 +1,72 @@
+from fairdivision.utils.aggregates import get_bundle_aggregates
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.checkers import is_ef1, is_efx, highest_efx_approximation
+from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
+
+
+ALLOCATION = {
+    1: [1, 2, 3],
+    2: [],
+    3: [4, 5]
+}
+
+
+def test_bundle_aggregates():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, ALLOCATION)
+
+    aggregates = get_bundle_aggregates(agents, allocation)
+
+    assert aggregates.sizes.tolist() == [3, 0, 2]
+    assert aggregates.totals[0].tolist() == [20, 0, 8]
+    assert aggregates.minima[0].tolist() == [2, 0, 2]
+    assert aggregates.maxima[0].tolist() == [15, 0, 6]
+    assert aggregates.second_maxima[0].tolist() == [3, 0, 2]
+    assert aggregates.get_comparable_pairs().tolist() == [
+        [False, False, True],
+        [True, False, True],
+        [True, False, False]
+    ]
+
+
+def test_bundle_aggregates_without_instance():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = Allocation(agents)
+
+    for agent_index, item_indices in ALLOCATION.items():
+        for item_index in item_indices:
+            allocation.allocate(agents.get_agent(agent_index), items.get_item(item_index))
+
+    aggregates = get_bundle_aggregates(agents, allocation)
+    bound_aggregates = get_bundle_aggregates(agents, import_allocation_from_dict(agents, items, ALLOCATION))
+
+    assert aggregates.totals.tolist() == bound_aggregates.totals.tolist()
+    assert aggregates.minima_positive.tolist() == bound_aggregates.minima_positive.tolist()
+
+    # checkers give the same results with precomputed aggregates
+    assert is_ef1(agents, allocation, aggregates) == is_ef1(agents, allocation)
+    assert is_efx(agents, allocation, aggregates) == is_efx(agents, allocation)
+    assert highest_efx_approximation(agents, allocation, aggregates) == highest_efx_approximation(agents, allocation)
+
+
+def test_bundle_aggregates_updates():
+    agents, items, _ = import_from_file("instances/with_zero.txt")
+    agent_1, agent_2 = agents.get_agents()
+
+    allocation = import_allocation_from_dict(agents, items, {1: [], 2: []})
+    aggregates = get_bundle_aggregates(agents, allocation)
+
+    for agent, item in zip([agent_1, agent_2, agent_1, agent_1], items.get_items()):
+        allocation.allocate(agent, item)
+        aggregates.add_item(agents.get_agents().index(agent), aggregates.get_item_valuations(item))
+
+    expected = get_bundle_aggregates(agents, allocation)
+
+    for name in ["totals", "minima", "maxima", "second_maxima", "minima_positive", "has_positive", "sizes"]:
+        assert getattr(aggregates, name).tolist() == getattr(expected, name).tolist()
+
+    aggregates.move_bundles([0, 1], [1, 0])
+    aggregates.set_bundle(0, allocation.for_agent(agent_1))
+
+    assert aggregates.totals[:, 0].tolist() == expected.totals[:, 0].tolist()
+    assert aggregates.second_maxima[:, 1].tolist() == expected.second_maxima[:, 0].tolist()
@@ -1,6 +1,6 @@
-from fairdivision.algorithms.all_allocations import all_allocations
+from fairdivision.algorithms.all_allocations import all_allocations, all_partitions, gray_code_allocations
 from fairdivision.utils.generators import generate_agents, generate_items
-from fairdivision.utils.importers import import_allocation_from_dict
+from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
 
 
 EXPECTED_ALLOCATIONS = [
@@ -60,3 +60,63 @@ def test_all_allocations():
         expected_allocation = import_allocation_from_dict(agents, items, EXPECTED_ALLOCATIONS[index])
 
         assert allocation == expected_allocation
+
+
+def test_gray_code_allocations():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+
+    visited_allocations = set()
+    previous_owners = None
+
+    for allocation in gray_code_allocations(agents, items):
+        visited_allocations.add(allocation.to_compact())
+
+        # consecutive allocations differ by a single item
+        if previous_owners is not None:
+            assert sum(1 for old, new in zip(previous_owners, allocation.owners) if old != new) == 1
+
+        previous_owners = list(allocation.owners)
+
+        full_allocation = allocation.to_allocation()
+        for i, agent_i in enumerate(agents):
+            for j, agent_j in enumerate(agents):
+                assert allocation.values[i][j] == agent_i.get_valuation(full_allocation.for_agent(agent_j))
+
+    assert len(visited_allocations) == 3 ** 5
+
+
+def test_all_partitions():
+    _, items, _ = import_from_file("instances/with_efx.txt")
+
+    partitions_iterator = all_partitions(items, 3)
+    partitions = []
+
+    for _ in partitions_iterator:
+        partition = frozenset(frozenset(bundle.get_indices()) for bundle in partitions_iterator.get_partition())
+        partitions.append(partition)
+
+    # 1 + 15 + 25 partitions of 5 items into 1, 2 and 3 bundles, each visited once
+    assert len(partitions) == 41
+    assert len(set(partitions)) == 41
+    assert partitions_iterator.labels == [0, 1, 2, 2, 2]
+
+
+def test_all_partitions_with_equal_valuations():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    agent = agents.get_agent(3)
+
+    def partition_valuations(partition):
+        return tuple(sorted(agent.get_valuation(bundle) for bundle in partition))
+
+    partitions_iterator = all_partitions(items, 3, agent)
+    visited_partitions = []
+
+    for _ in partitions_iterator:
+        visited_partitions.append(partition_valuations(partitions_iterator.get_partition()))
+
+    expected_partitions = set()
+    for allocation in all_allocations(agents, items):
+        expected_partitions.add(partition_valuations([bundle.get_items() for _, bundle in allocation]))
+
+    assert set(visited_partitions) == expected_partitions
+    assert len(visited_partitions) < 41
@@ -0,0 +1,101 @@
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.generators import generate_agents, generate_items
+from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
+from fairdivision.utils.instance import get_instance
+
+
+ALLOCATION = {
+    1: [1],
+    2: [2, 3],
+    3: [4, 5]
+}
+
+
+def assert_values_match_bundles(agents, allocation):
+    assert allocation.values is not None
+
+    for agent_i in agents:
+        for agent_j in agents:
+            expected_valuation = agent_i.get_valuation(allocation.for_agent(agent_j))
+
+            assert allocation.get_bundle_valuation(agent_i, agent_j) == expected_valuation
+
+
+def test_values_after_allocate():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, ALLOCATION)
+
+    assert allocation.values.tolist() == [[15, 5, 8], [7, 10, 12], [20, 6, 6]]
+    assert_values_match_bundles(agents, allocation)
+
+
+def test_values_after_reallocate_bundles():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, ALLOCATION)
+
+    agent_1, agent_2, agent_3 = agents.get_agent(1), agents.get_agent(2), agents.get_agent(3)
+    allocation.reallocate_bundles([(agent_1, agent_3), (agent_3, agent_2), (agent_2, agent_1)])
+
+    assert allocation.for_agent(agent_1).get_items().get_indices() == [4, 5]
+    assert allocation.for_agent(agent_2).get_items().get_indices() == [1]
+    assert allocation.for_agent(agent_3).get_items().get_indices() == [2, 3]
+    assert_values_match_bundles(agents, allocation)
+
+
+def test_values_after_allocate_bundle():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, ALLOCATION)
+
+    agent_1, agent_3 = agents.get_agent(1), agents.get_agent(3)
+    allocation.allocate_bundle(agent_1, allocation.for_agent(agent_3))
+
+    assert allocation.for_agent(agent_3).size() == 0
+    assert_values_match_bundles(agents, allocation)
+
+    copy = allocation.copy()
+    copy.allocate(agent_3, items.get_item(1))
+
+    assert_values_match_bundles(agents, copy)
+    assert allocation.get_bundle_valuation(agent_1, agent_3) == 0
+
+
+def test_envies_reads_values():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = Allocation(agents, instance=get_instance(agents, items))
+
+    allocation.allocate(agents.get_agent(2), items.get_item(1))
+    allocation.values[0, 1] = 0
+
+    assert not agents.get_agent(1).envies(agents.get_agent(2), allocation)
+    assert agents.get_agent(3).envies(agents.get_agent(2), allocation)
+
+
+def test_values_after_valuations_change():
+    # agents bound to the instance of the allocation, and agents whose instance is only a snapshot
+    for bound in [True, False]:
+        agents = generate_agents(2)
+        items = generate_items(2)
+
+        for agent in agents:
+            agent.assign_valuations(items, [5, 1])
+
+        instance = get_instance(agents, items)
+
+        if bound:
+            instance.bind_agents()
+
+        allocation = Allocation(agents, instance=instance)
+        agent_1, agent_2 = agents.get_agent(1), agents.get_agent(2)
+
+        allocation.allocate(agent_1, items.get_item(1))
+        allocation.allocate(agent_2, items.get_item(2))
+
+        assert agent_2.envies(agent_1, allocation)
+
+        for agent in agents:
+            agent.assign_valuation(items.get_item(2), 100)
+
+        assert (allocation.get_values() is not None) == bound
+        assert agent_1.envies(agent_2, allocation)
+        assert not agent_2.envies(agent_1, allocation)
+        assert allocation.get_bundle_valuation(agent_1, agent_2) == 100
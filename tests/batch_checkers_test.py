@@ -0,0 +1,51 @@
+from fairdivision.algorithms.all_allocations import all_allocations, get_valuations_matrix
+from fairdivision.utils.batch_checkers import (
+    batch_check,
+    batch_highest_ef1_approximation,
+    batch_is_ef1,
+    stack_owners
+)
+from fairdivision.utils.checkers import (
+    is_ef,
+    is_ef1,
+    is_efx0,
+    is_prop,
+    highest_ef1_approximation,
+    highest_efx0_approximation,
+    highest_prop_approximation
+)
+from fairdivision.utils.compact_allocation import CompactAllocation
+from fairdivision.utils.importers import import_from_file
+
+
+def test_batch_check_matches_checkers():
+    for file_name in ["with_efx.txt", "with_zero.txt"]:
+        agents, items, _ = import_from_file(f"instances/{file_name}")
+        allocations = list(all_allocations(agents, items))
+
+        results = batch_check(agents, items, allocations)
+
+        for position, allocation in enumerate(allocations):
+            assert results["ef"][position] == (is_ef(agents, allocation) == True)
+            assert results["ef1"][position] == (is_ef1(agents, allocation) == True)
+            assert results["efx0"][position] == (is_efx0(agents, allocation) == True)
+            assert results["prop"][position] == (is_prop(agents, items, allocation) == True)
+
+            assert results["highest_ef1_approximation"][position] == highest_ef1_approximation(agents, allocation)
+            assert results["highest_efx0_approximation"][position] == highest_efx0_approximation(agents, allocation)
+            approximation = highest_prop_approximation(agents, items, allocation)
+            assert results["highest_prop_approximation"][position] == approximation
+
+
+def test_batch_checkers_with_unallocated_items():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    valuations = get_valuations_matrix(agents, items)
+
+    owners = stack_owners(agents, items, [
+        CompactAllocation([0, -1, -1, -1, -1]),
+        CompactAllocation([-1, 0, 0, 1, 1]),
+        CompactAllocation([-1, 0, 0, 0, 1])
+    ])
+
+    assert batch_is_ef1(owners, valuations).tolist() == [True, False, False]
+    assert batch_highest_ef1_approximation(owners, valuations).tolist() == [1.0, 0.0, 0.0]
@@ -0,0 +1,72 @@
+import os
+
+from fairdivision.algorithms.envy_cycle_elimination import envy_cycle_elimination
+from fairdivision.algorithms.round_robin import round_robin
+from fairdivision.utils.bitset_items import BitsetItems, ItemsUniverse, to_bitset_items
+from fairdivision.utils.bundle import Bundle
+from fairdivision.utils.checkers import is_ef1
+from fairdivision.utils.generators import generate_items
+from fairdivision.utils.importers import import_from_file, import_instance_from_file
+from fairdivision.utils.items import Items
+
+
+def test_bitset_items_interface():
+    items = generate_items(70)
+    universe = ItemsUniverse(items)
+
+    bitset = BitsetItems(universe, [items.get_item(65), items.get_item(3)])
+    bitset.add_item(items.get_item(10))
+
+    assert bitset.size() == 3
+    assert bitset.get_indices() == [3, 10, 65]
+    assert items.get_item(65) in bitset
+    assert items.get_item(4) not in bitset
+    assert bitset == Items([items.get_item(3), items.get_item(10), items.get_item(65)])
+
+    # the attributes of `Items` are available as well
+    plain_items = Items([items.get_item(3), items.get_item(10), items.get_item(65)])
+    assert bitset.items == plain_items.items
+    assert bitset.sorted_items == plain_items.sorted_items
+
+    copy = bitset.copy()
+    copy.remove_item(10)
+    bitset.remove_item(items.get_item(3))
+
+    assert copy.get_indices() == [3, 65]
+    assert bitset.get_indices() == [10, 65]
+    assert bitset.get_item(65) == items.get_item(65)
+
+
+def test_bitset_items_set_operations():
+    items = generate_items(130)
+    universe = ItemsUniverse(items)
+
+    odd = BitsetItems(universe, [item for item in items if item.get_index() % 2 == 1])
+    small = BitsetItems(universe, [item for item in items if item.get_index() <= 10])
+
+    assert odd.intersection(small).get_indices() == [1, 3, 5, 7, 9]
+    assert small.difference(odd).get_indices() == [2, 4, 6, 8, 10]
+    assert odd.union(small).size() == 70
+
+
+def test_bitset_items_valuations():
+    instance, _ = import_instance_from_file("instances/with_efx.txt")
+    bundle = Bundle(to_bitset_items(instance.items, instance.get_universe()))
+
+    for agent in instance.agents:
+        assert agent.get_valuation(bundle) == agent.get_valuation(instance.items)
+
+
+def test_algorithms_with_bitset_items():
+    for file_name in os.listdir("instances"):
+        agents, items, restrictions = import_from_file(f"instances/{file_name}")
+        if "additive" in restrictions:
+            bitset_items = to_bitset_items(items)
+
+            allocation = envy_cycle_elimination(agents, bitset_items)
+            allocation_with_bitsets, remaining_items = round_robin(agents, bitset_items)
+
+            assert allocation == envy_cycle_elimination(agents, items)
+            assert allocation_with_bitsets == round_robin(agents, items)[0]
+            assert remaining_items.size() == 0
+            assert is_ef1(agents, allocation) == True
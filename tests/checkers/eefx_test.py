@@ -1,4 +1,5 @@
-from fairdivision.utils.checkers import is_eefx
+from fairdivision.utils.checkers import get_eefx_certificates, is_eefx
+from fairdivision.utils.efx_certificate import efx_certificate_partition, is_efx_certificate
 from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
 
 
@@ -27,3 +28,47 @@ def test_eefx_negative():
     allocation = import_allocation_from_dict(agents, items, NOT_EEFX_ALLOCATION)
 
     assert is_eefx(agents, items, allocation) == (False, agents.get_agent(3))
+
+
+def test_eefx_certificates():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, EEFX_ALLOCATION)
+
+    certificates = get_eefx_certificates(agents, items, allocation)
+
+    for agent, certificate in certificates.items():
+        self_valuation = allocation.get_bundle_valuation(agent, agent)
+
+        for other_agent, bundle in certificate:
+            assert other_agent != agent
+            assert agent not in [owner for owner, _ in certificate]
+
+            valuations = [agent.get_valuation(item) for item in bundle]
+            positive_valuations = [valuation for valuation in valuations if valuation > 0]
+
+            if len(positive_valuations) > 0:
+                assert sum(valuations) - min(positive_valuations) <= self_valuation
+
+    # changing the returned certificates does not change the ones returned later
+    certificates.clear()
+
+    assert len(get_eefx_certificates(agents, items, allocation)) == agents.size()
+
+    allocation = import_allocation_from_dict(agents, items, NOT_EEFX_ALLOCATION)
+
+    assert get_eefx_certificates(agents, items, allocation) == (False, agents.get_agent(3))
+
+
+def test_efx_certificate_partition():
+    cases = [([5, 5, 4, 3, 3], 2, 8), ([9, 0, 1, 1], 3, 0), ([], 0, 0), ([2, -1, 3], 1, 2)]
+
+    for valuations, n, self_valuation in cases:
+        labels = efx_certificate_partition(valuations, n, self_valuation)
+
+        assert labels is not None
+        assert is_efx_certificate(labels, valuations, self_valuation, n)
+
+    # both bundles containing an item worth 5 are worth at least 7 without their least valuable item
+    assert efx_certificate_partition([5, 5, 4, 3, 3], 2, 6) is None
+    assert efx_certificate_partition([2, -1, 3], 1, 1) is None
+    assert efx_certificate_partition([1], 0, 10) is None
@@ -1,4 +1,6 @@
+from fairdivision.algorithms.envy_cycle_elimination import envy_cycle_elimination
 from fairdivision.utils.checkers import is_ef
+from fairdivision.utils.generators import generate_agents, generate_items
 from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
 
 
@@ -25,3 +27,22 @@ def test_ef_negative():
     allocation = import_allocation_from_dict(agents, items, NOT_EF_ALLOCATION)
 
     assert is_ef(agents, allocation) == (False, (agents.get_agent(1), agents.get_agent(2)))
+
+
+def test_ef_after_valuations_change():
+    agents = generate_agents(2)
+    items = generate_items(2)
+
+    for agent in agents:
+        agent.assign_valuations(items, [5, 1])
+
+    allocation = envy_cycle_elimination(agents, items)
+
+    assert allocation.for_agent(agents.get_agent(1)).get_items().get_indices() == [1]
+    assert is_ef(agents, allocation) == (False, (agents.get_agent(2), agents.get_agent(1)))
+
+    # values of bundles computed by the algorithm are stale now
+    for agent in agents:
+        agent.assign_valuation(items.get_item(2), 100)
+
+    assert is_ef(agents, allocation) == (False, (agents.get_agent(1), agents.get_agent(2)))
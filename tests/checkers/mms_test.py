@@ -21,6 +21,9 @@ def test_mms_positive():
     assert is_mms(agents, items, allocation) == True
     assert highest_mms_approximation(agents, items, allocation) == 1
 
+    assert is_mms(agents, items, allocation, use_bounds=True) == True
+    assert highest_mms_approximation(agents, items, allocation, use_bounds=True) == 1
+
 
 def test_mms_negative():
     agents, items, _ = import_from_file("instances/with_efx.txt")
@@ -28,3 +31,6 @@ def test_mms_negative():
 
     assert is_mms(agents, items, allocation) == (False, agents.get_agent(1))
     assert highest_mms_approximation(agents, items, allocation) == 0.667
+
+    assert is_mms(agents, items, allocation, use_bounds=True) == (False, agents.get_agent(1))
+    assert highest_mms_approximation(agents, items, allocation, use_bounds=True) == 0.667
@@ -0,0 +1,47 @@
+import pickle
+
+from fairdivision.algorithms.all_allocations import all_allocations, all_compact_allocations
+from fairdivision.utils.compact_allocation import CompactAllocation, UNALLOCATED, compact_allocation
+from fairdivision.utils.generators import generate_agents, generate_items
+from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
+
+
+PARTIAL_ALLOCATION = {
+    1: [4, 5],
+    2: [],
+    3: [1]
+}
+
+
+def test_compact_allocation_round_trip():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, PARTIAL_ALLOCATION)
+
+    compact = compact_allocation(agents, items, allocation)
+
+    assert compact.owners.tolist() == [2, UNALLOCATED, UNALLOCATED, 0, 0]
+    assert compact.to_allocation(agents, items) == allocation
+
+
+def test_compact_allocation_hashing_and_pickling():
+    first = CompactAllocation([0, 1, 1, 0])
+    second = CompactAllocation([0, 1, 1, 0])
+    third = CompactAllocation([1, 0, 0, 1])
+
+    assert first == second and hash(first) == hash(second)
+    assert first != third
+    assert len({first, second, third}) == 2
+
+    assert pickle.loads(pickle.dumps(third)) == third
+
+
+def test_all_compact_allocations():
+    agents = generate_agents(3)
+    items = generate_items(3)
+
+    compact_allocations = list(all_compact_allocations(agents, items))
+
+    assert len(set(compact_allocations)) == 27
+
+    for allocation, compact in zip(all_allocations(agents, items), compact_allocations):
+        assert compact_allocation(agents, items, allocation) == compact
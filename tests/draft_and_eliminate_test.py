@@ -1,9 +1,10 @@
 from math import sqrt
 import os
 
-from fairdivision.algorithms.draft_and_eliminate import draft_and_eliminate
+from fairdivision.algorithms.draft_and_eliminate import draft_and_eliminate, preprocessing
 from fairdivision.utils.checkers import is_ef1, highest_efx_approximation
 from fairdivision.utils.importers import import_from_file
+from fairdivision.utils.preference_index import PreferenceIndex
 
 
 PHI = (1 + sqrt(5)) / 2
@@ -31,3 +32,18 @@ def test_draft_and_eliminate_efx_approximation():
             allocation = draft_and_eliminate(agents, items)
 
             assert highest_efx_approximation(agents, allocation) >= PHI - 1
+
+
+def test_preprocessing():
+    expected = {
+        "draft_and_eliminate_0618_efx.txt": ([1, 2], 0),
+        "envy_cycle.txt": ([2, 1], 1),
+        "ordered_picking_0333_ef1.txt": ([4, 2, 3, 1], 1),
+        "with_efx.txt": ([3, 1, 2], 2)
+    }
+
+    for file_name, (ordering, quite_happy_n) in expected.items():
+        agents, items, _ = import_from_file(f"instances/{file_name}")
+
+        assert preprocessing(agents, items) == (ordering, quite_happy_n)
+        assert preprocessing(agents, items, PreferenceIndex(agents, items)) == (ordering, quite_happy_n)
@@ -1,9 +1,12 @@
 import os
+import random
 
 from fairdivision.algorithms.envy_cycle_elimination import envy_cycle_elimination
 from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.generators import AdditiveGenerator, generate_instance
 from fairdivision.utils.checkers import is_ef1, is_efx, highest_efx_approximation, highest_mms_approximation
-from fairdivision.utils.importers import import_from_file
+from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
+from fairdivision.utils.items import Items
 
 
 # Envy Cycle Elimination returns an EF1 allocation for every additive instance.
@@ -45,3 +48,31 @@ def test_envy_cycle_elimination_ordered_efx():
     allocation = envy_cycle_elimination(agents, items)
 
     assert is_efx(agents, allocation) == True
+
+
+# Rotating any envy cycles keeps the allocation EF1, so all strategies of cycle elimination return EF1 allocations.
+def test_envy_cycle_elimination_strategies_ef1():
+    random.seed(19)
+
+    rounds = {"cycle": 0, "scc": 0, "ttc": 0}
+
+    for _ in range(20):
+        n = random.randint(2, 10)
+        instance = generate_instance(n, random.randint(n, 40), AdditiveGenerator(0, 20))
+        agents, items = instance.agents, instance.items
+
+        for strategy in rounds:
+            # an EF1 partial allocation of one arbitrary item per agent creates many envy cycles
+            allocation = import_allocation_from_dict(
+                agents, items, {agent.get_index(): [position + 1] for position, agent in enumerate(agents)}
+            )
+
+            statistics: dict[str, int] = {}
+            allocation = envy_cycle_elimination(agents, Items(items.get_items()[n:]), allocation, strategy, statistics)
+
+            assert is_ef1(agents, allocation) == True
+
+            rounds[strategy] += statistics["rounds"]
+
+    assert rounds["scc"] < rounds["cycle"]
+    assert rounds["ttc"] < rounds["cycle"]
@@ -0,0 +1,188 @@
+import networkx as nx # type: ignore
+import random
+
+from fairdivision.algorithms.envy_cycle_elimination import create_envy_graph, eliminate_cycle, update_graph
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.agents import Agents
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.envy_graph import EnvyGraph, get_envy_matrix
+from fairdivision.utils.generators import AdditiveGenerator, generate_instance
+from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
+
+
+def test_envy_graph_edges():
+    agents = Agents([Agent(index) for index in range(1, 4)])
+    agent_1, agent_2, agent_3 = agents.get_agents()
+
+    graph = EnvyGraph(agents)
+
+    assert graph.has_unenvied_agent() == True
+
+    graph.add_edge(agent_1, agent_3)
+    graph.add_edge(agent_1, agent_2)
+    graph.add_edge(agent_2, agent_3)
+    graph.add_edge(agent_3, agent_1)
+
+    assert graph.has_edge(agent_1, agent_2) == True
+    assert graph.has_edge(agent_2, agent_1) == False
+    assert graph.in_degree(agent_3) == 2
+    assert graph.has_unenvied_agent() == False
+    assert graph.get_successors(agent_1) == [agent_3, agent_2]
+
+    graph.remove_edge(agent_3, agent_1)
+
+    assert graph.in_degree(agent_1) == 0
+    assert graph.has_unenvied_agent() == True
+    assert graph.find_cycle() is None
+    assert list(graph.to_networkx().edges()) == graph.edges()
+
+
+def test_envy_graph_from_allocation():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, {1: [1], 2: [2, 3], 3: [4, 5]})
+
+    graph = create_envy_graph(agents, allocation)
+
+    for agent_i in agents:
+        for agent_j in agents:
+            envies = allocation.for_agent(agent_j).size() > 0 and agent_i.envies(agent_j, allocation)
+
+            assert graph.has_edge(agent_i, agent_j) == envies
+
+
+def test_find_cycle_as_networkx():
+    random.seed(16)
+
+    for _ in range(300):
+        n = random.randint(1, 8)
+        agents = Agents([Agent(index) for index in range(1, n + 1)])
+        agents_list = agents.get_agents()
+
+        graph = EnvyGraph(agents)
+        nx_graph = nx.DiGraph()
+        nx_graph.add_nodes_from(agents_list)
+
+        # removing and adding edges again changes their order, which decides the found cycle
+        for _ in range(random.randint(0, 3 * n)):
+            envious, envied = random.sample(agents_list, 2) if n > 1 else (agents_list[0], agents_list[0])
+
+            if envious == envied:
+                continue
+
+            if graph.has_edge(envious, envied) and random.random() < 0.3:
+                graph.remove_edge(envious, envied)
+                nx_graph.remove_edge(envious, envied)
+            else:
+                graph.add_edge(envious, envied)
+                nx_graph.add_edge(envious, envied)
+
+        try:
+            expected_cycle = nx.find_cycle(nx_graph)
+        except nx.NetworkXNoCycle:
+            expected_cycle = None
+
+        assert graph.find_cycle() == expected_cycle
+        assert graph.has_unenvied_agent() == any(nx_graph.in_degree(agent) == 0 for agent in agents_list)
+
+
+def test_rotate_bundles_as_new_graph():
+    random.seed(17)
+
+    for _ in range(50):
+        instance = generate_instance(random.randint(2, 8), random.randint(1, 20), AdditiveGenerator(0, 10))
+        agents, items = instance.agents, instance.items
+
+        allocation = import_allocation_from_dict(agents, items, {})
+        graph = create_envy_graph(agents, allocation)
+
+        for item in items:
+            agent = random.choice(agents.get_agents())
+            allocation.allocate(agent, item)
+            update_graph(graph, agents, allocation, agent)
+
+            # the first unenvied agent with an empty bundle, or the first unenvied agent
+            unenvied_agents = [agent for agent in agents if graph.in_degree(agent) == 0]
+            empty_unenvied_agents = [agent for agent in unenvied_agents if allocation.for_agent(agent).size() == 0]
+
+            assert graph.get_unenvied_agent() == (empty_unenvied_agents + unenvied_agents + [None])[0]
+
+            cycle = graph.find_cycle()
+
+            if cycle is not None:
+                graph = eliminate_cycle(agents, cycle, allocation, graph)
+                new_graph = create_envy_graph(agents, allocation)
+
+                assert graph.edges() == new_graph.edges()
+                assert graph.in_degrees == new_graph.in_degrees
+                assert graph.get_unenvied_agent() == new_graph.get_unenvied_agent()
+
+
+def test_envy_matrix():
+    random.seed(18)
+
+    for _ in range(30):
+        instance = generate_instance(random.randint(1, 6), random.randint(0, 12), AdditiveGenerator(0, 10))
+        agents, items = instance.agents, instance.items
+
+        # with valuations of bundles kept by the allocation, with the instance of agents, and with unbound agents
+        unbound_agents = Agents([Agent(agent.get_index()) for agent in agents])
+        for agent, unbound_agent in zip(agents, unbound_agents):
+            unbound_agent.assign_valuations(items, [agent.get_valuation(item) for item in items])
+
+        allocations = [
+            (agents, import_allocation_from_dict(agents, items, {})),
+            (agents, Allocation(agents)),
+            (unbound_agents, Allocation(unbound_agents))
+        ]
+
+        owners = [random.randint(0, agents.size()) for _ in items]
+
+        for allocation_agents, allocation in allocations:
+            agents_list = allocation_agents.get_agents()
+
+            for item, owner in zip(items, owners):
+                if owner < len(agents_list):
+                    allocation.allocate(agents_list[owner], item)
+
+            expected_matrix = [
+                [
+                    allocation.for_agent(agent_j).size() > 0 and agent_i.envies(agent_j, allocation)
+                    for agent_j in agents_list
+                ]
+                for agent_i in agents_list
+            ]
+
+            assert get_envy_matrix(allocation_agents, allocation).tolist() == expected_matrix
+            assert get_envy_matrix(allocation_agents, allocation, [0]).tolist() == expected_matrix[:1]
+
+
+def test_disjoint_cycles():
+    random.seed(19)
+
+    for _ in range(100):
+        instance = generate_instance(random.randint(1, 8), random.randint(0, 16), AdditiveGenerator(0, 10))
+        agents, items = instance.agents, instance.items
+
+        allocation = import_allocation_from_dict(agents, items, {})
+        for item in items:
+            allocation.allocate(random.choice(agents.get_agents()), item)
+
+        graph = create_envy_graph(agents, allocation)
+        nx_graph = graph.to_networkx()
+
+        components = graph.get_strongly_connected_components()
+
+        def get_indices(components):
+            return sorted([sorted([agent.get_index() for agent in component]) for component in components])
+
+        assert get_indices(components) == get_indices(nx.strongly_connected_components(nx_graph))
+
+        for cycles in [graph.find_disjoint_cycles(), graph.find_trading_cycles(allocation)]:
+            cycle_agents = [envious for cycle in cycles for envious, _ in cycle]
+
+            assert len(cycle_agents) == len(set(cycle_agents))
+            assert (len(cycles) > 0) == (graph.find_cycle() is not None)
+
+            for cycle in cycles:
+                assert all(graph.has_edge(envious, envied) for envious, envied in cycle)
+                assert [envied for _, envied in cycle] == [envious for envious, _ in cycle[1:] + cycle[:1]]
@@ -0,0 +1,105 @@
+import random
+
+from fairdivision.algorithms.envy_cycle_elimination import envy_cycle_elimination
+from fairdivision.utils.allocation import Allocation, AllocationListener
+from fairdivision.utils.bitset_items import get_universe
+from fairdivision.utils.checkers import (
+    ef1_satisfied_fraction,
+    efx_satisfied_fraction,
+    highest_ef1_approximation,
+    highest_efx_approximation,
+    highest_prop_approximation,
+    is_ef,
+    is_ef1,
+    is_efx,
+    is_prop,
+    prop_satisfied_fraction
+)
+from fairdivision.utils.fairness_monitor import FairnessMonitor
+from fairdivision.utils.generators import AdditiveGenerator, generate_instance
+from fairdivision.utils.importers import import_from_file
+from fairdivision.utils.instance import get_instance
+
+
+class MonitorChecker(AllocationListener):
+    """
+    Compares the monitor with the checkers after every change of the allocation.
+    """
+
+    def __init__(self, agents, items, monitor):
+        self.agents = agents
+        self.items = items
+        self.monitor = monitor
+        self.changes = 0
+
+    def check(self, allocation):
+        agents, items, monitor = self.agents, self.items, self.monitor
+
+        assert monitor.is_ef() == (is_ef(agents, allocation) == True)
+        assert monitor.is_ef1() == (is_ef1(agents, allocation) == True)
+        assert monitor.highest_ef1_approximation() == highest_ef1_approximation(agents, allocation)
+        assert monitor.ef1_satisfied_fraction() == ef1_satisfied_fraction(agents, allocation)
+        assert monitor.is_efx() == (is_efx(agents, allocation) == True)
+        assert monitor.highest_efx_approximation() == highest_efx_approximation(agents, allocation)
+        assert monitor.efx_satisfied_fraction() == efx_satisfied_fraction(agents, allocation)
+        assert monitor.is_prop() == (is_prop(agents, items, allocation) == True)
+        assert monitor.highest_prop_approximation() == highest_prop_approximation(agents, items, allocation)
+        assert monitor.prop_satisfied_fraction() == prop_satisfied_fraction(agents, items, allocation)
+
+        self.changes += 1
+
+    def on_allocate(self, allocation, agent, item):
+        self.check(allocation)
+
+    def on_allocate_bundle(self, allocation, agent, bundle, previous_owner):
+        self.check(allocation)
+
+    def on_reallocate_bundles(self, allocation, cycle):
+        self.check(allocation)
+
+
+def test_fairness_monitor_follows_envy_cycle_elimination():
+    random.seed(0)
+
+    for _ in range(20):
+        instance = generate_instance(random.randint(2, 6), random.randint(1, 15), AdditiveGenerator(0, 10))
+        agents, items = instance.agents, instance.items
+
+        allocation = Allocation(agents, get_universe(items), get_instance(agents, items))
+
+        monitor = FairnessMonitor(agents, items, allocation)
+        checker = MonitorChecker(agents, items, monitor)
+        allocation.subscribe(checker)
+
+        checker.check(allocation)
+        envy_cycle_elimination(agents, items, allocation)
+
+        assert checker.changes >= items.size()
+        assert monitor.is_ef1()
+
+
+def test_fairness_monitor_allocate_bundle():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    agent_1, agent_2, agent_3 = agents.get_agents()
+
+    allocation = Allocation(agents)
+
+    monitor = FairnessMonitor(agents, items, allocation)
+    checker = MonitorChecker(agents, items, monitor)
+    allocation.subscribe(checker)
+
+    for item in items.get_items()[:3]:
+        allocation.allocate(agent_1, item)
+
+    allocation.allocate(agent_2, items.get_items()[3])
+    allocation.allocate_bundle(agent_3, allocation.for_agent(agent_1))
+    allocation.reallocate_bundles([(agent_1, agent_2), (agent_2, agent_3), (agent_3, agent_1)])
+
+    ef1_approximation = monitor.highest_ef1_approximation()
+
+    monitor.stop()
+    allocation.unsubscribe(checker)
+    allocation.allocate(agent_1, items.get_items()[4])
+
+    assert checker.changes == 6
+    assert monitor.highest_ef1_approximation() == ef1_approximation
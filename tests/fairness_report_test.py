@@ -0,0 +1,58 @@
+import pytest
+
+from fairdivision.algorithms.all_allocations import all_allocations
+from fairdivision.utils.checkers import (
+    ef1_satisfied_fraction,
+    efx_satisfied_fraction,
+    highest_ef1_approximation,
+    highest_efx_approximation,
+    highest_mms_approximation,
+    highest_prop_approximation,
+    is_ef,
+    is_ef1,
+    is_ef2,
+    is_efx,
+    is_efx0,
+    is_mms,
+    is_prop,
+    is_prop1,
+    prop_satisfied_fraction
+)
+from fairdivision.utils.fairness_report import ALL_PROPERTIES, fairness_report
+from fairdivision.utils.importers import import_from_file
+
+
+def test_fairness_report_matches_checkers():
+    for file_name in ["with_efx.txt", "with_zero.txt"]:
+        agents, items, _ = import_from_file(f"instances/{file_name}")
+
+        for allocation in all_allocations(agents, items):
+            report = fairness_report(agents, items, allocation, ["ef", "ef1", "ef2", "efx0", "efx", "prop", "mms"])
+
+            assert report["ef"]["result"] == is_ef(agents, allocation)
+            assert report["ef1"]["result"] == is_ef1(agents, allocation)
+            assert report["ef1"]["approximation"] == highest_ef1_approximation(agents, allocation)
+            assert report["ef1"]["satisfied_fraction"] == ef1_satisfied_fraction(agents, allocation)
+            assert report["ef2"]["result"] == is_ef2(agents, allocation)
+            assert report["efx0"]["result"] == is_efx0(agents, allocation)
+            assert report["efx"]["result"] == is_efx(agents, allocation)
+            assert report["efx"]["approximation"] == highest_efx_approximation(agents, allocation)
+            assert report["efx"]["satisfied_fraction"] == efx_satisfied_fraction(agents, allocation)
+            assert report["prop"]["result"] == is_prop(agents, items, allocation)
+            assert report["prop"]["approximation"] == highest_prop_approximation(agents, items, allocation)
+            assert report["prop"]["satisfied_fraction"] == prop_satisfied_fraction(agents, items, allocation)
+            assert report["mms"]["result"] == is_mms(agents, items, allocation)
+            assert report["mms"]["approximation"] == highest_mms_approximation(agents, items, allocation)
+
+
+def test_fairness_report_properties():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = list(all_allocations(agents, items))[1]
+
+    assert list(fairness_report(agents, items, allocation)) == ["ef", "ef1", "ef2", "efx0", "efx", "prop"]
+    assert list(fairness_report(agents, items, allocation, ["efx", "ef"])) == ["efx", "ef"]
+    report = fairness_report(agents, items, allocation, ALL_PROPERTIES)
+    assert report["prop1"]["result"] == is_prop1(agents, items, allocation)
+
+    with pytest.raises(Exception):
+        fairness_report(agents, items, allocation, ["efx", "unknown"])
@@ -0,0 +1,26 @@
+import os
+import random
+
+from fairdivision.algorithms.envy_cycle_elimination import envy_cycle_elimination
+from fairdivision.algorithms.fast_envy_cycle_elimination import fast_envy_cycle_elimination
+from fairdivision.utils.generators import AdditiveGenerator, generate_instance
+from fairdivision.utils.importers import import_from_file
+
+
+# Fast Envy Cycle Elimination only finds favorite items faster, so it returns the same allocations.
+def test_fast_envy_cycle_elimination_as_envy_cycle_elimination():
+    for file_name in os.listdir("instances"):
+        agents, items, restrictions = import_from_file(f"instances/{file_name}")
+        if "additive" in restrictions:
+            assert fast_envy_cycle_elimination(agents, items) == envy_cycle_elimination(agents, items)
+
+    random.seed(21)
+
+    for _ in range(20):
+        instance = generate_instance(random.randint(1, 8), random.randint(1, 40), AdditiveGenerator(0, 5))
+
+        assert (
+            fast_envy_cycle_elimination(instance.agents, instance.items)
+            == envy_cycle_elimination(instance.agents, instance.items)
+        )
+
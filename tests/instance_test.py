@@ -0,0 +1,76 @@
+import numpy as np
+
+from fairdivision.utils.bundle import Bundle
+from fairdivision.utils.generators import AdditiveGenerator, generate_agents, generate_instance, generate_items
+from fairdivision.utils.instance import Instance, get_instance
+from fairdivision.utils.importers import import_from_file, import_instance_from_file
+from fairdivision.utils.items import Items
+
+
+def test_import_binds_agents():
+    instance, _ = import_instance_from_file("instances/with_efx.txt")
+
+    assert instance.valuations.tolist() == [
+        [15, 3, 2, 2, 6],
+        [7, 5, 5, 5, 7],
+        [20, 3, 3, 3, 3]
+    ]
+
+    agent = instance.agents.get_agent(2)
+
+    assert agent.valuations == {}
+    assert agent.get_valuation(instance.items.get_item(5)) == 7
+    assert agent.get_valuation(Bundle(Items([instance.items.get_item(1), instance.items.get_item(2)]))) == 12
+    assert agent.get_valuation(instance.items) == 29
+
+
+def test_assign_valuation_writes_into_matrix():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    agent = agents.get_agent(1)
+
+    agent.assign_valuation(items.get_item(3), 100)
+
+    assert agent.instance is not None
+    assert agent.instance.valuations[0, 2] == 100
+    assert agent.get_valuation(items.get_item(3)) == 100
+
+
+def test_favorite_item_vectorized_ties():
+    agents = generate_agents(1)
+    items = generate_items(100)
+
+    instance = Instance(agents, items, np.array([[i % 10 for i in range(100)]]))
+    instance.bind_agents()
+
+    assert agents.get_agent(1).get_favorite_item(items) == items.get_item(10)
+
+
+def test_generate_instance():
+    instance = generate_instance(3, 7, AdditiveGenerator(1, 5))
+
+    assert instance.size() == (3, 7)
+    assert instance.valuations.min() >= 1 and instance.valuations.max() <= 5
+
+    for agent in instance.agents:
+        assert agent.get_valuation(instance.items) == instance.valuations[agent.row].sum()
+
+
+def test_get_instance():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+
+    assert get_instance(agents, items) is agents.get_agent(1).instance
+
+    other_items = items.copy()
+    other_items.remove_item(1)
+
+    subinstance = get_instance(agents, other_items)
+
+    assert subinstance.valuations.tolist() == [[3, 2, 2, 6], [5, 5, 5, 7], [3, 3, 3, 3]]
+    assert agents.get_agent(1).instance is not subinstance
+
+    unbound_agents = generate_agents(2)
+    for agent in unbound_agents:
+        for item in items:
+            agent.assign_valuation(item, agent.get_index() * item.get_index())
+
+    assert get_instance(unbound_agents, items).valuations.tolist() == [[1, 2, 3, 4, 5], [2, 4, 6, 8, 10]]
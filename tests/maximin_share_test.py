@@ -0,0 +1,74 @@
+import random
+
+from fairdivision.algorithms.all_allocations import all_allocations
+from fairdivision.utils.agent import Agent
+from fairdivision.utils.generators import AdditiveGenerator, generate_agents, generate_items, generate_valuations
+from fairdivision.utils.helpers import get_maximin_share_bounds, get_maximin_shares
+from fairdivision.utils.maximin_share import get_agent_maximin_share, maximin_share, maximin_share_bounds
+
+
+def brute_force_maximin_shares(agents, items):
+    maximin_shares = dict([(agent, 0) for agent in agents])
+
+    for allocation in all_allocations(agents, items):
+        for agent in agents:
+            worst_valuation = min([agent.get_valuation(bundle) for _, bundle in allocation.get_allocation()])
+            maximin_shares[agent] = max(maximin_shares[agent], worst_valuation)
+
+    return maximin_shares
+
+
+def test_maximin_shares_match_brute_force():
+    random.seed(0)
+
+    for _ in range(100):
+        agents = generate_agents(random.randint(1, 4))
+        items = generate_items(random.randint(0, 7))
+        generate_valuations(agents, items, AdditiveGenerator(0, random.choice([3, 10, 100])))
+
+        assert get_maximin_shares(agents, items) == brute_force_maximin_shares(agents, items)
+
+
+def test_maximin_share_with_negative_valuations():
+    agent = Agent(1)
+    items = generate_items(4)
+    agent.assign_valuations(items, [5, -2, 3, 1])
+
+    assert get_agent_maximin_share(agent, items, 2) == 3
+    assert get_agent_maximin_share(agent, items, 5) == 0
+
+
+def test_maximin_share_of_many_items():
+    # pairs of items `k` and `61 - k` can be split evenly into 5 bundles
+    assert maximin_share(list(range(1, 61)), 5) == 366
+    assert maximin_share(list(range(1, 61)) + [0] * 10, 5) == 366
+    assert maximin_share(list(range(1, 61)) + [1000], 6) == 366
+
+
+def test_maximin_share_of_large_valuations():
+    random.seed(0)
+
+    # many partitions are perfect, and rebalancing bundles finds one without a search
+    for n in [2, 3]:
+        valuations = [random.randint(0, 10 ** 6) for _ in range(50)]
+
+        assert maximin_share_bounds(valuations, n)[0] == sum(valuations) // n
+        assert maximin_share(valuations, n) == sum(valuations) // n
+
+
+def test_maximin_share_bounds():
+    random.seed(0)
+
+    for _ in range(100):
+        agents = generate_agents(random.randint(1, 6))
+        items = generate_items(random.randint(0, 20))
+        generate_valuations(agents, items, AdditiveGenerator(0, random.choice([3, 10, 100])))
+
+        maximin_shares = get_maximin_shares(agents, items)
+
+        for agent, (lower_bound, upper_bound) in get_maximin_share_bounds(agents, items).items():
+            assert lower_bound <= maximin_shares[agent] <= upper_bound
+
+    # an item worth more than the rest cannot be split
+    assert maximin_share_bounds([100, 10, 10, 10], 2) == (30, 30)
+    assert maximin_share_bounds([5, 5], 3) == (0, 0)
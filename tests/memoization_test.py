@@ -0,0 +1,87 @@
+from fairdivision.utils.aggregates import get_bundle_aggregates
+from fairdivision.utils.checkers import highest_efx_approximation, is_ef, is_efx, is_mms, is_prop
+from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
+from fairdivision.utils.maximin_share import cached_maximin_share
+
+
+ALLOCATION = {
+    1: [2, 3, 4, 5],
+    2: [1],
+    3: []
+}
+
+
+def test_version_grows_with_changes():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, {1: [], 2: [], 3: []})
+    agent_1, agent_2, agent_3 = agents.get_agents()
+
+    versions = [allocation.version]
+
+    allocation.allocate(agent_1, items.get_item(1))
+    versions.append(allocation.version)
+
+    allocation.allocate_bundle(agent_2, allocation.for_agent(agent_1))
+    versions.append(allocation.version)
+
+    allocation.reallocate_bundles([(agent_3, agent_2), (agent_2, agent_3)])
+    versions.append(allocation.version)
+
+    assert versions == sorted(set(versions))
+
+
+def test_checkers_are_cached_until_allocation_changes():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, ALLOCATION)
+    agent_1, agent_2, _ = agents.get_agents()
+
+    aggregates = get_bundle_aggregates(agents, allocation)
+    result = is_efx(agents, allocation)
+
+    assert get_bundle_aggregates(agents, allocation) is aggregates
+    assert is_efx(agents, allocation) is result
+    assert result == (False, (agent_2, agent_1))
+
+    allocation.reallocate_bundles([(agent_1, agent_2), (agent_2, agent_1)])
+
+    assert get_bundle_aggregates(agents, allocation) is not aggregates
+    assert is_efx(agents, allocation) == is_efx(agents, allocation.copy())
+    assert is_efx(agents, allocation) != result
+
+
+def test_checkers_are_cached_until_valuations_change():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, ALLOCATION)
+    agent_1, agent_2, agent_3 = agents.get_agents()
+
+    assert is_efx(agents, allocation) == (False, (agent_2, agent_1))
+    assert is_ef(agents, allocation) == (False, (agent_1, agent_2))
+    assert is_prop(agents, items, allocation) == (False, agent_2)
+    assert is_mms(agents, items, allocation) == (False, agent_3)
+
+    agent_2.assign_valuation(items.get_item(1), 100)
+
+    assert is_efx(agents, allocation) == (False, (agent_3, agent_1))
+    assert is_prop(agents, items, allocation) == (False, agent_3)
+
+    # nobody envies anybody once the first agent does not value the first item and the third one values nothing
+    agent_1.assign_valuation(items.get_item(1), 0)
+    agent_3.assign_valuations(items, [0] * items.size())
+
+    assert is_ef(agents, allocation) is True
+    assert is_prop(agents, items, allocation) is True
+    assert is_mms(agents, items, allocation) is True
+    assert len(allocation.cache) == 3
+
+
+def test_maximin_shares_are_cached():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    allocation = import_allocation_from_dict(agents, items, ALLOCATION)
+
+    is_mms(agents, items, allocation)
+    hits = cached_maximin_share.cache_info().hits
+
+    is_mms(agents, items, allocation, use_bounds=False)
+    is_mms(agents, items, allocation.copy())
+
+    assert cached_maximin_share.cache_info().hits == hits + agents.size()
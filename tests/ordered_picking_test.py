@@ -3,7 +3,15 @@ import os
 from fairdivision.algorithms.ordered_picking import ordered_picking
 
 from fairdivision.utils.checkers import highest_mms_approximation, is_eefx
-from fairdivision.utils.importers import import_from_file
+from fairdivision.utils.importers import import_allocation_from_dict, import_from_file
+
+
+# known allocations returned by Ordered Picking for the instances made for it
+ORDERED_ALLOCATIONS = {
+    "ordered.txt": {1: [1], 2: [2, 5], 3: [3, 4]},
+    "ordered_picking_0333_ef1.txt": {1: [1], 2: [2], 3: [3, 5], 4: [4, 6, 7, 8]},
+    "ordered_picking_05_ef1.txt": {1: [1], 2: [2, 4], 3: [3, 5, 6]}
+}
 
 
 # Ordered Picking returns an EEFX allocation for every additive instance.
@@ -26,3 +34,25 @@ def test_ordered_picking_mms_approximation():
             allocation = ordered_picking(agents, items)
 
             assert highest_mms_approximation(agents, items, allocation) >= 0.667
+
+
+def test_ordered_picking_leaves_agents_untouched():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+
+    versions = [agent.version for agent in agents]
+    valuations = [agent.valuations.copy() for agent in agents]
+
+    allocation = ordered_picking(agents, items)
+
+    assert [agent.version for agent in agents] == versions
+    assert [agent.valuations for agent in agents] == valuations
+    assert ordered_picking(agents, items) == allocation
+
+    for file_name, expected_allocation in ORDERED_ALLOCATIONS.items():
+        agents, items, _ = import_from_file(f"instances/{file_name}")
+        valuations = [agent.valuations.copy() for agent in agents]
+
+        allocation = ordered_picking(agents, items)
+
+        assert [agent.valuations for agent in agents] == valuations
+        assert allocation == import_allocation_from_dict(agents, items, expected_allocation)
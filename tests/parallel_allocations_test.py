@@ -0,0 +1,75 @@
+import time
+
+from fairdivision.algorithms.parallel_allocations import (
+    get_shards, parallel_is_eefx, parallel_maximin_shares, parallel_optimum, reduce_allocations
+)
+from fairdivision.utils.allocation import Allocation
+from fairdivision.utils.checkers import is_eefx
+from fairdivision.utils.helpers import get_maximin_shares
+from fairdivision.utils.importers import import_from_file, import_allocation_from_dict
+
+
+EEFX_ALLOCATION = {
+    1: [5],
+    2: [1, 4],
+    3: [2, 3]
+}
+
+NOT_EEFX_ALLOCATION = {
+    1: [1, 3],
+    2: [4, 5],
+    3: [2]
+}
+
+
+def utilitarian_welfare(allocation: Allocation) -> float:
+    return sum(agent.get_valuation(bundle) for agent, bundle in allocation)
+
+
+def slow_shard(agents, items, start, stop, cancel_event) -> bool:
+    # only the first shard is a witness, the others ignore `cancel_event`
+    if start > 0:
+        time.sleep(3)
+
+    return start == 0
+
+
+def test_get_shards():
+    assert get_shards(10, 3) == [(0, 4), (4, 8), (8, 10)]
+    assert get_shards(2, 4) == [(0, 1), (1, 2)]
+    assert get_shards(0, 4) == []
+
+
+def test_parallel_maximin_shares():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+
+    assert parallel_maximin_shares(agents, items, shards_number=5, max_workers=2) == get_maximin_shares(agents, items)
+
+
+def test_parallel_is_eefx():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+
+    for allocation_dict in [EEFX_ALLOCATION, NOT_EEFX_ALLOCATION]:
+        allocation = import_allocation_from_dict(agents, items, allocation_dict)
+
+        assert parallel_is_eefx(agents, items, allocation, max_workers=2) == is_eefx(agents, items, allocation)
+
+
+def test_parallel_optimum():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+
+    value, allocation = parallel_optimum(agents, items, utilitarian_welfare, shards_number=7, max_workers=2)
+
+    # every item goes to the agent valuing it the most
+    assert value == sum(max(agent.get_valuation(item) for agent in agents) for item in items)
+    assert utilitarian_welfare(allocation) == value
+
+
+def test_reduce_allocations_returns_witness_without_waiting():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+
+    start = time.time()
+    result = reduce_allocations(agents, items, slow_shard, any, lambda result: result, shards_number=2, max_workers=2)
+
+    assert result is True
+    assert time.time() - start < 2
@@ -0,0 +1,57 @@
+import random
+
+from fairdivision.utils.bitset_items import BitsetItems, ItemsUniverse
+from fairdivision.utils.generators import AdditiveGenerator, generate_instance
+from fairdivision.utils.importers import import_from_file
+from fairdivision.utils.items import Items
+from fairdivision.utils.preference_index import PreferenceIndex
+
+
+def test_preference_index_favorite_item():
+    agents, items, _ = import_from_file("instances/with_efx.txt")
+    agent = agents.get_agent(1)
+
+    preferences = PreferenceIndex(agents, items)
+    items_left = items.copy()
+
+    for _ in range(items.size()):
+        favorite_item = preferences.get_favorite_item(agent, items_left)
+
+        assert favorite_item == agent.get_favorite_item(items_left)
+
+        items_left.remove_item(favorite_item)
+
+    try:
+        preferences.get_favorite_item(agent, items_left)
+        assert False
+    except Exception:
+        pass
+
+
+def test_preference_index_as_agents():
+    random.seed(22)
+
+    for _ in range(30):
+        instance = generate_instance(random.randint(1, 5), random.randint(1, 30), AdditiveGenerator(0, 5))
+        agents, items = instance.agents, instance.items
+
+        preferences = PreferenceIndex(agents, items)
+
+        # remaining items shrink and grow, as a list of items or as a subset of the universe
+        for remaining in [Items(items.get_items().copy()), BitsetItems(ItemsUniverse(items), items.get_items())]:
+            for _ in range(3 * items.size()):
+                item = random.choice(items.get_items())
+
+                if item in remaining and random.random() < 0.7:
+                    remaining.remove_item(item)
+                elif item not in remaining:
+                    remaining.add_item(item)
+
+                if remaining.size() == 0:
+                    continue
+
+                for agent in agents:
+                    expected_items = sorted(remaining, key=lambda item: -agent.get_valuation(item))
+
+                    assert preferences.get_favorite_item(agent, remaining) == agent.get_favorite_item(remaining)
+                    assert preferences.get_top_items(agent, remaining, 3) == expected_items[:3]
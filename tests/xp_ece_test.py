@@ -1,10 +1,12 @@
 import os
+import random
 
-from fairdivision.algorithms.xp_ece import xp_ece, get_efx_preserving_agent
+from fairdivision.algorithms.xp_ece import EFXPreservationState, xp_ece, get_efx_preserving_agent
 from fairdivision.utils.allocation import Allocation
 from fairdivision.utils.checkers import is_efx0
-from fairdivision.utils.generators import generate_agents, generate_items
+from fairdivision.utils.generators import AdditiveGenerator, generate_agents, generate_instance, generate_items
 from fairdivision.utils.importers import import_allocation_from_dict, import_from_file
+from fairdivision.utils.preference_index import PreferenceIndex
 
 
 ALLOCATION = {
@@ -22,6 +24,7 @@ def test_xp_ece_efx():
                 allocation = xp_ece(agents, items)
 
                 assert is_efx0(agents, allocation) == True
+                assert allocation.listeners == []
 
 
 def test_get_efx_preserving_agent_one_agent_empty_bundle():
@@ -143,3 +146,33 @@ def test_get_efx_preserving_agent_no_agents():
     items_left.remove_item(items.get_item(3))
 
     assert get_efx_preserving_agent(agents, items_left, allocation) is None
+
+
+def test_get_efx_preserving_agent_with_state():
+    random.seed(25)
+
+    for _ in range(30):
+        instance = generate_instance(random.randint(2, 6), random.randint(2, 20), AdditiveGenerator(0, 10))
+        agents, items = instance.agents, instance.items
+
+        items_left = items.copy()
+        allocation = import_allocation_from_dict(agents, items, {})
+        preferences = PreferenceIndex(agents, items)
+        state = EFXPreservationState(agents, items_left, allocation, preferences)
+
+        while items_left.size() > 1:
+            item = random.choice(items_left.get_items())
+            allocation.allocate(random.choice(agents.get_agents()), item)
+            items_left.remove_item(item)
+
+            agents_list = agents.get_agents()
+            if random.random() < 0.3:
+                allocation.reallocate_bundles(list(zip(agents_list, agents_list[1:] + agents_list[:1])))
+
+            seed = random.random()
+
+            random.seed(seed)
+            expected_agent = get_efx_preserving_agent(agents, items_left, allocation)
+
+            random.seed(seed)
+            assert get_efx_preserving_agent(agents, items_left, allocation, preferences, state) == expected_agent